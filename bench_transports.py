@@ -0,0 +1,449 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HOST = '127.0.0.1'
+TCP_PORT = 65440     # Port riêng để không đụng server practical1/practical2 đang chạy
+GRPC_PORT = 50070
+
+TRANSPORTS = ['tcp', 'grpc', 'mpi']
+SIZES = ['1K', '1M', '16M', '256M']
+CHUNK_SIZES = ['4K', '64K', '1M', '4M']
+CONCURRENCY = [1, 4]
+RESULTS_FILE = 'bench_results.jsonl'
+UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+# Mỗi phía (sender / receiver) chạy trong process riêng: CPU time và peak RSS
+# (ru_maxrss) đo được là của đúng phía đó, không lẫn với harness
+ROLE_CODE = """
+import sys, bench_transports
+bench_transports.run_role(sys.argv[1], sys.argv[2], sys.argv[3])
+"""
+
+
+def parse_size(text):
+    # '64K' -> 65536, '2G' -> 2147483648, '100' -> 100
+    text = text.strip().upper()
+    if text[-1:] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(n):
+    for unit in ['G', 'M', 'K']:
+        if n >= UNITS[unit] and n % UNITS[unit] == 0:
+            return f"{n // UNITS[unit]}{unit}"
+    return str(n)
+
+
+def make_file(path, size):
+    # Tạo file test theo từng MB, không giữ cả file trong bộ nhớ
+    block = os.urandom(min(size, 1024 * 1024))
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining:
+            n = f.write(block[:remaining])
+            remaining -= n
+
+
+# =======================
+# ĐO TÀI NGUYÊN TRONG PROCESS CỦA TỪNG PHÍA
+# =======================
+class RoleStats:
+    """
+    CPU time tính từ lúc bắt đầu truyền (không tính thời gian import),
+    peak RSS là của cả process
+    Thời điểm dùng time.monotonic(): trên Linux là CLOCK_MONOTONIC chung cho mọi
+    process trên máy, nên so được thời điểm giữa sender và receiver
+    """
+
+    def __init__(self):
+        self.usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.start = None
+        self.end = None
+        self.first_byte = None
+        self.lock = threading.Lock()
+
+    def mark_first_byte(self):
+        if self.first_byte is None:
+            with self.lock:
+                if self.first_byte is None:
+                    self.first_byte = time.monotonic()
+
+    def result(self):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return {
+            'start': self.start,
+            'end': self.end,
+            'first_byte': self.first_byte,
+            'cpu_user': usage.ru_utime - self.usage.ru_utime,
+            'cpu_sys': usage.ru_stime - self.usage.ru_stime,
+            'max_rss_kb': usage.ru_maxrss,
+        }
+
+
+def emit(result):
+    # Dòng cuối cùng trên stdout thật là kết quả JSON cho harness
+    sys.__stdout__.write(json.dumps(result) + '\n')
+    sys.__stdout__.flush()
+
+
+def run_threads(target, items):
+    # Chạy target(item) song song, mỗi item 1 thread
+    results = [None] * len(items)
+
+    def work(i):
+        results[i] = target(items[i])
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(len(items))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run_role(transport, side, config):
+    """
+    Chạy 1 phía của 1 lần đo, in thống kê dạng JSON
+    receiver: in 'ready' khi đã sẵn sàng, nhận tới khi harness gửi SIGINT
+    sender: gửi config['files'] song song rồi thoát
+    """
+    config = json.loads(config)
+    sys.stdout = open(os.devnull, 'w')   # Bỏ log của các chương trình, không để chúng làm lệch số đo
+    if transport == 'tcp':
+        tcp_role(side, config)
+    elif transport == 'grpc':
+        grpc_role(side, config)
+    else:
+        mpi_role(config)
+
+
+def tcp_role(side, config):
+    sys.path.insert(0, os.path.join(HERE, 'practical1'))
+    import client
+    import protocol
+    import server
+
+    stats = RoleStats()
+    if side == 'receiver':
+        class TimedFrameReceiver(protocol.FrameReceiver):
+            # Ghi nhận thời điểm byte đầu tiên tới server
+            def feed(self, data):
+                stats.mark_first_byte()
+                return super().feed(data)
+
+        server.FrameReceiver = TimedFrameReceiver
+        os.chdir(config['output_dir'])   # FrameReceiver ghi file vào thư mục hiện tại
+        # Server concurrent (selectors) chạy tới khi nhận KeyboardInterrupt (SIGINT từ harness)
+        # 'ready' được in trước khi bind, harness tự chờ port mở
+        emit('ready')
+        server.start_concurrent_server(HOST, config['port'])
+    else:
+        client.HOST, client.PORT = HOST, config['port']
+        stats.start = time.monotonic()
+        run_threads(lambda path: client.send_file(path, config['chunk_size']), config['files'])
+        stats.end = time.monotonic()
+    emit(stats.result())
+
+
+def grpc_role(side, config):
+    sys.path.insert(0, os.path.join(HERE, 'practical2'))
+    import client
+    import server
+
+    stats = RoleStats()
+    if side == 'receiver':
+        class TimedServicer(server.FileTransferServicer):
+            def UploadFile(self, request_iterator, context):
+                def timed(chunks):
+                    for chunk in chunks:
+                        stats.mark_first_byte()
+                        yield chunk
+                return super().UploadFile(timed(request_iterator), context)
+
+        grpc_server = server.create_server(HOST, config['port'], TimedServicer(config['output_dir']))
+        emit('ready')
+        try:
+            grpc_server.wait_for_termination()
+        except KeyboardInterrupt:
+            grpc_server.stop(0)
+    else:
+        client.HOST, client.PORT = HOST, config['port']
+        # Chunk cố định để so được với các transport khác (tắt adaptive chunking)
+        client.CHUNK_SIZE = config['chunk_size']
+        stats.start = time.monotonic()
+        run_threads(lambda path: client.upload_file(path, adaptive=False), config['files'])
+        stats.end = time.monotonic()
+    emit(stats.result())
+
+
+def mpi_role(config):
+    """
+    Chạy dưới mpiexec với 2 x concurrency rank:
+    rank i < concurrency gửi file i cho rank i + concurrency (Isend/Irecv fast path)
+    Rank 0 gom thống kê của mọi rank và in ra
+    """
+    from mpi4py import MPI
+    sys.path.insert(0, os.path.join(HERE, 'practical3'))
+    import mpi_transfer
+
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    pairs = comm.Get_size() // 2
+    stats = RoleStats()
+
+    receive_buffered = mpi_transfer.receive_buffered
+
+    class TimedFile:
+        # Bọc file output: lần write đầu tiên = chunk đầu tiên đã tới receiver
+        def __init__(self, f):
+            self.f = f
+
+        def write(self, data):
+            stats.mark_first_byte()
+            return self.f.write(data)
+
+    def timed_receive(comm, source_rank, f, *args):
+        return receive_buffered(comm, source_rank, TimedFile(f), *args)
+
+    mpi_transfer.receive_buffered = timed_receive
+
+    comm.Barrier()
+    if rank < pairs:
+        stats.start = time.monotonic()
+        mpi_transfer.run_sender_buffered(comm, rank + pairs, config['files'][rank], config['chunk_size'])
+    else:
+        mpi_transfer.run_receiver(comm, rank - pairs, config['output_dir'])
+        stats.end = time.monotonic()
+    result = stats.result()
+    result['side'] = 'sender' if rank < pairs else 'receiver'
+    results = comm.gather(result, root=0)
+    if rank == 0:
+        emit(results)
+
+
+# =======================
+# HARNESS
+# =======================
+def read_json(proc):
+    # Đọc dòng JSON tiếp theo trên stdout của role
+    for line in proc.stdout:
+        with contextlib.suppress(ValueError):
+            return json.loads(line)
+    raise RuntimeError(f"Role exited without a result (exit code {proc.wait()})")
+
+
+def spawn(command, env=None):
+    return subprocess.Popen(command, cwd=HERE, env=env, stdout=subprocess.PIPE, text=True)
+
+
+def combine(values):
+    """
+    Gộp thống kê của nhiều process cùng 1 phía (MPI: nhiều rank)
+    CPU cộng dồn, peak RSS lấy process lớn nhất
+    """
+    return {
+        'cpu_user': sum(v['cpu_user'] for v in values),
+        'cpu_sys': sum(v['cpu_sys'] for v in values),
+        'max_rss_kb': max(v['max_rss_kb'] for v in values),
+    }
+
+
+def run_trial(transport, files, output_dir, chunk_size, mpiexec):
+    """
+    Chạy 1 lần đo: receiver và sender ở 2 process (MPI: 1 lần mpiexec)
+    Returns: (list thống kê sender, list thống kê receiver)
+    """
+    config = {'files': files, 'output_dir': output_dir, 'chunk_size': chunk_size}
+    if transport == 'mpi':
+        command = shlex.split(mpiexec) + ['-n', str(2 * len(files)), sys.executable, '-c', ROLE_CODE,
+                                          'mpi', 'all', json.dumps(config)]
+        proc = spawn(command)
+        results = read_json(proc)
+        proc.wait()
+        return ([r for r in results if r['side'] == 'sender'],
+                [r for r in results if r['side'] == 'receiver'])
+
+    config['port'] = TCP_PORT if transport == 'tcp' else GRPC_PORT
+    receiver = spawn([sys.executable, '-c', ROLE_CODE, transport, 'receiver', json.dumps(config)])
+    try:
+        if read_json(receiver) != 'ready':
+            raise RuntimeError("Receiver did not start")
+        if transport == 'tcp':
+            wait_for_port(config['port'])
+        sender = spawn([sys.executable, '-c', ROLE_CODE, transport, 'sender', json.dumps(config)])
+        sent = read_json(sender)
+        sender.wait()
+        receiver.send_signal(signal.SIGINT)
+        received = read_json(receiver)
+    finally:
+        if receiver.poll() is None:
+            receiver.kill()
+        receiver.wait()
+    return [sent], [received]
+
+
+def wait_for_port(port, timeout=10.0):
+    # Chờ tới khi server TCP nhận kết nối
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((HOST, port), timeout=0.1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+def received_name(transport, path):
+    prefix = 'mpi_recv_' if transport == 'mpi' else 'received_'
+    return prefix + os.path.basename(path)
+
+
+def measure(transport, source, size, chunk_size, concurrency, workdir, mpiexec):
+    """
+    Gửi `concurrency` bản của file nguồn song song, kiểm tra kích thước file nhận được
+    Returns: dict kết quả (1 dòng JSON trong file kết quả)
+    """
+    output_dir = tempfile.mkdtemp(prefix='out_', dir=workdir)
+    # Hard link: mỗi stream 1 tên file riêng mà không tốn thêm dung lượng
+    files = []
+    for i in range(concurrency):
+        path = os.path.join(workdir, f"{transport}_{i}_{os.path.basename(source)}")
+        os.link(source, path)
+        files.append(path)
+    try:
+        senders, receivers = run_trial(transport, files, output_dir, chunk_size, mpiexec)
+        ok = all(os.path.exists(os.path.join(output_dir, received_name(transport, path)))
+                 and os.path.getsize(os.path.join(output_dir, received_name(transport, path))) == size
+                 for path in files)
+    finally:
+        for path in files:
+            os.remove(path)
+        for name in os.listdir(output_dir):
+            os.remove(os.path.join(output_dir, name))
+        os.rmdir(output_dir)
+
+    # tcp/grpc: sender xong khi nhận ACK / response, mpi: khi receiver ghi xong
+    start = min(s['start'] for s in senders)
+    end = max(r['end'] for r in senders + receivers if r['end'] is not None)
+    first_bytes = [r['first_byte'] for r in receivers if r['first_byte'] is not None]
+    elapsed = end - start
+    total = size * concurrency
+    return {
+        'transport': transport,
+        'size': size,
+        'chunk_size': chunk_size,
+        'concurrency': concurrency,
+        'ok': ok,
+        'seconds': elapsed,
+        'mb_per_s': total / 1024 / 1024 / elapsed if elapsed > 0 else None,
+        'ttfb_ms': (min(first_bytes) - start) * 1000 if first_bytes else None,
+        'sender': combine(senders),
+        'receiver': combine(receivers),
+    }
+
+
+def git_commit():
+    with contextlib.suppress(OSError, subprocess.CalledProcessError):
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    return None
+
+
+def load_baseline(path):
+    # Kết quả mới nhất của mỗi cấu hình trong 1 file kết quả cũ
+    baseline = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('ok'):
+                baseline[config_key(record)] = record
+    return baseline
+
+
+def config_key(record):
+    return record['transport'], record['size'], record['chunk_size'], record['concurrency']
+
+
+def print_row(record, baseline):
+    mb_s = f"{record['mb_per_s']:.1f}" if record['mb_per_s'] else '-'
+    ttfb = f"{record['ttfb_ms']:.2f}" if record['ttfb_ms'] is not None else '-'
+    sender, receiver = record['sender'], record['receiver']
+    line = (f"{record['transport']:<5} {format_size(record['size']):>6} {format_size(record['chunk_size']):>6} "
+            f"{record['concurrency']:>4} {record['seconds']:>8.3f} {mb_s:>9} {ttfb:>9} "
+            f"{sender['cpu_user'] + sender['cpu_sys']:>7.2f} {sender['max_rss_kb'] / 1024:>7.1f} "
+            f"{receiver['cpu_user'] + receiver['cpu_sys']:>7.2f} {receiver['max_rss_kb'] / 1024:>7.1f}")
+    old = baseline.get(config_key(record))
+    if old and old['mb_per_s'] and record['mb_per_s']:
+        line += f" {record['mb_per_s'] / old['mb_per_s'] - 1:>+7.0%}"
+    if not record['ok']:
+        line += "  FAILED"
+    print(line, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="So sánh throughput, time-to-first-byte, CPU và peak RSS của TCP (practical1), "
+                    "gRPC (practical2) và MPI (practical3) trên loopback")
+    parser.add_argument('--transports', nargs='+', choices=TRANSPORTS, default=TRANSPORTS)
+    parser.add_argument('--sizes', nargs='+', default=SIZES, help="Kích thước file test (vd: 1K 64M 2G)")
+    parser.add_argument('--chunk-sizes', nargs='+', default=CHUNK_SIZES,
+                        help="Chunk của phía gửi: sendfile() count (tcp), FileChunk (grpc), Isend buffer (mpi)")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=CONCURRENCY,
+                        help="Số file truyền song song (tcp/grpc: số kết nối, mpi: số cặp rank)")
+    parser.add_argument('--repeat', type=int, default=1, help="Số lần đo mỗi cấu hình")
+    parser.add_argument('--output', default=RESULTS_FILE,
+                        help="File JSON Lines, mỗi lần đo được ghi thêm 1 dòng (append)")
+    parser.add_argument('--compare', help="File kết quả cũ: in % thay đổi MB/s so với lần đo mới nhất trong đó")
+    parser.add_argument('--mpiexec', default='mpiexec', help="Lệnh mpiexec (có thể kèm tham số)")
+    parser.add_argument('--workdir', default=None, help="Thư mục chứa file test (mặc định: thư mục tạm)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes]
+    chunk_sizes = [parse_size(s) for s in args.chunk_sizes]
+    baseline = load_baseline(args.compare) if args.compare else {}
+    run_info = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': git_commit(),
+        'host': platform.node(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+    }
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir, \
+            open(args.output, 'a', encoding='utf-8') as results:
+        print(f"{'proto':<5} {'size':>6} {'chunk':>6} {'conc':>4} {'seconds':>8} {'MB/s':>9} {'TTFB ms':>9} "
+              f"{'tx cpu':>7} {'tx MB':>7} {'rx cpu':>7} {'rx MB':>7}" + (f" {'vs old':>7}" if baseline else ''))
+        for size in sizes:
+            source = os.path.join(workdir, f"bench_{format_size(size)}.bin")
+            make_file(source, size)
+            for transport in args.transports:
+                for chunk_size in chunk_sizes:
+                    for concurrency in args.concurrency:
+                        for _ in range(args.repeat):
+                            record = measure(transport, source, size, chunk_size, concurrency,
+                                             workdir, args.mpiexec)
+                            print_row(record, baseline)
+                            results.write(json.dumps({**run_info, **record}) + '\n')
+                            results.flush()
+            os.remove(source)
+    print(f"Results appended to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
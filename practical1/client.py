@@ -1,20 +1,105 @@
 import socket
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from integrity import DEFAULT_ALGORITHM, VERIFY_BLOCK_SIZE, BlockHasher, block_range
+from protocol import (ACK_OK, ACK_REPAIR, ProtocolError, ReplyReader, pack_file_header,
+                      pack_repair_header, BLOCK_INDEX)
 
 # Cấu hình kết nối đến server
 HOST = '127.0.0.1'  # Địa chỉ server
 PORT = 65432        # Port của server
+CHUNK_SIZE = 1024 * 1024  # Số bytes tối đa cho mỗi lần gọi sendfile() (1MB)
+SMALL_FILE_SIZE = 64 * 1024  # File nhỏ hơn ngưỡng này được gộp vào batch thay vì dùng sendfile()
+HASH_WINDOW = 4 * 1024 * 1024  # Mỗi lần thread phụ hash 4MB vừa được gửi
+CHECKSUM = DEFAULT_ALGORITHM   # 'crc32' hoặc 'blake2b' (chậm hơn, chống được dữ liệu bị sửa có chủ đích)
+
+def read_replies(client_socket, blocking=False):
+    # Đọc các reply server đã gửi về; blocking=False: không chặn (tránh đầy buffer nhận khi gửi nhiều file)
+    data = bytearray()
+    try:
+        while True:
+            chunk = client_socket.recv(65536, 0 if blocking else socket.MSG_DONTWAIT)
+            if not chunk:
+                break
+            data += chunk
+            if blocking:
+                break
+    except BlockingIOError:
+        pass
+    return data
+
+
+def hash_range(hasher, fd, offset, count):
+    # Chạy ở thread phụ: đọc đoạn đang được gửi (từ page cache, không thêm I/O đĩa) và hash,
+    # hashlib nhả GIL nên chạy song song với sendfile() ở thread chính
+    hasher.update(os.pread(fd, count, offset))
+
+
+def send_large_file(client_socket, filename, name, file_size, chunk_size, pool):
+    # Gửi header rồi dùng sendfile() để kernel copy trực tiếp từ file sang socket (zero-copy),
+    # mỗi lần gửi tối đa chunk_size bytes; digest được tính song song và gửi sau dữ liệu (trailer)
+    client_socket.sendall(pack_file_header(name, file_size, algorithm=CHECKSUM))
+    hasher = BlockHasher(algorithm=CHECKSUM)
+    sent = 0
+    with open(filename, 'rb') as f:
+        while sent < file_size:
+            window_end = min(sent + max(chunk_size, HASH_WINDOW), file_size)
+            hashing = pool.submit(hash_range, hasher, f.fileno(), sent, window_end - sent)
+            while sent < window_end:
+                n = client_socket.sendfile(f, offset=sent, count=min(chunk_size, window_end - sent))
+                if n == 0:
+                    # File bị cắt ngắn trong lúc gửi => frame không còn hợp lệ
+                    raise ProtocolError(f"File '{filename}' changed while sending")
+                sent += n
+            hashing.result()
+    client_socket.sendall(b''.join(hasher.finish()))
+
 
-def send_file(filename):
-    # Kiểm tra file có tồn tại không
-    if not os.path.exists(filename):
-        print(f"[CLIENT] Error: File '{filename}' does not exist!")
-        return
+def send_repair(client_socket, file_id, filename, blocks):
+    # Gửi lại các block bị hỏng của 1 file (đọc lại đúng các block đó, không phải cả file)
+    file_size = os.path.getsize(filename)
+    client_socket.sendall(pack_repair_header(file_id, len(blocks)))
+    with open(filename, 'rb') as f:
+        for index in blocks:
+            offset, length = block_range(index, file_size, VERIFY_BLOCK_SIZE)
+            client_socket.sendall(BLOCK_INDEX.pack(index))
+            client_socket.sendfile(f, offset=offset, count=length)
+
+
+def handle_replies(client_socket, reader, data, files, statuses):
+    # Ghi nhận kết quả từng file, gửi lại ngay các block server báo hỏng
+    for file_id, status, blocks in reader.feed(data):
+        if status == ACK_REPAIR:
+            print(f"[CLIENT] Resending {len(blocks)} corrupt block(s) of {files[file_id]}")
+            send_repair(client_socket, file_id, files[file_id], blocks)
+        else:
+            statuses[file_id] = status
+
+
+def send_files(paths, chunk_size=CHUNK_SIZE):
+    """
+    Gửi nhiều file liên tiếp trên cùng 1 kết nối TCP (pipelining)
+    Client không chờ reply của từng file mà gửi liên tục, các reply được đọc dần
+    Returns: số file server đã nhận thành công
+    """
+    files = []
+    for filename in paths:
+        # Kiểm tra file có tồn tại không
+        if not os.path.isfile(filename):
+            print(f"[CLIENT] Error: File '{filename}' does not exist!")
+        else:
+            files.append(filename)
+    if not files:
+        return 0
     
     # Tạo socket TCP/IP
     # socket.AF_INET: sử dụng IPv4
     # socket.SOCK_STREAM: sử dụng TCP
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    reader = ReplyReader()
+    statuses = {}  # file_id (thứ tự file trên kết nối) -> status cuối cùng
     
     try:
         # Kết nối đến server
@@ -22,23 +107,41 @@ def send_file(filename):
         client_socket.connect((HOST, PORT))
         print(f"[CLIENT] Connected to server {HOST}:{PORT}")
         
-        # Gửi tên file đến server
-        # encode() chuyển string thành bytes
-        client_socket.send(os.path.basename(filename).encode('utf-8'))
-        print(f"[CLIENT] Sending file: {filename}")
+        # Các file nhỏ được gộp (header + dữ liệu + digest) vào batch rồi gửi bằng 1 lần sendall()
+        batch = bytearray()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            for filename in files:
+                name = os.path.basename(filename)
+                file_size = os.path.getsize(filename)
+                if file_size < SMALL_FILE_SIZE:
+                    with open(filename, 'rb') as f:
+                        data = f.read()
+                    hasher = BlockHasher(algorithm=CHECKSUM)
+                    hasher.update(data)
+                    batch += pack_file_header(name, len(data), algorithm=CHECKSUM)
+                    batch += data
+                    batch += b''.join(hasher.finish())
+                    if len(batch) < chunk_size:
+                        continue
+                else:
+                    if batch:
+                        client_socket.sendall(batch)
+                        batch.clear()
+                    send_large_file(client_socket, filename, name, file_size, chunk_size, pool)
+                if batch:
+                    client_socket.sendall(batch)
+                    batch.clear()
+                handle_replies(client_socket, reader, read_replies(client_socket), files, statuses)
+        if batch:
+            client_socket.sendall(batch)
         
-        # Mở file và gửi nội dung
-        with open(filename, 'rb') as f:
-            # Đọc và gửi file theo từng chunk 4096 bytes
-            while True:
-                data = f.read(4096)
-                if not data:
-                    # Nếu hết dữ liệu, thoát vòng lặp
-                    break
-                # send() gửi dữ liệu qua socket
-                client_socket.send(data)
-        
-        print("[CLIENT] File sent successfully!")
+        # Chờ kết quả cuối cùng của mọi file (có thể phải gửi lại vài block), sau đó mới đóng chiều gửi
+        while len(statuses) < len(files):
+            data = read_replies(client_socket, blocking=True)
+            if not data:
+                break
+            handle_replies(client_socket, reader, data, files, statuses)
+        client_socket.shutdown(socket.SHUT_WR)
         
     except ConnectionRefusedError:
         print("[CLIENT] Error: Cannot connect to server. Make sure the server is running.")
@@ -49,8 +152,18 @@ def send_file(filename):
         # close() đóng socket và giải phóng tài nguyên
         client_socket.close()
         print("[CLIENT] Connection closed")
+    
+    succeeded = sum(status == ACK_OK for status in statuses.values())
+    print(f"[CLIENT] {succeeded}/{len(files)} file(s) sent successfully!")
+    return succeeded
+
+
+def send_file(filename, chunk_size=CHUNK_SIZE):
+    # Gửi 1 file = batch chỉ có 1 phần tử
+    print(f"[CLIENT] Sending file: {filename}")
+    return send_files([filename], chunk_size) == 1
 
 if __name__ == "__main__":
-    # File cần gửi
-    file_to_send = "test_file.txt"
-    send_file(file_to_send)
+    # Các file cần gửi (mặc định: test_file.txt)
+    files_to_send = sys.argv[1:] or ["test_file.txt"]
+    send_files(files_to_send)
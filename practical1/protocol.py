@@ -0,0 +1,299 @@
+import contextlib
+import os
+import struct
+import tempfile
+
+from integrity import (ALGORITHMS, DEFAULT_ALGORITHM, MAX_REPAIR_ROUNDS, VERIFY_BLOCK_SIZE, BlockHasher,
+                       block_count, block_range, corrupt_blocks, digest_size, inject_corruption)
+
+# Định dạng các frame trên đường truyền (big-endian), mỗi frame bắt đầu bằng
+#   prefix : magic(4s) | version(B) | kind(B)
+# FRAME_FILE   : algorithm(B) | name_len(H) | file_size(Q) | block_size(I)
+#                | name (UTF-8) | file_size bytes dữ liệu | digest của từng block (trailer)
+# FRAME_REPAIR : file_id(I) | count(I) | count x (block_index(I) | dữ liệu của block)
+# Một kết nối có thể chứa nhiều frame liên tiếp, file_id là số thứ tự của FRAME_FILE
+# trên kết nối (từ 0). Digest được 2 phía tính ngay khi gửi/nhận nên không cần đọc lại file,
+# và trailer nằm sau dữ liệu nên client gửi được byte đầu tiên ngay lập tức.
+# Với mỗi file, server trả về 1 reply: status(B) | file_id(I) | count(I) | count x block_index(I)
+#   ACK_OK     : mọi block khớp, file đã được lưu
+#   ACK_REPAIR : các block trong danh sách bị hỏng, client gửi lại bằng FRAME_REPAIR
+#   ACK_FAILED : vẫn hỏng sau MAX_REPAIR_ROUNDS lần gửi lại, file bị bỏ
+MAGIC = b'FTP1'
+VERSION = 2
+PREFIX = struct.Struct('!4sBB')
+FILE_HEADER = struct.Struct('!BHQI')
+REPAIR_HEADER = struct.Struct('!II')
+BLOCK_INDEX = struct.Struct('!I')
+REPLY = struct.Struct('!BII')
+
+FRAME_FILE = 0
+FRAME_REPAIR = 1
+
+ACK_FAILED = 0
+ACK_OK = 1
+ACK_REPAIR = 2
+
+ALGORITHM_IDS = {'blake2b': 1, 'crc32': 2}
+ALGORITHM_NAMES = {value: name for name, value in ALGORITHM_IDS.items()}
+
+
+class ProtocolError(Exception):
+    """
+    Dữ liệu nhận được không đúng định dạng frame
+    """
+
+
+def pack_file_header(name, file_size, block_size=VERIFY_BLOCK_SIZE, algorithm=DEFAULT_ALGORITHM):
+    # Đóng gói prefix + header + tên file thành bytes để gửi, trailer digest được gửi sau dữ liệu
+    encoded = name.encode('utf-8')
+    return (PREFIX.pack(MAGIC, VERSION, FRAME_FILE)
+            + FILE_HEADER.pack(ALGORITHM_IDS[algorithm], len(encoded), file_size, block_size) + encoded)
+
+
+def pack_repair_header(file_id, count):
+    return PREFIX.pack(MAGIC, VERSION, FRAME_REPAIR) + REPAIR_HEADER.pack(file_id, count)
+
+
+def pack_reply(file_id, status, blocks=()):
+    return REPLY.pack(status, file_id, len(blocks)) + b''.join(BLOCK_INDEX.pack(i) for i in blocks)
+
+
+class ReplyReader:
+    """
+    Phân tích các reply của server phía client, nhận theo từng đoạn bất kỳ
+    """
+
+    def __init__(self):
+        self.pending = bytearray()
+
+    def feed(self, data):
+        """
+        Returns: list các reply đã nhận đủ [(file_id, status, [block_index])]
+        """
+        self.pending += data
+        replies = []
+        while len(self.pending) >= REPLY.size:
+            status, file_id, count = REPLY.unpack_from(self.pending)
+            size = REPLY.size + count * BLOCK_INDEX.size
+            if len(self.pending) < size:
+                break
+            blocks = [index for index, in BLOCK_INDEX.iter_unpack(self.pending[REPLY.size:size])]
+            replies.append((file_id, status, blocks))
+            del self.pending[:size]
+        return replies
+
+
+class IncomingFile:
+    """
+    File đang nhận: dữ liệu được ghi vào file tạm, chỉ đổi tên thành file đích
+    khi mọi block khớp digest của phía gửi
+    """
+
+    def __init__(self, file_id, filename, path, file_size, block_size, algorithm):
+        self.file_id = file_id
+        self.filename = filename
+        self.path = path
+        self.file_size = file_size
+        self.block_size = block_size
+        self.algorithm = algorithm
+        # Mỗi lần nhận có file tạm riêng: nhiều kết nối cùng gửi 1 tên file không ghi đè lên nhau
+        fd, self.temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(path)}.", suffix='.part', dir=os.path.dirname(path) or '.'
+        )
+        self.file = os.fdopen(fd, 'wb')
+        self.hasher = BlockHasher(block_size, algorithm)
+        self.expected = None   # Digest của phía gửi (trailer)
+        self.bad = set()       # Block chưa khớp digest
+        self.rounds = 0        # Số lần đã yêu cầu gửi lại
+
+    def write(self, data):
+        self.file.write(data)
+        self.hasher.update(data)
+
+    def finish(self):
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def discard(self):
+        self.file.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.temp_path)
+
+
+class FrameReceiver:
+    """
+    Bộ phân tích frame phía server (state machine)
+    Nhận dữ liệu theo từng đoạn bất kỳ từ socket và ghi từng file ra đĩa,
+    không phụ thuộc vào việc recv() trả về bao nhiêu bytes mỗi lần
+    corrupt_prob: chỉ dùng để thử, xác suất làm hỏng 1 đoạn dữ liệu vừa nhận
+    """
+
+    def __init__(self, output_dir='.', prefix='received_', corrupt_prob=0.0):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.corrupt_prob = corrupt_prob
+        self.files = {}          # file_id -> IncomingFile chưa xong (đang nhận hoặc chờ gửi lại)
+        self.next_file_id = 0
+        self.current = None      # File của frame đang nhận
+        self.completed = []
+        self._expect(PREFIX.size, self._on_prefix)
+
+    def _expect(self, size, handler):
+        # Chờ đủ `size` bytes của 1 trường cố định rồi gọi handler(bytes)
+        self.pending = bytearray()
+        self.need = size
+        self.handler = handler
+        self.stream_remaining = 0
+        if size == 0:
+            handler(b'')
+
+    def _stream(self, size, sink, done):
+        # Chuyển thẳng `size` bytes dữ liệu cho sink (không gom vào buffer), xong thì gọi done()
+        self.pending = bytearray()
+        self.stream_remaining = size
+        self.sink = sink
+        if size == 0:
+            done()
+        else:
+            self.stream_done = done
+
+    def in_frame(self):
+        # True nếu đang nhận dở một frame hoặc còn file chờ gửi lại
+        return bool(self.pending) or self.handler != self._on_prefix or bool(self.files)
+
+    def feed(self, data):
+        """
+        Xử lý một đoạn dữ liệu vừa nhận (bytes hoặc memoryview)
+        Returns: list các file đã có kết quả [(file_id, filename, file_size, status, [block_index])]
+        """
+        self.completed = []
+        view = memoryview(data)
+        while view:
+            if self.stream_remaining:
+                n = min(self.stream_remaining, len(view))
+                self.stream_remaining -= n
+                self.sink(inject_corruption(view[:n], self.corrupt_prob))
+                view = view[n:]
+                if not self.stream_remaining:
+                    self.stream_done()
+            else:
+                n = min(self.need - len(self.pending), len(view))
+                self.pending += view[:n]
+                view = view[n:]
+                if len(self.pending) == self.need:
+                    self.handler(bytes(self.pending))
+        return self.completed
+
+    def abort(self):
+        # Kết nối bị đóng giữa chừng: xóa các file đang ghi dở / chờ gửi lại
+        for incoming in self.files.values():
+            incoming.discard()
+        self.files.clear()
+        self.current = None
+        self._expect(PREFIX.size, self._on_prefix)
+
+    def _on_prefix(self, field):
+        magic, version, kind = PREFIX.unpack(field)
+        if magic != MAGIC or version != VERSION:
+            raise ProtocolError(f"Invalid frame header (magic={magic!r}, version={version})")
+        if kind == FRAME_FILE:
+            self._expect(FILE_HEADER.size, self._on_file_header)
+        elif kind == FRAME_REPAIR:
+            self._expect(REPAIR_HEADER.size, self._on_repair_header)
+        else:
+            raise ProtocolError(f"Unknown frame kind {kind}")
+
+    def _on_file_header(self, field):
+        algorithm, name_len, file_size, block_size = FILE_HEADER.unpack(field)
+        if algorithm not in ALGORITHM_NAMES:
+            raise ProtocolError(f"Unknown checksum algorithm {algorithm}")
+        if name_len == 0:
+            raise ProtocolError("Empty filename")
+        if block_size == 0:
+            raise ProtocolError("Block size must be positive")
+        self.header = (ALGORITHM_NAMES[algorithm], file_size, block_size)
+        self._expect(name_len, self._on_name)
+
+    def _on_name(self, field):
+        # basename() để client không ghi được ra ngoài thư mục output
+        try:
+            filename = os.path.basename(field.decode('utf-8'))
+        except UnicodeDecodeError:
+            raise ProtocolError("Filename is not valid UTF-8")
+        if not filename:
+            raise ProtocolError("Empty filename")
+        algorithm, file_size, block_size = self.header
+        path = os.path.join(self.output_dir, self.prefix + filename)
+        self.current = IncomingFile(self.next_file_id, filename, path, file_size, block_size, algorithm)
+        self.files[self.next_file_id] = self.current
+        self.next_file_id += 1
+        self._stream(file_size, self.current.write, self._on_file_data)
+
+    def _on_file_data(self):
+        incoming = self.current
+        self._expect(block_count(incoming.file_size, incoming.block_size) * digest_size(incoming.algorithm),
+                     self._on_trailer)
+
+    def _on_trailer(self, field):
+        incoming = self.current
+        size = digest_size(incoming.algorithm)
+        incoming.expected = [field[i:i + size] for i in range(0, len(field), size)]
+        incoming.bad = set(corrupt_blocks(incoming.expected, incoming.hasher.finish()))
+        incoming.file.flush()
+        self._expect(PREFIX.size, self._on_prefix)
+        self._check(incoming)
+
+    def _on_repair_header(self, field):
+        file_id, count = REPAIR_HEADER.unpack(field)
+        self.current = self.files.get(file_id)
+        if self.current is None or self.current.expected is None:
+            raise ProtocolError(f"Repair for unknown file {file_id}")
+        self.repair_left = count
+        if count:
+            self._expect(BLOCK_INDEX.size, self._on_block_index)
+        else:
+            self._expect(PREFIX.size, self._on_prefix)
+            self._check(self.current)
+
+    def _on_block_index(self, field):
+        incoming = self.current
+        index, = BLOCK_INDEX.unpack(field)
+        if index >= len(incoming.expected):
+            raise ProtocolError(f"Block {index} is out of range")
+        self.block_index = index
+        self.block_offset, length = block_range(index, incoming.file_size, incoming.block_size)
+        self.block_hasher = ALGORITHMS[incoming.algorithm]()
+        self._stream(length, self._write_repair, self._on_repair_block)
+
+    def _write_repair(self, data):
+        os.pwrite(self.current.file.fileno(), data, self.block_offset)
+        self.block_offset += len(data)
+        self.block_hasher.update(data)
+
+    def _on_repair_block(self):
+        incoming = self.current
+        if self.block_hasher.digest() == incoming.expected[self.block_index]:
+            incoming.bad.discard(self.block_index)
+        self.repair_left -= 1
+        if self.repair_left:
+            self._expect(BLOCK_INDEX.size, self._on_block_index)
+        else:
+            self._expect(PREFIX.size, self._on_prefix)
+            self._check(incoming)
+
+    def _check(self, incoming):
+        # Kết quả của 1 file sau trailer hoặc sau 1 lần gửi lại
+        if not incoming.bad:
+            incoming.finish()
+            status = ACK_OK
+        elif incoming.rounds >= MAX_REPAIR_ROUNDS:
+            # Dữ liệu vẫn hỏng: không giữ lại file sai
+            incoming.discard()
+            status = ACK_FAILED
+        else:
+            incoming.rounds += 1
+            self.completed.append((incoming.file_id, incoming.filename, incoming.file_size,
+                                   ACK_REPAIR, sorted(incoming.bad)))
+            return
+        del self.files[incoming.file_id]
+        self.completed.append((incoming.file_id, incoming.filename, incoming.file_size, status, []))
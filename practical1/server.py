@@ -1,10 +1,57 @@
+import argparse
+import selectors
 import socket
 import os
 
+from protocol import ACK_OK, ACK_REPAIR, FrameReceiver, ProtocolError, pack_reply
+
 # Cấu hình server
 HOST = '127.0.0.1'  # Địa chỉ localhost
 PORT = 65432        # Port để lắng nghe
 
+# Cấu hình cho chế độ concurrent
+BACKLOG = 512                   # Số kết nối tối đa chờ trong hàng đợi
+RECV_BUFFER_SIZE = 256 * 1024   # Kích thước buffer nhận dữ liệu (256KB)
+CORRUPT_PROB = 0.0              # Chỉ dùng để thử: xác suất làm hỏng 1 đoạn dữ liệu nhận được
+
+def report_completed(completed):
+    # In kết quả và tạo các reply cho những file vừa có kết quả
+    acks = bytearray()
+    for file_id, filename, file_size, status, blocks in completed:
+        if status == ACK_OK:
+            print(f"[SERVER] File received successfully: received_{filename} ({file_size} bytes)")
+        elif status == ACK_REPAIR:
+            print(f"[SERVER] {len(blocks)} corrupt block(s) in {filename}, requesting retransmission")
+        else:
+            print(f"[SERVER] Checksum mismatch, discarded: {filename}")
+        acks += pack_reply(file_id, status, blocks)
+    return bytes(acks)
+
+
+def receive_frames(client_socket):
+    """
+    Nhận tất cả các file client gửi trên một kết nối (chế độ blocking)
+    """
+    receiver = FrameReceiver(corrupt_prob=CORRUPT_PROB)
+    buffer = bytearray(RECV_BUFFER_SIZE)
+    view = memoryview(buffer)
+    try:
+        while True:
+            n = client_socket.recv_into(buffer)
+            if n == 0:
+                # Client đã gửi hết các file
+                break
+            acks = report_completed(receiver.feed(view[:n]))
+            if acks:
+                client_socket.sendall(acks)
+    except (ProtocolError, OSError) as e:
+        print(f"[SERVER] Error: {e}")
+    finally:
+        if receiver.in_frame():
+            print("[SERVER] Connection closed in the middle of a file")
+        receiver.abort()
+
+
 def start_server():
     # Tạo socket TCP/IP
     # socket.AF_INET: sử dụng IPv4
@@ -30,27 +77,8 @@ def start_server():
             client_socket, client_address = server_socket.accept()
             print(f"[SERVER] Connection from {client_address}")
             
-            # Nhận tên file (tối đa 1024 bytes)
-            filename = client_socket.recv(1024).decode('utf-8')
-            print(f"[SERVER] Receiving file: {filename}")
-            
-            # Tạo tên file mới để lưu (thêm prefix "received_")
-            received_filename = f"received_{filename}"
-            
-            # Mở file để ghi dữ liệu nhận được
-            with open(received_filename, 'wb') as f:
-                print("[SERVER] Receiving data...")
-                while True:
-                    # Nhận dữ liệu theo từng chunk 4096 bytes
-                    # recv() đọc dữ liệu từ socket
-                    data = client_socket.recv(4096)
-                    if not data:
-                        # Nếu không còn dữ liệu, thoát vòng lặp
-                        break
-                    # Ghi dữ liệu vào file
-                    f.write(data)
-            
-            print(f"[SERVER] File received successfully: {received_filename}")
+            # Nhận liên tiếp các frame (header + tên file + dữ liệu) trên cùng kết nối
+            receive_frames(client_socket)
             
             # Đóng kết nối với client
             client_socket.close()
@@ -62,5 +90,132 @@ def start_server():
         # Đóng server socket
         server_socket.close()
 
+class Upload:
+    """
+    Trạng thái của một kết nối upload trong event loop
+    """
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.receiver = FrameReceiver(corrupt_prob=CORRUPT_PROB)  # Phân tích frame của kết nối này
+        self.outbox = bytearray()        # Các byte ACK chưa gửi được
+
+
+def accept_connection(selector, server_socket):
+    # Chấp nhận kết nối mới và đăng ký với selector (non-blocking)
+    client_socket, client_address = server_socket.accept()
+    client_socket.setblocking(False)
+    print(f"[SERVER] Connection from {client_address}")
+    selector.register(client_socket, selectors.EVENT_READ, Upload(client_socket, client_address))
+
+
+def close_upload(selector, upload):
+    # Hủy đăng ký và đóng socket, xóa file đang nhận dở (nếu có)
+    selector.unregister(upload.sock)
+    upload.sock.close()
+    if upload.receiver.in_frame():
+        print(f"[SERVER] Connection from {upload.address} closed in the middle of a file")
+    upload.receiver.abort()
+    print(f"[SERVER] Connection closed {upload.address}")
+
+
+def flush_acks(selector, upload):
+    # Gửi các ACK đang chờ, nếu socket đầy thì chờ sự kiện EVENT_WRITE
+    try:
+        sent = upload.sock.send(upload.outbox)
+        del upload.outbox[:sent]
+    except BlockingIOError:
+        pass
+    events = selectors.EVENT_READ | (selectors.EVENT_WRITE if upload.outbox else 0)
+    selector.modify(upload.sock, events, upload)
+
+
+def handle_upload(selector, upload, view, mask):
+    """
+    Đọc dữ liệu đang có sẵn trên socket vào buffer dùng chung
+    view: memoryview của buffer đã cấp phát trước, không tạo bytes mới cho mỗi chunk
+    """
+    if mask & selectors.EVENT_WRITE:
+        flush_acks(selector, upload)
+    if not mask & selectors.EVENT_READ:
+        return
+
+    try:
+        n = upload.sock.recv_into(view)
+    except BlockingIOError:
+        return
+    except ConnectionError as e:
+        print(f"[SERVER] Error from {upload.address}: {e}")
+        close_upload(selector, upload)
+        return
+
+    if n == 0:
+        # Client đã gửi hết các file
+        close_upload(selector, upload)
+        return
+
+    try:
+        # Dữ liệu được ghi thẳng từ memoryview ra file, không copy
+        upload.outbox += report_completed(upload.receiver.feed(view[:n]))
+    except (ProtocolError, OSError) as e:
+        # Lỗi của 1 client không được làm dừng cả server
+        print(f"[SERVER] Error from {upload.address}: {e}")
+        close_upload(selector, upload)
+        return
+    if upload.outbox:
+        flush_acks(selector, upload)
+
+
+def start_concurrent_server(host=HOST, port=PORT):
+    """
+    Server xử lý nhiều client đồng thời bằng event loop (selectors)
+    Tất cả kết nối dùng chung 1 buffer nhận được cấp phát trước,
+    vì event loop chỉ chạy trên 1 thread và dữ liệu được ghi ngay sau khi nhận
+    """
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server_socket.bind((host, port))
+    server_socket.listen(BACKLOG)
+    server_socket.setblocking(False)
+    print(f"[SERVER] Listening on {host}:{port} (concurrent mode)")
+
+    selector = selectors.DefaultSelector()
+    selector.register(server_socket, selectors.EVENT_READ, None)
+
+    # Buffer nhận dữ liệu được cấp phát 1 lần duy nhất
+    recv_buffer = bytearray(RECV_BUFFER_SIZE)
+    view = memoryview(recv_buffer)
+
+    try:
+        while True:
+            for key, mask in selector.select():
+                if key.data is None:
+                    accept_connection(selector, server_socket)
+                else:
+                    handle_upload(selector, key.data, view, mask)
+
+    except KeyboardInterrupt:
+        print("\n[SERVER] Shutting down server...")
+    finally:
+        # Đóng tất cả kết nối còn mở
+        for key in list(selector.get_map().values()):
+            if key.data is not None:
+                close_upload(selector, key.data)
+        selector.close()
+        server_socket.close()
+
+
 if __name__ == "__main__":
-    start_server()
+    parser = argparse.ArgumentParser(description="TCP file transfer server")
+    parser.add_argument('--mode', choices=['single', 'concurrent'], default='concurrent',
+                        help="single: 1 client mỗi lần, concurrent: nhiều client đồng thời")
+    parser.add_argument('--corrupt-prob', type=float, default=CORRUPT_PROB,
+                        help="Giả lập lỗi đường truyền: xác suất làm hỏng 1 đoạn dữ liệu nhận được")
+    args = parser.parse_args()
+    CORRUPT_PROB = args.corrupt_prob
+
+    if args.mode == 'single':
+        start_server()
+    else:
+        start_concurrent_server()
@@ -0,0 +1,65 @@
+import asyncio
+import grpc
+import os
+import sys
+
+# Thêm đường dẫn generated vào sys.path để import được module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'generated'))
+
+import file_transfer_pb2
+import file_transfer_pb2_grpc
+from grpc_config import grpc_options
+
+# Cấu hình kết nối đến aio server
+HOST = '127.0.0.1'
+PORT = 50052
+CHUNK_SIZE = 64 * 1024  # Kích thước mỗi chunk (64KB)
+
+def create_channel(host=HOST, port=PORT, options=None):
+    # Tạo grpc.aio channel với cấu hình flow-control từ grpc_config
+    return grpc.aio.insecure_channel(f'{host}:{port}', options=options or grpc_options())
+
+async def generate_file_chunks(filename, name, chunk_size):
+    """
+    Async generator đọc file thành các FileChunk
+    gRPC chỉ lấy chunk tiếp theo khi stream còn chỗ trong flow-control window,
+    nên client không đọc trước quá nhiều dữ liệu vào bộ nhớ
+    """
+    with open(filename, 'rb') as f:
+        while True:
+            chunk_data = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk_data:
+                break
+            yield file_transfer_pb2.FileChunk(filename=name, content=chunk_data)
+    yield file_transfer_pb2.FileChunk(filename=name, is_last=True)
+
+async def upload_file(channel, filename, name=None, chunk_size=CHUNK_SIZE):
+    """
+    Upload file qua 1 channel có sẵn (nhiều upload có thể dùng chung 1 channel)
+    name: tên file phía server, mặc định là basename của filename
+    Returns: UploadResponse
+    """
+    stub = file_transfer_pb2_grpc.FileTransferServiceStub(channel)
+    name = name or os.path.basename(filename)
+    return await stub.UploadFile(generate_file_chunks(filename, name, chunk_size))
+
+async def main(filename):
+    if not os.path.exists(filename):
+        print(f"[AIO CLIENT] Error: File '{filename}' does not exist!")
+        return
+
+    async with create_channel() as channel:
+        try:
+            print(f"[AIO CLIENT] Connecting to server {HOST}:{PORT}")
+            response = await upload_file(channel, filename)
+            if response.success:
+                print(f"[AIO CLIENT] Success: {response.message}")
+            else:
+                print(f"[AIO CLIENT] Failed: {response.message}")
+        except grpc.RpcError as e:
+            print(f"[AIO CLIENT] RPC Error: {e.code()} - {e.details()}")
+
+if __name__ == '__main__':
+    # File cần gửi
+    file_to_send = sys.argv[1] if len(sys.argv) > 1 else "test_file.txt"
+    asyncio.run(main(file_to_send))
@@ -0,0 +1,134 @@
+import asyncio
+import grpc
+import os
+import sys
+import tempfile
+
+# Thêm đường dẫn generated vào sys.path để import được module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'generated'))
+
+import file_transfer_pb2
+import file_transfer_pb2_grpc
+from chunking import SUPPORTED_COMPRESSIONS, decode_content
+from grpc_config import MAX_CONCURRENT_STREAMS, grpc_options
+
+# Cấu hình server (port khác với server.py để chạy song song được)
+HOST = '127.0.0.1'
+PORT = 50052
+
+class AsyncFileTransferServicer(file_transfer_pb2_grpc.FileTransferServiceServicer):
+    """
+    Servicer dùng grpc.aio: mọi upload chạy trên 1 event loop thay vì mỗi upload giữ 1 thread
+    Chỉ cài đặt GetCapabilities và UploadFile, các RPC khác trả về UNIMPLEMENTED
+    """
+
+    def __init__(self, output_dir=os.path.dirname(os.path.abspath(__file__))):
+        # Thư mục lưu các file nhận được
+        self.output_dir = output_dir
+
+    async def GetCapabilities(self, request, context):
+        """
+        RPC method để client biết server giải nén được những kiểu nén nào
+        """
+        return file_transfer_pb2.ServerCapabilities(compressions=SUPPORTED_COMPRESSIONS)
+
+    async def UploadFile(self, request_iterator, context):
+        """
+        RPC method để nhận file từ client (bản async của server.FileTransferServicer.UploadFile)
+        Server chỉ đọc chunk tiếp theo sau khi đã ghi xong chunk trước, nên flow-control
+        của HTTP/2 tự động làm chậm client khi đĩa ghi không kịp (backpressure)
+        """
+        filename = None
+        temp_file = None
+        total_bytes = 0
+        completed = False
+
+        try:
+            async for chunk in request_iterator:
+                if filename is None:
+                    # basename() để client không ghi được ra ngoài output_dir
+                    filename = os.path.basename(chunk.filename)
+                    if not filename:
+                        break
+                    temp_file = tempfile.NamedTemporaryFile(
+                        'wb', prefix=f".received_{filename}.", suffix='.part',
+                        dir=self.output_dir, delete=False
+                    )
+
+                # Giải nén (nếu có), ghi đĩa ở thread pool để không chặn event loop
+                data = decode_content(chunk)
+                if data:
+                    await asyncio.to_thread(temp_file.write, data)
+                    total_bytes += len(data)
+
+                if chunk.is_last:
+                    completed = True
+                    break
+
+            if not filename:
+                return file_transfer_pb2.UploadResponse(
+                    success=False,
+                    message="No filename received"
+                )
+            if not completed:
+                return file_transfer_pb2.UploadResponse(
+                    success=False,
+                    message=f"Upload of {filename} ended before the last chunk"
+                )
+
+            output_filename = f"received_{filename}"
+            temp_file.close()
+            os.replace(temp_file.name, os.path.join(self.output_dir, output_filename))
+            temp_file = None
+
+            return file_transfer_pb2.UploadResponse(
+                success=True,
+                message=f"File {filename} uploaded successfully ({total_bytes} bytes)"
+            )
+
+        except Exception as e:
+            print(f"[AIO SERVER] Error: {e}")
+            return file_transfer_pb2.UploadResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+        finally:
+            # Upload lỗi hoặc dang dở: xóa file tạm
+            if temp_file is not None:
+                temp_file.close()
+                os.remove(temp_file.name)
+
+async def create_server(host=HOST, port=PORT, servicer=None, options=None):
+    """
+    Tạo và start grpc.aio server
+    options: channel arguments, mặc định lấy từ grpc_config
+    Returns: grpc.aio.Server
+    """
+    if options is None:
+        options = grpc_options(max_concurrent_streams=MAX_CONCURRENT_STREAMS)
+
+    server = grpc.aio.server(options=options)
+    file_transfer_pb2_grpc.add_FileTransferServiceServicer_to_server(
+        servicer or AsyncFileTransferServicer(), server
+    )
+    server.add_insecure_port(f'{host}:{port}')
+    await server.start()
+    return server
+
+async def serve():
+    """
+    Khởi động grpc.aio server
+    """
+    server = await create_server()
+    print(f"[AIO SERVER] gRPC aio Server started on {HOST}:{PORT}")
+    print("[AIO SERVER] Waiting for clients...")
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(0)
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n[AIO SERVER] Shutting down server...")
@@ -0,0 +1,82 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import grpc
+
+# Thêm đường dẫn generated vào sys.path để import được module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'generated'))
+
+import file_transfer_pb2
+import file_transfer_pb2_grpc
+import server
+
+HOST = '127.0.0.1'
+PORT = 50061         # Port riêng để không đụng server đang chạy
+CHUNK_SIZE = 1024 * 1024
+
+
+def peak_rss_mb():
+    # ru_maxrss trên Linux tính bằng KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_file(path, size_mb):
+    # Tạo file test theo từng MB, không giữ cả file trong bộ nhớ
+    block = os.urandom(CHUNK_SIZE)
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def chunks(path):
+    name = os.path.basename(path)
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if not data:
+                break
+            yield file_transfer_pb2.FileChunk(filename=name, content=data, is_last=False)
+    yield file_transfer_pb2.FileChunk(filename=name, content=b'', is_last=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Upload 1 file lớn hơn nhiều so với giới hạn RSS và kiểm tra bộ nhớ đỉnh"
+    )
+    parser.add_argument('--size-mb', type=int, default=2048, help="Kích thước file upload (MB)")
+    parser.add_argument('--limit-mb', type=int, default=256, help="Mức RSS tăng thêm tối đa cho phép (MB)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, 'big_upload.bin')
+        make_file(source, args.size_mb)
+
+        grpc_server = server.create_server(HOST, PORT, server.FileTransferServicer(workdir))
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            with grpc.insecure_channel(f'{HOST}:{PORT}') as channel:
+                stub = file_transfer_pb2_grpc.FileTransferServiceStub(channel)
+                response = stub.UploadFile(chunks(source))
+        finally:
+            grpc_server.stop(0)
+        elapsed = time.perf_counter() - start
+
+        received = os.path.join(workdir, 'received_big_upload.bin')
+        size_ok = os.path.exists(received) and os.path.getsize(received) == os.path.getsize(source)
+        growth = peak_rss_mb() - baseline
+
+    print(f"Upload: {response.message}")
+    print(f"Size {args.size_mb} MB in {elapsed:.2f}s ({args.size_mb / elapsed:.1f} MB/s)")
+    print(f"Peak RSS growth: {growth:.1f} MB (limit {args.limit_mb} MB)")
+    ok = response.success and size_ok and growth < args.limit_mb
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import argparse
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import client
+
+HOST = '127.0.0.1'
+PORT = 50062         # Port riêng để không đụng server đang chạy
+STREAM_COUNTS = [1, 4, 16]
+
+# Server chạy ở process riêng để không tranh GIL với client
+SERVER_CODE = """
+import os, sys, server
+grpc_server = server.create_server(sys.argv[1], int(sys.argv[2]), server.FileTransferServicer(sys.argv[3]))
+print('ready', flush=True)
+sys.stdout = open(os.devnull, 'w')
+grpc_server.wait_for_termination()
+"""
+
+
+def make_file(path, size_mb):
+    # Tạo file test theo từng MB, không giữ cả file trong bộ nhớ
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def timed(label, size_mb, upload):
+    # Chạy 1 lần upload, bỏ qua output của client, trả về MB/s
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        ok = upload()
+    elapsed = time.perf_counter() - start
+    status = "ok" if ok is not False else "FAILED"
+    print(f"{label:<24} {elapsed:8.2f}s {size_mb / elapsed:10.1f} MB/s  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="So sánh throughput upload 1 stream và nhiều stream")
+    parser.add_argument('--size-mb', type=int, default=1024, help="Kích thước file upload (MB)")
+    args = parser.parse_args()
+
+    client.HOST, client.PORT = HOST, PORT
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, 'bench_upload.bin')
+        make_file(source, args.size_mb)
+        output_dir = os.path.join(workdir, 'out')
+        os.mkdir(output_dir)
+
+        proc = subprocess.Popen(
+            [sys.executable, '-c', SERVER_CODE, HOST, str(PORT), output_dir],
+            cwd=here, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        try:
+            if proc.stdout.readline().strip() != 'ready':
+                raise RuntimeError(f"Server failed to start on port {PORT}")
+            print(f"File size: {args.size_mb} MB")
+            timed("UploadFile (1 stream)", args.size_mb, lambda: client.upload_file(source))
+            for streams in STREAM_COUNTS:
+                timed(f"UploadRange x{streams}", args.size_mb,
+                      lambda: client.upload_file_parallel(source, streams))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == '__main__':
+    main()
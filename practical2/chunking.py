@@ -0,0 +1,90 @@
+import os
+import time
+import zlib
+
+import file_transfer_pb2
+from grpc_config import MAX_MESSAGE_SIZE
+
+MIN_CHUNK_SIZE = 16 * 1024                    # Chunk nhỏ nhất (16KB)
+MAX_CHUNK_SIZE = MAX_MESSAGE_SIZE - 64 * 1024  # Chừa chỗ cho các trường khác của FileChunk
+TARGET_CHUNK_SECONDS = 0.02                   # Mỗi chunk nên mất khoảng 20ms để gửi
+ZLIB_LEVEL = 1                                # Mức nén nhanh nhất, ưu tiên throughput
+MIN_COMPRESSION_SAVING = 0.1                  # Nén phải tiết kiệm ít nhất 10% mới dùng
+# Các kiểu nén decode_content() giải nén được, server báo cho client qua GetCapabilities
+SUPPORTED_COMPRESSIONS = [file_transfer_pb2.ZLIB]
+
+# Các định dạng đã nén sẵn, nén lại chỉ tốn CPU
+COMPRESSED_EXTENSIONS = {
+    '.gz', '.tgz', '.bz2', '.xz', '.zst', '.lz4', '.zip', '.7z', '.rar',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.mp3', '.mp4', '.mkv', '.avi', '.pdf',
+}
+
+
+class AdaptiveChunkSize:
+    """
+    Điều chỉnh kích thước chunk theo throughput đo được
+    gRPC chỉ lấy chunk tiếp theo từ generator khi đã gửi được chunk trước
+    (flow-control), nên thời gian giữa 2 lần lấy chunk phản ánh RTT và băng thông.
+    Kích thước chunk = throughput * TARGET_CHUNK_SECONDS: đường truyền càng nhanh
+    thì chunk càng lớn để overhead của mỗi message không đáng kể
+    """
+
+    def __init__(self, initial, minimum=MIN_CHUNK_SIZE, maximum=MAX_CHUNK_SIZE,
+                 target_seconds=TARGET_CHUNK_SECONDS):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.size = max(minimum, min(initial, maximum))
+        self.throughput = None  # bytes/giây, trung bình trượt (EWMA)
+        self.last_time = None
+        self.last_bytes = 0
+
+    def next_size(self):
+        # Gọi ngay trước khi đọc chunk mới: cập nhật theo thời gian gửi chunk trước
+        now = time.perf_counter()
+        if self.last_time is not None and self.last_bytes:
+            elapsed = max(now - self.last_time, 1e-6)
+            sample = self.last_bytes / elapsed
+            if self.throughput is None:
+                self.throughput = sample
+            else:
+                self.throughput = 0.7 * self.throughput + 0.3 * sample
+            target = int(self.throughput * self.target_seconds)
+            # Tăng/giảm tối đa 2 lần mỗi bước để tránh dao động
+            target = max(self.size // 2, min(target, self.size * 2))
+            self.size = max(self.minimum, min(target, self.maximum))
+        self.last_time = now
+        return self.size
+
+    def sent(self, nbytes):
+        self.last_bytes = nbytes
+
+
+def should_compress(filename):
+    # Bỏ qua file đã nén sẵn dựa vào phần mở rộng
+    return os.path.splitext(filename)[1].lower() not in COMPRESSED_EXTENSIONS
+
+
+def encode_content(data):
+    """
+    Nén chunk bằng zlib nếu có lợi
+    Returns: (content, compression)
+    """
+    compressed = zlib.compress(data, ZLIB_LEVEL)
+    if len(compressed) <= len(data) * (1 - MIN_COMPRESSION_SAVING):
+        return compressed, file_transfer_pb2.ZLIB
+    return data, file_transfer_pb2.NONE
+
+
+def decode_content(chunk):
+    # Giải nén nội dung chunk theo trường compression (phía server)
+    if chunk.compression == file_transfer_pb2.NONE:
+        return chunk.content
+    if chunk.compression == file_transfer_pb2.ZLIB:
+        # Giới hạn kích thước sau giải nén để không bị "zip bomb"
+        decompressor = zlib.decompressobj()
+        data = decompressor.decompress(chunk.content, MAX_MESSAGE_SIZE)
+        if decompressor.unconsumed_tail or not decompressor.eof:
+            raise ValueError("Compressed chunk is too large or truncated")
+        return data
+    raise ValueError(f"Unsupported compression {chunk.compression}")
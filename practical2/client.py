@@ -1,22 +1,40 @@
 import grpc
+from concurrent import futures
 import os
 import sys
+import tempfile
+import uuid
 
 # Thêm đường dẫn generated vào sys.path để import được module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'generated'))
+# Kiểm tra toàn vẹn dùng chung với practical1 (thêm vào cuối để không che client/server của practical2)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'practical1'))
 
 import file_transfer_pb2
 import file_transfer_pb2_grpc
+from chunking import AdaptiveChunkSize, encode_content, should_compress
+from grpc_config import grpc_options
+from integrity import DEFAULT_ALGORITHM, VERIFY_BLOCK_SIZE, BlockHasher, block_range
+from resumable import BLOCK_SIZE, block_hash
 
 # Cấu hình kết nối đến server
 HOST = '127.0.0.1'
 PORT = 50051
-CHUNK_SIZE = 4096  # Kích thước mỗi chunk (4KB)
+CHUNK_SIZE = 64 * 1024  # Kích thước chunk ban đầu (64KB), sau đó tự điều chỉnh
+MAX_INCOMPRESSIBLE_CHUNKS = 4  # Dừng nén sau số chunk liên tiếp nén không có lợi
+RANGE_CHUNK_SIZE = 1024 * 1024  # Kích thước chunk khi upload song song (1MB, < 4MB max message)
+NUM_STREAMS = 4    # Số stream song song mặc định
+MAX_RETRIES = 3    # Số lần thử lại upload resumable khi kết nối lỗi
+CHECKSUM = DEFAULT_ALGORITHM  # Digest từng block của UploadFile ('crc32' hoặc 'blake2b')
 
-def generate_file_chunks(filename):
+def generate_file_chunks(filename, progress=None, compress=False, adaptive=True):
     """
     Generator function để đọc file và tạo stream các FileChunk
     Đây là client-side streaming - client gửi nhiều messages đến server
+    progress: callback progress(sent_bytes, file_size), gọi sau mỗi chunk
+    compress: nén từng chunk bằng zlib (tự bỏ qua dữ liệu đã nén sẵn)
+    adaptive: tự điều chỉnh kích thước chunk theo throughput đo được
+    Digest của từng block được tính ngay trên dữ liệu vừa đọc và gửi ở chunk cuối
     """
     # Kiểm tra file có tồn tại không
     if not os.path.exists(filename):
@@ -27,62 +45,379 @@ def generate_file_chunks(filename):
     file_size = os.path.getsize(filename)
     print(f"[CLIENT] Preparing to send file: {file_basename} ({file_size} bytes)")
     
+    chunk_size = AdaptiveChunkSize(CHUNK_SIZE)
+    compress = compress and should_compress(filename)
+    incompressible = 0  # Số chunk liên tiếp nén không có lợi
+    sent_bytes = 0
+    hasher = BlockHasher(VERIFY_BLOCK_SIZE, CHECKSUM)
+    # Thuật toán digest được báo ở chunk đầu tiên để server hash ngay khi nhận
+    verify = {'verify_block_size': VERIFY_BLOCK_SIZE, 'checksum': CHECKSUM}
+    
     # Đọc file theo chunks và yield từng chunk
     with open(filename, 'rb') as f:
-        chunk_number = 0
         while True:
             # Đọc một chunk dữ liệu
-            chunk_data = f.read(CHUNK_SIZE)
+            chunk_data = f.read(chunk_size.next_size() if adaptive else CHUNK_SIZE)
             
             if not chunk_data:
                 # Hết dữ liệu, gửi chunk cuối cùng (empty) với flag is_last=True
                 yield file_transfer_pb2.FileChunk(
                     filename=file_basename,
                     content=b'',
-                    is_last=True
+                    is_last=True,
+                    block_digests=hasher.finish(),
+                    **verify
                 )
                 break
             
-            chunk_number += 1
-            print(f"[CLIENT] Sending chunk {chunk_number} ({len(chunk_data)} bytes)")
+            hasher.update(chunk_data)
+            content, compression = chunk_data, file_transfer_pb2.NONE
+            if compress:
+                content, compression = encode_content(chunk_data)
+                incompressible = incompressible + 1 if compression == file_transfer_pb2.NONE else 0
+                if incompressible >= MAX_INCOMPRESSIBLE_CHUNKS:
+                    # Dữ liệu có vẻ đã nén sẵn: dừng nén để tiết kiệm CPU
+                    compress = False
             
             # Tạo FileChunk message và yield
             yield file_transfer_pb2.FileChunk(
                 filename=file_basename,
-                content=chunk_data,
-                is_last=False
+                content=content,
+                is_last=False,
+                compression=compression,
+                **verify
             )
+            verify = {}
+            chunk_size.sent(len(content))
+            sent_bytes += len(chunk_data)
+            if progress is not None:
+                progress(sent_bytes, file_size)
+
+def make_progress_printer(step=10):
+    # Tạo progress callback chỉ in khi tiến độ tăng thêm `step` phần trăm
+    last = {'percent': -step}
+    def progress(sent_bytes, file_size):
+        percent = 100 * sent_bytes // file_size if file_size else 100
+        if percent - last['percent'] >= step or sent_bytes == file_size:
+            last['percent'] = percent
+            print(f"[CLIENT] Sent {sent_bytes}/{file_size} bytes ({percent}%)")
+    return progress
 
-def upload_file(filename):
+def server_supports(stub, compression):
+    # Hỏi server có giải nén được kiểu nén này không; server cũ chưa có GetCapabilities => không nén
+    try:
+        capabilities = stub.GetCapabilities(file_transfer_pb2.CapabilitiesRequest())
+    except grpc.RpcError as e:
+        if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+            raise
+        return False
+    return compression in capabilities.compressions
+
+def upload_file(filename, progress=None, compress=False, adaptive=True):
     """
     Upload file đến server sử dụng gRPC
+    progress: callback progress(sent_bytes, file_size), None để không in tiến độ
+    compress: nén các chunk bằng zlib (chỉ khi server báo hỗ trợ)
+    adaptive: False để giữ cố định chunk CHUNK_SIZE (dùng khi benchmark theo chunk size)
+    Returns: True nếu server nhận file thành công
     """
     # Tạo gRPC channel để kết nối đến server
     # insecure_channel: kết nối không mã hóa (cho development)
-    with grpc.insecure_channel(f'{HOST}:{PORT}') as channel:
+    with grpc.insecure_channel(f'{HOST}:{PORT}', options=grpc_options()) as channel:
         # Tạo stub (client) từ channel
         # Stub cung cấp các RPC methods để gọi
         stub = file_transfer_pb2_grpc.FileTransferServiceStub(channel)
         
         try:
             print(f"[CLIENT] Connecting to server {HOST}:{PORT}")
+            if compress and not server_supports(stub, file_transfer_pb2.ZLIB):
+                print("[CLIENT] Server does not support zlib, sending uncompressed")
+                compress = False
             
             # Gọi RPC method UploadFile với stream chunks
             # generate_file_chunks() trả về iterator của FileChunk messages
-            response = stub.UploadFile(generate_file_chunks(filename))
+            response = stub.UploadFile(generate_file_chunks(filename, progress, compress, adaptive))
+            
+            # Server báo block hỏng: chỉ gửi lại các block đó (server giới hạn số lần gửi lại)
+            while not response.success and response.corrupt_blocks:
+                print(f"[CLIENT] Resending {len(response.corrupt_blocks)} corrupt block(s)")
+                response = stub.RepairUpload(
+                    generate_repair_chunks(filename, response.upload_id, response.corrupt_blocks)
+                )
             
             # Xử lý response từ server
             if response.success:
                 print(f"[CLIENT] Success: {response.message}")
             else:
                 print(f"[CLIENT] Failed: {response.message}")
+            return response.success
                 
         except grpc.RpcError as e:
             print(f"[CLIENT] RPC Error: {e.code()} - {e.details()}")
         except Exception as e:
             print(f"[CLIENT] Error: {e}")
+        return False
+
+def generate_repair_chunks(filename, upload_id, blocks):
+    # Mỗi block hỏng là 1 FileChunk, đọc lại từ file nguồn bằng pread()
+    file_size = os.path.getsize(filename)
+    with open(filename, 'rb') as f:
+        for i, index in enumerate(blocks):
+            offset, length = block_range(index, file_size, VERIFY_BLOCK_SIZE)
+            yield file_transfer_pb2.FileChunk(
+                upload_id=upload_id,
+                offset=offset,
+                content=os.pread(f.fileno(), length, offset),
+                is_last=i == len(blocks) - 1
+            )
+
+def generate_range_chunks(filename, upload_id, offset, length, file_size):
+    """
+    Generator đọc 1 byte-range [offset, offset + length) của file thành các FileChunk
+    Mỗi chunk mang offset tuyệt đối để server ghi thẳng vào đúng vị trí
+    """
+    file_basename = os.path.basename(filename)
+    end = offset + length
+    with open(filename, 'rb') as f:
+        position = offset
+        while True:
+            chunk_data = os.pread(f.fileno(), min(RANGE_CHUNK_SIZE, end - position), position)
+            yield file_transfer_pb2.FileChunk(
+                filename=file_basename,
+                content=chunk_data,
+                is_last=position + len(chunk_data) >= end or not chunk_data,
+                upload_id=upload_id,
+                offset=position,
+                length=length,
+                file_size=file_size
+            )
+            position += len(chunk_data)
+            if position >= end or not chunk_data:
+                break
+
+def split_ranges(file_size, num_streams):
+    # Chia file thành num_streams range liên tiếp có kích thước gần bằng nhau
+    range_size = -(-file_size // num_streams) or 1
+    return [(offset, min(range_size, file_size - offset))
+            for offset in range(0, file_size, range_size)] or [(0, 0)]
+
+def upload_range(filename, upload_id, offset, length, file_size):
+    # Mỗi range dùng 1 channel riêng (1 kết nối TCP riêng) để không bị giới hạn
+    # bởi flow-control window của 1 kết nối HTTP/2
+    options = grpc_options() + [('grpc.use_local_subchannel_pool', 1)]
+    with grpc.insecure_channel(f'{HOST}:{PORT}', options=options) as channel:
+        stub = file_transfer_pb2_grpc.FileTransferServiceStub(channel)
+        return stub.UploadRange(generate_range_chunks(filename, upload_id, offset, length, file_size))
+
+def upload_file_parallel(filename, num_streams=NUM_STREAMS):
+    """
+    Upload file bằng nhiều stream song song, mỗi stream gửi 1 byte-range
+    Server ghi các range bằng pwrite() vào file đã cấp phát trước
+    Returns: True nếu upload thành công
+    """
+    if not os.path.exists(filename):
+        print(f"[CLIENT] Error: File '{filename}' does not exist!")
+        return False
+    
+    file_size = os.path.getsize(filename)
+    upload_id = uuid.uuid4().hex
+    ranges = split_ranges(file_size, num_streams)
+    print(f"[CLIENT] Uploading {os.path.basename(filename)} ({file_size} bytes) "
+          f"on {len(ranges)} streams")
+    
+    try:
+        with futures.ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            results = list(executor.map(
+                lambda r: upload_range(filename, upload_id, r[0], r[1], file_size), ranges
+            ))
+        failed = [r.message for r in results if not r.success]
+        if failed:
+            print(f"[CLIENT] Failed: {failed[0]}")
+            return False
+        
+        # Tất cả range đã xong => yêu cầu server ghép file
+        with grpc.insecure_channel(f'{HOST}:{PORT}', options=grpc_options()) as channel:
+            stub = file_transfer_pb2_grpc.FileTransferServiceStub(channel)
+            response = stub.CompleteUpload(file_transfer_pb2.UploadSession(
+                upload_id=upload_id,
+                filename=os.path.basename(filename),
+                file_size=file_size
+            ))
+        if response.success:
+            print(f"[CLIENT] Success: {response.message}")
+        else:
+            print(f"[CLIENT] Failed: {response.message}")
+        return response.success
+    
+    except grpc.RpcError as e:
+        print(f"[CLIENT] RPC Error: {e.code()} - {e.details()}")
+        return False
+
+def compute_block_hashes(filename, block_size=BLOCK_SIZE):
+    # Hash từng block của file (1 lần đọc tuần tự)
+    hashes = []
+    with open(filename, 'rb') as f:
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            hashes.append(block_hash(data))
+    return hashes
+
+def generate_block_chunks(filename, upload_id, blocks, block_size):
+    # Generator đọc các block được yêu cầu, mỗi FileChunk là đúng 1 block
+    file_basename = os.path.basename(filename)
+    with open(filename, 'rb') as f:
+        for index in blocks:
+            offset = index * block_size
+            yield file_transfer_pb2.FileChunk(
+                filename=file_basename,
+                content=os.pread(f.fileno(), block_size, offset),
+                upload_id=upload_id,
+                offset=offset
+            )
+    yield file_transfer_pb2.FileChunk(filename=file_basename, upload_id=upload_id, is_last=True)
+
+def query_upload_status(upload_id):
+    # Hỏi server trạng thái của 1 upload resumable
+    with grpc.insecure_channel(f'{HOST}:{PORT}', options=grpc_options()) as channel:
+        stub = file_transfer_pb2_grpc.FileTransferServiceStub(channel)
+        return stub.QueryUploadStatus(file_transfer_pb2.UploadStatusRequest(upload_id=upload_id))
+
+def upload_file_resumable(filename, block_size=BLOCK_SIZE, num_streams=1):
+    """
+    Upload file có thể tiếp tục khi bị ngắt và không gửi lại block server đã có
+    1. Gửi hash của từng block (StartUpload), server trả về các block còn thiếu
+    2. Chỉ gửi các block đó (UploadBlocks), chia cho num_streams stream song song
+    3. CompleteUpload để server ghép file
+    Nếu kết nối lỗi, gọi lại StartUpload sẽ tiếp tục từ những block server đã ghi
+    Returns: True nếu upload thành công
+    """
+    if not os.path.exists(filename):
+        print(f"[CLIENT] Error: File '{filename}' does not exist!")
+        return False
+    
+    file_basename = os.path.basename(filename)
+    file_size = os.path.getsize(filename)
+    hashes = compute_block_hashes(filename, block_size)
+    
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            with grpc.insecure_channel(f'{HOST}:{PORT}', options=grpc_options()) as channel:
+                stub = file_transfer_pb2_grpc.FileTransferServiceStub(channel)
+                status = stub.StartUpload(file_transfer_pb2.StartUploadRequest(
+                    filename=file_basename,
+                    file_size=file_size,
+                    block_size=block_size,
+                    block_hashes=hashes
+                ))
+                missing = list(status.missing_blocks)
+                print(f"[CLIENT] Upload {status.upload_id}: sending {len(missing)}/{len(hashes)} blocks "
+                      f"(resume from {status.committed_offset} bytes, {status.reused_blocks} deduplicated)")
+                
+                # Chia các block còn thiếu cho các stream (xen kẽ)
+                groups = [missing[i::num_streams] for i in range(num_streams) if missing[i::num_streams]]
+                with futures.ThreadPoolExecutor(max_workers=max(1, len(groups))) as executor:
+                    results = list(executor.map(
+                        lambda group: stub.UploadBlocks(
+                            generate_block_chunks(filename, status.upload_id, group, block_size)
+                        ),
+                        groups
+                    ))
+                failed = [r.message for r in results if not r.success]
+                if failed:
+                    print(f"[CLIENT] Failed: {failed[0]}")
+                    return False
+                
+                response = stub.CompleteUpload(file_transfer_pb2.UploadSession(
+                    upload_id=status.upload_id,
+                    filename=file_basename,
+                    file_size=file_size
+                ))
+            if response.success:
+                print(f"[CLIENT] Success: {response.message}")
+            else:
+                print(f"[CLIENT] Failed: {response.message}")
+            return response.success
+        
+        except grpc.RpcError as e:
+            print(f"[CLIENT] RPC Error (attempt {attempt}/{MAX_RETRIES}): {e.code()} - {e.details()}")
+    return False
+
+def download_file(filename, dest_path=None, offset=0, length=0, address=None):
+    """
+    Tải file từ server (server streaming)
+    offset/length: chỉ tải 1 byte-range (length=0: đến hết file); range được ghi vào
+    đúng vị trí trong dest_path, tải cả file thì ghi ra file tạm rồi đổi tên (atomic)
+    address: host:port của server (mặc định HOST:PORT)
+    Returns: True nếu tải thành công
+    """
+    dest_path = dest_path or os.path.basename(filename)
+    whole_file = offset == 0 and length == 0
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    temp_path = None
+    
+    try:
+        if whole_file:
+            fd, temp_path = tempfile.mkstemp(prefix='.download_', suffix='.part', dir=dest_dir)
+        else:
+            fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT)
+        
+        received = 0
+        try:
+            with grpc.insecure_channel(address or f'{HOST}:{PORT}', options=grpc_options()) as channel:
+                stub = file_transfer_pb2_grpc.FileTransferServiceStub(channel)
+                request = file_transfer_pb2.DownloadRequest(filename=filename, offset=offset, length=length)
+                for chunk in stub.DownloadFile(request):
+                    if chunk.content:
+                        os.pwrite(fd, chunk.content, chunk.offset)
+                        received += len(chunk.content)
+                    if chunk.is_last:
+                        break
+        finally:
+            os.close(fd)
+        
+        if temp_path is not None:
+            os.replace(temp_path, dest_path)
+            temp_path = None
+        print(f"[CLIENT] Downloaded {filename} -> {dest_path} ({received} bytes)")
+        return True
+    
+    except grpc.RpcError as e:
+        print(f"[CLIENT] RPC Error: {e.code()} - {e.details()}")
+        return False
+    finally:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def list_files(prefix=''):
+    # Lấy danh sách file (tên, size, mtime) trên server
+    with grpc.insecure_channel(f'{HOST}:{PORT}', options=grpc_options()) as channel:
+        stub = file_transfer_pb2_grpc.FileTransferServiceStub(channel)
+        return list(stub.ListFiles(file_transfer_pb2.ListFilesRequest(prefix=prefix)).files)
+
+def sync_files(dest_dir, prefix=''):
+    """
+    Đồng bộ các file trên server về dest_dir
+    Chỉ tải file chưa có hoặc có size/mtime khác bản local; sau khi tải, mtime local
+    được đặt bằng mtime trên server để lần sync sau nhận ra file không đổi
+    Returns: số file đã tải
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    downloaded = 0
+    for info in list_files(prefix):
+        local_path = os.path.join(dest_dir, info.filename)
+        if os.path.exists(local_path):
+            st = os.stat(local_path)
+            if st.st_size == info.size and st.st_mtime_ns == info.mtime_ns:
+                continue
+        if download_file(info.filename, local_path):
+            os.utime(local_path, ns=(info.mtime_ns, info.mtime_ns))
+            downloaded += 1
+    print(f"[CLIENT] Synced {dest_dir}: {downloaded} file(s) downloaded")
+    return downloaded
 
 if __name__ == '__main__':
     # File cần gửi
     file_to_send = "test_file.txt"
-    upload_file(file_to_send)
+    upload_file(file_to_send, progress=make_progress_printer())
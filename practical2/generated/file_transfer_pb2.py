@@ -24,17 +24,39 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13\x66ile_transfer.proto\x12\x0c\x66iletransfer\"?\n\tFileChunk\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\x0c\x12\x0f\n\x07is_last\x18\x03 \x01(\x08\"2\n\x0eUploadResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\\\n\x13\x46ileTransferService\x12\x45\n\nUploadFile\x12\x17.filetransfer.FileChunk\x1a\x1c.filetransfer.UploadResponse(\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13\x66ile_transfer.proto\x12\x0c\x66iletransfer\"\xf9\x01\n\tFileChunk\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\x0c\x12\x0f\n\x07is_last\x18\x03 \x01(\x08\x12\x11\n\tupload_id\x18\x04 \x01(\t\x12\x0e\n\x06offset\x18\x05 \x01(\x04\x12\x0e\n\x06length\x18\x06 \x01(\x04\x12\x11\n\tfile_size\x18\x07 \x01(\x04\x12.\n\x0b\x63ompression\x18\x08 \x01(\x0e\x32\x19.filetransfer.Compression\x12\x19\n\x11verify_block_size\x18\t \x01(\r\x12\x10\n\x08\x63hecksum\x18\n \x01(\t\x12\x15\n\rblock_digests\x18\x0b \x03(\x0c\"]\n\x0eUploadResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\tupload_id\x18\x03 \x01(\t\x12\x16\n\x0e\x63orrupt_blocks\x18\x04 \x03(\r\"\x15\n\x13\x43\x61pabilitiesRequest\"E\n\x12ServerCapabilities\x12/\n\x0c\x63ompressions\x18\x01 \x03(\x0e\x32\x19.filetransfer.Compression\"G\n\rUploadSession\x12\x11\n\tupload_id\x18\x01 \x01(\t\x12\x10\n\x08\x66ilename\x18\x02 \x01(\t\x12\x11\n\tfile_size\x18\x03 \x01(\x04\"c\n\x12StartUploadRequest\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x11\n\tfile_size\x18\x02 \x01(\x04\x12\x12\n\nblock_size\x18\x03 \x01(\r\x12\x14\n\x0c\x62lock_hashes\x18\x04 \x03(\x0c\"(\n\x13UploadStatusRequest\x12\x11\n\tupload_id\x18\x01 \x01(\t\"j\n\x0cUploadStatus\x12\x11\n\tupload_id\x18\x01 \x01(\t\x12\x18\n\x10\x63ommitted_offset\x18\x02 \x01(\x04\x12\x16\n\x0emissing_blocks\x18\x03 \x03(\r\x12\x15\n\rreused_blocks\x18\x04 \x01(\r\"W\n\x0f\x44ownloadRequest\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x04\x12\x0e\n\x06length\x18\x03 \x01(\x04\x12\x12\n\nchunk_size\x18\x04 \x01(\r\"\"\n\x10ListFilesRequest\x12\x0e\n\x06prefix\x18\x01 \x01(\t\"<\n\x08\x46ileInfo\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x04\x12\x10\n\x08mtime_ns\x18\x03 \x01(\x03\"1\n\x08\x46ileList\x12%\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x16.filetransfer.FileInfo*!\n\x0b\x43ompression\x12\x08\n\x04NONE\x10\x00\x12\x08\n\x04ZLIB\x10\x01\x32\x8b\x06\n\x13\x46ileTransferService\x12V\n\x0fGetCapabilities\x12!.filetransfer.CapabilitiesRequest\x1a .filetransfer.ServerCapabilities\x12\x45\n\nUploadFile\x12\x17.filetransfer.FileChunk\x1a\x1c.filetransfer.UploadResponse(\x01\x12G\n\x0cRepairUpload\x12\x17.filetransfer.FileChunk\x1a\x1c.filetransfer.UploadResponse(\x01\x12\x46\n\x0bUploadRange\x12\x17.filetransfer.FileChunk\x1a\x1c.filetransfer.UploadResponse(\x01\x12K\n\x0e\x43ompleteUpload\x12\x1b.filetransfer.UploadSession\x1a\x1c.filetransfer.UploadResponse\x12K\n\x0bStartUpload\x12 .filetransfer.StartUploadRequest\x1a\x1a.filetransfer.UploadStatus\x12R\n\x11QueryUploadStatus\x12!.filetransfer.UploadStatusRequest\x1a\x1a.filetransfer.UploadStatus\x12G\n\x0cUploadBlocks\x12\x17.filetransfer.FileChunk\x1a\x1c.filetransfer.UploadResponse(\x01\x12H\n\x0c\x44ownloadFile\x12\x1d.filetransfer.DownloadRequest\x1a\x17.filetransfer.FileChunk0\x01\x12\x43\n\tListFiles\x12\x1e.filetransfer.ListFilesRequest\x1a\x16.filetransfer.FileListb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'file_transfer_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_FILECHUNK']._serialized_start=37
-  _globals['_FILECHUNK']._serialized_end=100
-  _globals['_UPLOADRESPONSE']._serialized_start=102
-  _globals['_UPLOADRESPONSE']._serialized_end=152
-  _globals['_FILETRANSFERSERVICE']._serialized_start=154
-  _globals['_FILETRANSFERSERVICE']._serialized_end=246
+  _globals['_COMPRESSION']._serialized_start=1040
+  _globals['_COMPRESSION']._serialized_end=1073
+  _globals['_FILECHUNK']._serialized_start=38
+  _globals['_FILECHUNK']._serialized_end=287
+  _globals['_UPLOADRESPONSE']._serialized_start=289
+  _globals['_UPLOADRESPONSE']._serialized_end=382
+  _globals['_CAPABILITIESREQUEST']._serialized_start=384
+  _globals['_CAPABILITIESREQUEST']._serialized_end=405
+  _globals['_SERVERCAPABILITIES']._serialized_start=407
+  _globals['_SERVERCAPABILITIES']._serialized_end=476
+  _globals['_UPLOADSESSION']._serialized_start=478
+  _globals['_UPLOADSESSION']._serialized_end=549
+  _globals['_STARTUPLOADREQUEST']._serialized_start=551
+  _globals['_STARTUPLOADREQUEST']._serialized_end=650
+  _globals['_UPLOADSTATUSREQUEST']._serialized_start=652
+  _globals['_UPLOADSTATUSREQUEST']._serialized_end=692
+  _globals['_UPLOADSTATUS']._serialized_start=694
+  _globals['_UPLOADSTATUS']._serialized_end=800
+  _globals['_DOWNLOADREQUEST']._serialized_start=802
+  _globals['_DOWNLOADREQUEST']._serialized_end=889
+  _globals['_LISTFILESREQUEST']._serialized_start=891
+  _globals['_LISTFILESREQUEST']._serialized_end=925
+  _globals['_FILEINFO']._serialized_start=927
+  _globals['_FILEINFO']._serialized_end=987
+  _globals['_FILELIST']._serialized_start=989
+  _globals['_FILELIST']._serialized_end=1038
+  _globals['_FILETRANSFERSERVICE']._serialized_start=1076
+  _globals['_FILETRANSFERSERVICE']._serialized_end=1855
 # @@protoc_insertion_point(module_scope)
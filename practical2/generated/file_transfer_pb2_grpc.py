@@ -35,17 +35,69 @@ class FileTransferServiceStub(object):
         Args:
             channel: A grpc.Channel.
         """
+        self.GetCapabilities = channel.unary_unary(
+                '/filetransfer.FileTransferService/GetCapabilities',
+                request_serializer=file__transfer__pb2.CapabilitiesRequest.SerializeToString,
+                response_deserializer=file__transfer__pb2.ServerCapabilities.FromString,
+                _registered_method=True)
         self.UploadFile = channel.stream_unary(
                 '/filetransfer.FileTransferService/UploadFile',
                 request_serializer=file__transfer__pb2.FileChunk.SerializeToString,
                 response_deserializer=file__transfer__pb2.UploadResponse.FromString,
                 _registered_method=True)
+        self.RepairUpload = channel.stream_unary(
+                '/filetransfer.FileTransferService/RepairUpload',
+                request_serializer=file__transfer__pb2.FileChunk.SerializeToString,
+                response_deserializer=file__transfer__pb2.UploadResponse.FromString,
+                _registered_method=True)
+        self.UploadRange = channel.stream_unary(
+                '/filetransfer.FileTransferService/UploadRange',
+                request_serializer=file__transfer__pb2.FileChunk.SerializeToString,
+                response_deserializer=file__transfer__pb2.UploadResponse.FromString,
+                _registered_method=True)
+        self.CompleteUpload = channel.unary_unary(
+                '/filetransfer.FileTransferService/CompleteUpload',
+                request_serializer=file__transfer__pb2.UploadSession.SerializeToString,
+                response_deserializer=file__transfer__pb2.UploadResponse.FromString,
+                _registered_method=True)
+        self.StartUpload = channel.unary_unary(
+                '/filetransfer.FileTransferService/StartUpload',
+                request_serializer=file__transfer__pb2.StartUploadRequest.SerializeToString,
+                response_deserializer=file__transfer__pb2.UploadStatus.FromString,
+                _registered_method=True)
+        self.QueryUploadStatus = channel.unary_unary(
+                '/filetransfer.FileTransferService/QueryUploadStatus',
+                request_serializer=file__transfer__pb2.UploadStatusRequest.SerializeToString,
+                response_deserializer=file__transfer__pb2.UploadStatus.FromString,
+                _registered_method=True)
+        self.UploadBlocks = channel.stream_unary(
+                '/filetransfer.FileTransferService/UploadBlocks',
+                request_serializer=file__transfer__pb2.FileChunk.SerializeToString,
+                response_deserializer=file__transfer__pb2.UploadResponse.FromString,
+                _registered_method=True)
+        self.DownloadFile = channel.unary_stream(
+                '/filetransfer.FileTransferService/DownloadFile',
+                request_serializer=file__transfer__pb2.DownloadRequest.SerializeToString,
+                response_deserializer=file__transfer__pb2.FileChunk.FromString,
+                _registered_method=True)
+        self.ListFiles = channel.unary_unary(
+                '/filetransfer.FileTransferService/ListFiles',
+                request_serializer=file__transfer__pb2.ListFilesRequest.SerializeToString,
+                response_deserializer=file__transfer__pb2.FileList.FromString,
+                _registered_method=True)
 
 
 class FileTransferServiceServicer(object):
     """Service định nghĩa RPC methods
     """
 
+    def GetCapabilities(self, request, context):
+        """RPC method để client hỏi server hỗ trợ những kiểu nén nào trước khi upload
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def UploadFile(self, request_iterator, context):
         """RPC method để upload file (client streaming)
         """
@@ -53,14 +105,115 @@ class FileTransferServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def RepairUpload(self, request_iterator, context):
+        """RPC method để gửi lại các block bị hỏng của 1 UploadFile, mỗi FileChunk là đúng 1 block
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UploadRange(self, request_iterator, context):
+        """RPC method để upload 1 byte-range của file, nhiều stream chạy song song
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CompleteUpload(self, request, context):
+        """RPC method để hoàn tất phiên upload song song (ghép file)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StartUpload(self, request, context):
+        """RPC method để bắt đầu hoặc tiếp tục upload resumable, trả về các block còn thiếu
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def QueryUploadStatus(self, request, context):
+        """RPC method để xem trạng thái của 1 upload resumable
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UploadBlocks(self, request_iterator, context):
+        """RPC method để gửi các block còn thiếu, mỗi FileChunk là đúng 1 block
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DownloadFile(self, request, context):
+        """RPC method để tải file (server streaming), có thể chỉ tải 1 byte-range
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListFiles(self, request, context):
+        """RPC method để liệt kê các file đã nhận kèm kích thước và thời điểm sửa đổi
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_FileTransferServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
+            'GetCapabilities': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetCapabilities,
+                    request_deserializer=file__transfer__pb2.CapabilitiesRequest.FromString,
+                    response_serializer=file__transfer__pb2.ServerCapabilities.SerializeToString,
+            ),
             'UploadFile': grpc.stream_unary_rpc_method_handler(
                     servicer.UploadFile,
                     request_deserializer=file__transfer__pb2.FileChunk.FromString,
                     response_serializer=file__transfer__pb2.UploadResponse.SerializeToString,
             ),
+            'RepairUpload': grpc.stream_unary_rpc_method_handler(
+                    servicer.RepairUpload,
+                    request_deserializer=file__transfer__pb2.FileChunk.FromString,
+                    response_serializer=file__transfer__pb2.UploadResponse.SerializeToString,
+            ),
+            'UploadRange': grpc.stream_unary_rpc_method_handler(
+                    servicer.UploadRange,
+                    request_deserializer=file__transfer__pb2.FileChunk.FromString,
+                    response_serializer=file__transfer__pb2.UploadResponse.SerializeToString,
+            ),
+            'CompleteUpload': grpc.unary_unary_rpc_method_handler(
+                    servicer.CompleteUpload,
+                    request_deserializer=file__transfer__pb2.UploadSession.FromString,
+                    response_serializer=file__transfer__pb2.UploadResponse.SerializeToString,
+            ),
+            'StartUpload': grpc.unary_unary_rpc_method_handler(
+                    servicer.StartUpload,
+                    request_deserializer=file__transfer__pb2.StartUploadRequest.FromString,
+                    response_serializer=file__transfer__pb2.UploadStatus.SerializeToString,
+            ),
+            'QueryUploadStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.QueryUploadStatus,
+                    request_deserializer=file__transfer__pb2.UploadStatusRequest.FromString,
+                    response_serializer=file__transfer__pb2.UploadStatus.SerializeToString,
+            ),
+            'UploadBlocks': grpc.stream_unary_rpc_method_handler(
+                    servicer.UploadBlocks,
+                    request_deserializer=file__transfer__pb2.FileChunk.FromString,
+                    response_serializer=file__transfer__pb2.UploadResponse.SerializeToString,
+            ),
+            'DownloadFile': grpc.unary_stream_rpc_method_handler(
+                    servicer.DownloadFile,
+                    request_deserializer=file__transfer__pb2.DownloadRequest.FromString,
+                    response_serializer=file__transfer__pb2.FileChunk.SerializeToString,
+            ),
+            'ListFiles': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListFiles,
+                    request_deserializer=file__transfer__pb2.ListFilesRequest.FromString,
+                    response_serializer=file__transfer__pb2.FileList.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'filetransfer.FileTransferService', rpc_method_handlers)
@@ -73,6 +226,33 @@ class FileTransferService(object):
     """Service định nghĩa RPC methods
     """
 
+    @staticmethod
+    def GetCapabilities(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/filetransfer.FileTransferService/GetCapabilities',
+            file__transfer__pb2.CapabilitiesRequest.SerializeToString,
+            file__transfer__pb2.ServerCapabilities.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def UploadFile(request_iterator,
             target,
@@ -99,3 +279,219 @@ class FileTransferService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def RepairUpload(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/filetransfer.FileTransferService/RepairUpload',
+            file__transfer__pb2.FileChunk.SerializeToString,
+            file__transfer__pb2.UploadResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UploadRange(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/filetransfer.FileTransferService/UploadRange',
+            file__transfer__pb2.FileChunk.SerializeToString,
+            file__transfer__pb2.UploadResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CompleteUpload(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/filetransfer.FileTransferService/CompleteUpload',
+            file__transfer__pb2.UploadSession.SerializeToString,
+            file__transfer__pb2.UploadResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StartUpload(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/filetransfer.FileTransferService/StartUpload',
+            file__transfer__pb2.StartUploadRequest.SerializeToString,
+            file__transfer__pb2.UploadStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def QueryUploadStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/filetransfer.FileTransferService/QueryUploadStatus',
+            file__transfer__pb2.UploadStatusRequest.SerializeToString,
+            file__transfer__pb2.UploadStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UploadBlocks(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/filetransfer.FileTransferService/UploadBlocks',
+            file__transfer__pb2.FileChunk.SerializeToString,
+            file__transfer__pb2.UploadResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DownloadFile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/filetransfer.FileTransferService/DownloadFile',
+            file__transfer__pb2.DownloadRequest.SerializeToString,
+            file__transfer__pb2.FileChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListFiles(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/filetransfer.FileTransferService/ListFiles',
+            file__transfer__pb2.ListFilesRequest.SerializeToString,
+            file__transfer__pb2.FileList.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: mapreduce.proto
+# Protobuf Python Version: 6.31.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    31,
+    1,
+    '',
+    'mapreduce.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0fmapreduce.proto\x12\tmapreduce\"0\n\nWorkerInfo\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\"1\n\x05Split\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\r\n\x05start\x18\x02 \x01(\x04\x12\x0b\n\x03\x65nd\x18\x03 \x01(\x04\"H\n\x11PartitionLocation\x12\x10\n\x08map_task\x18\x01 \x01(\x05\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x12\x10\n\x08\x66ilename\x18\x03 \x01(\t\"\xd1\x01\n\x04Task\x12!\n\x04kind\x18\x01 \x01(\x0e\x32\x13.mapreduce.TaskKind\x12\x0f\n\x07task_id\x18\x02 \x01(\x05\x12\x0f\n\x07\x61ttempt\x18\x03 \x01(\x05\x12\x0b\n\x03job\x18\x04 \x01(\t\x12\x14\n\x0cnum_reducers\x18\x05 \x01(\x05\x12\x1f\n\x05split\x18\x06 \x01(\x0b\x32\x10.mapreduce.Split\x12,\n\x06inputs\x18\x07 \x03(\x0b\x32\x1c.mapreduce.PartitionLocation\x12\x12\n\noutput_dir\x18\x08 \x01(\t\"\xc2\x01\n\nTaskReport\x12\x11\n\tworker_id\x18\x01 \x01(\t\x12!\n\x04kind\x18\x02 \x01(\x0e\x32\x13.mapreduce.TaskKind\x12\x0f\n\x07task_id\x18\x03 \x01(\x05\x12\x0f\n\x07\x61ttempt\x18\x04 \x01(\x05\x12\x0f\n\x07success\x18\x05 \x01(\x08\x12\x0f\n\x07message\x18\x06 \x01(\t\x12\x12\n\npartitions\x18\x07 \x03(\t\x12\x0e\n\x06output\x18\x08 \x01(\t\x12\x16\n\x0elost_map_tasks\x18\t \x03(\x05\"\x1f\n\x0bReportReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08*3\n\x08TaskKind\x12\x08\n\x04WAIT\x10\x00\x12\x07\n\x03MAP\x10\x01\x12\n\n\x06REDUCE\x10\x02\x12\x08\n\x04\x45XIT\x10\x03\x32\x81\x01\n\x0b\x43oordinator\x12\x35\n\x0bRequestTask\x12\x15.mapreduce.WorkerInfo\x1a\x0f.mapreduce.Task\x12;\n\nReportTask\x12\x15.mapreduce.TaskReport\x1a\x16.mapreduce.ReportReplyb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'mapreduce_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_TASKKIND']._serialized_start=647
+  _globals['_TASKKIND']._serialized_end=698
+  _globals['_WORKERINFO']._serialized_start=30
+  _globals['_WORKERINFO']._serialized_end=78
+  _globals['_SPLIT']._serialized_start=80
+  _globals['_SPLIT']._serialized_end=129
+  _globals['_PARTITIONLOCATION']._serialized_start=131
+  _globals['_PARTITIONLOCATION']._serialized_end=203
+  _globals['_TASK']._serialized_start=206
+  _globals['_TASK']._serialized_end=415
+  _globals['_TASKREPORT']._serialized_start=418
+  _globals['_TASKREPORT']._serialized_end=612
+  _globals['_REPORTREPLY']._serialized_start=614
+  _globals['_REPORTREPLY']._serialized_end=645
+  _globals['_COORDINATOR']._serialized_start=701
+  _globals['_COORDINATOR']._serialized_end=830
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,145 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+import mapreduce_pb2 as mapreduce__pb2
+
+GRPC_GENERATED_VERSION = '1.76.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in mapreduce_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class CoordinatorStub(object):
+    """Coordinator phân phối task MapReduce cho các worker
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.RequestTask = channel.unary_unary(
+                '/mapreduce.Coordinator/RequestTask',
+                request_serializer=mapreduce__pb2.WorkerInfo.SerializeToString,
+                response_deserializer=mapreduce__pb2.Task.FromString,
+                _registered_method=True)
+        self.ReportTask = channel.unary_unary(
+                '/mapreduce.Coordinator/ReportTask',
+                request_serializer=mapreduce__pb2.TaskReport.SerializeToString,
+                response_deserializer=mapreduce__pb2.ReportReply.FromString,
+                _registered_method=True)
+
+
+class CoordinatorServicer(object):
+    """Coordinator phân phối task MapReduce cho các worker
+    """
+
+    def RequestTask(self, request, context):
+        """RPC method để worker xin task tiếp theo
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ReportTask(self, request, context):
+        """RPC method để worker báo kết quả của 1 task
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_CoordinatorServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'RequestTask': grpc.unary_unary_rpc_method_handler(
+                    servicer.RequestTask,
+                    request_deserializer=mapreduce__pb2.WorkerInfo.FromString,
+                    response_serializer=mapreduce__pb2.Task.SerializeToString,
+            ),
+            'ReportTask': grpc.unary_unary_rpc_method_handler(
+                    servicer.ReportTask,
+                    request_deserializer=mapreduce__pb2.TaskReport.FromString,
+                    response_serializer=mapreduce__pb2.ReportReply.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'mapreduce.Coordinator', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('mapreduce.Coordinator', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Coordinator(object):
+    """Coordinator phân phối task MapReduce cho các worker
+    """
+
+    @staticmethod
+    def RequestTask(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/mapreduce.Coordinator/RequestTask',
+            mapreduce__pb2.WorkerInfo.SerializeToString,
+            mapreduce__pb2.Task.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ReportTask(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/mapreduce.Coordinator/ReportTask',
+            mapreduce__pb2.TaskReport.SerializeToString,
+            mapreduce__pb2.ReportReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
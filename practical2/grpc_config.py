@@ -0,0 +1,33 @@
+# Cấu hình flow-control / backpressure dùng chung cho server và client (sync và aio)
+
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024   # Kích thước tối đa của 1 message (16MB)
+STREAM_WINDOW_SIZE = 8 * 1024 * 1024  # Flow-control window ban đầu của mỗi stream (8MB)
+BDP_PROBE = True                      # Tự điều chỉnh window theo bandwidth-delay product
+MAX_CONCURRENT_STREAMS = 1000         # Số stream đồng thời tối đa trên 1 kết nối (server)
+KEEPALIVE_TIME_MS = 30000             # Gửi ping keepalive sau 30s không có hoạt động
+KEEPALIVE_TIMEOUT_MS = 10000          # Đóng kết nối nếu ping không được trả lời sau 10s
+
+
+def grpc_options(max_message_size=MAX_MESSAGE_SIZE, window_size=STREAM_WINDOW_SIZE,
+                 bdp_probe=BDP_PROBE, keepalive_time_ms=KEEPALIVE_TIME_MS,
+                 keepalive_timeout_ms=KEEPALIVE_TIMEOUT_MS, max_concurrent_streams=None):
+    """
+    Tạo danh sách channel arguments cho grpc.server / grpc.insecure_channel
+    max_concurrent_streams chỉ có ý nghĩa ở phía server
+    """
+    options = [
+        ('grpc.max_send_message_length', max_message_size),
+        ('grpc.max_receive_message_length', max_message_size),
+        # Số bytes 1 stream được nhận trước khi phải chờ ứng dụng đọc (backpressure)
+        ('grpc.http2.lookahead_bytes', window_size),
+        ('grpc.http2.bdp_probe', int(bdp_probe)),
+        ('grpc.keepalive_time_ms', keepalive_time_ms),
+        ('grpc.keepalive_timeout_ms', keepalive_timeout_ms),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.http2.max_pings_without_data', 0),
+        # Server phải chấp nhận ping thường xuyên như client gửi
+        ('grpc.http2.min_ping_interval_without_data_ms', keepalive_time_ms),
+    ]
+    if max_concurrent_streams is not None:
+        options.append(('grpc.max_concurrent_streams', max_concurrent_streams))
+    return options
@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import grpc
+
+import aio_client
+
+HOST = '127.0.0.1'
+PORTS = {'sync': 50063, 'aio': 50064}  # Port riêng để không đụng server đang chạy
+
+# Mỗi server chạy ở process riêng, output của server bị bỏ qua
+SERVER_CODE = {
+    'sync': """
+import os, sys, server
+grpc_server = server.create_server(sys.argv[1], int(sys.argv[2]), server.FileTransferServicer(sys.argv[3]))
+print('ready', flush=True)
+sys.stdout = open(os.devnull, 'w')
+grpc_server.wait_for_termination()
+""",
+    'aio': """
+import asyncio, os, sys, aio_server
+async def main():
+    grpc_server = await aio_server.create_server(
+        sys.argv[1], int(sys.argv[2]), aio_server.AsyncFileTransferServicer(sys.argv[3]))
+    print('ready', flush=True)
+    sys.stdout = open(os.devnull, 'w')
+    await grpc_server.wait_for_termination()
+asyncio.run(main())
+""",
+}
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load(port, source, uploads, channels):
+    """
+    Mở `uploads` upload đồng thời, chia đều trên `channels` kết nối
+    Returns: (danh sách latency của các upload thành công, số upload lỗi, thời gian tổng)
+    """
+    opened = [aio_client.create_channel(HOST, port) for _ in range(channels)]
+    latencies = []
+    failures = 0
+
+    async def one_upload(i):
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            response = await aio_client.upload_file(opened[i % channels], source, name=f"load_{i}.bin")
+            if response.success:
+                latencies.append(time.perf_counter() - start)
+                return
+        except grpc.RpcError:
+            pass
+        failures += 1
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(one_upload(i) for i in range(uploads)))
+    finally:
+        for channel in opened:
+            await channel.close()
+    return sorted(latencies), failures, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test: nhiều upload đồng thời lên server sync và aio")
+    parser.add_argument('--uploads', type=int, default=1000, help="Số upload đồng thời")
+    parser.add_argument('--size-kb', type=int, default=256, help="Kích thước mỗi file upload (KB)")
+    parser.add_argument('--channels', type=int, default=8, help="Số kết nối dùng chung cho các upload")
+    parser.add_argument('--target', choices=['sync', 'aio', 'both'], default='both')
+    args = parser.parse_args()
+
+    targets = ['sync', 'aio'] if args.target == 'both' else [args.target]
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, 'load_source.bin')
+        with open(source, 'wb') as f:
+            f.write(os.urandom(args.size_kb * 1024))
+
+        print(f"{args.uploads} concurrent uploads x {args.size_kb} KB over {args.channels} channels")
+        print(f"{'server':<6} {'ok':>6} {'failed':>6} {'p50 (s)':>9} {'p99 (s)':>9} {'MB/s':>9}")
+        for target in targets:
+            output_dir = os.path.join(workdir, target)
+            os.mkdir(output_dir)
+            port = PORTS[target]
+            proc = subprocess.Popen(
+                [sys.executable, '-c', SERVER_CODE[target], HOST, str(port), output_dir],
+                cwd=here, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+            try:
+                # Server lỗi khi khởi động (vd. port đang bận) thì readline() trả về ''
+                if proc.stdout.readline().strip() != 'ready':
+                    raise RuntimeError(f"{target} server failed to start on port {port}")
+                latencies, failures, elapsed = asyncio.run(
+                    run_load(port, source, args.uploads, args.channels)
+                )
+            finally:
+                proc.terminate()
+                proc.wait()
+
+            throughput = len(latencies) * args.size_kb / 1024 / elapsed
+            print(f"{target:<6} {len(latencies):>6} {failures:>6} {percentile(latencies, 50):>9.3f} "
+                  f"{percentile(latencies, 99):>9.3f} {throughput:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,541 @@
+import argparse
+import grpc
+from concurrent import futures
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Thêm đường dẫn generated và các job MapReduce của practical4/practical5 vào sys.path
+sys.path.insert(0, os.path.join(HERE, 'generated'))
+sys.path.insert(0, os.path.join(HERE, '..', 'practical4'))
+sys.path.insert(0, os.path.join(HERE, '..', 'practical5'))
+
+import client
+import file_transfer_pb2_grpc
+import mapreduce
+import mapreduce_pb2
+import mapreduce_pb2_grpc
+from grpc_config import grpc_options
+from server import FileTransferServicer
+
+# Cấu hình coordinator
+HOST = '127.0.0.1'
+PORT = 50055
+TASK_TIMEOUT = 30.0            # Attempt chạy quá lâu: coi như worker đã chết, giao lại task
+SPECULATIVE_FACTOR = 2.0       # Attempt lâu hơn 2 lần median của các task đã xong: chạy dự phòng
+MIN_SPECULATIVE_SECONDS = 1.0  # Không chạy dự phòng cho attempt mới chạy dưới 1 giây
+POLL_INTERVAL = 0.2            # Worker chờ trước khi xin task lại khi nhận WAIT
+WORKER_IDLE_TIMEOUT = 120.0    # Coordinator độc lập: không worker nào liên lạc quá lâu thì bỏ job
+
+JOBS = ['wordcount', 'longest']
+KIND_NAMES = {mapreduce_pb2.MAP: 'map', mapreduce_pb2.REDUCE: 'reduce'}
+
+
+# =======================
+# CÁC JOB
+# =======================
+def load_job(name, num_reducers=None):
+    """
+    Job của practical4 (wordcount) hoặc practical5 (longest)
+    num_reducers: ghi đè số partition của job
+    """
+    if name == 'wordcount':
+        import wordcount
+        job = wordcount.WORDCOUNT_JOB
+    else:
+        import b1
+        job = b1.LONGEST_JOB
+    if num_reducers is None:
+        return job
+    return mapreduce.Job(job.mapper, job.reducer, job.combiner, job.reader, num_reducers, job.partitioner)
+
+
+def make_splits(name, inputs, num_splits):
+    """
+    wordcount: chia mỗi file thành các byte-range kết thúc tại khoảng trắng
+    longest: mỗi file là 1 split (reader của job đọc cả file theo dòng)
+    Returns: list (path, start, end)
+    """
+    if name != 'wordcount':
+        return [(path, 0, os.path.getsize(path)) for path in inputs]
+    import wordcount
+    per_file = max(1, num_splits // len(inputs))
+    return [(path, start, end) for path in inputs for start, end in wordcount.split_offsets(path, per_file)]
+
+
+def reader_split(name, split):
+    # Chuyển Split message thành tham số reader của job
+    if name == 'wordcount':
+        return split.path, split.start, split.end
+    return split.path
+
+
+def as_tuple(value):
+    # JSON biến tuple thành list, đổi lại để reducer so sánh như khi chạy 1 process
+    if isinstance(value, list):
+        return tuple(as_tuple(item) for item in value)
+    return value
+
+
+def print_results(name, results):
+    if name == 'wordcount':
+        print("\n--- FINAL RESULTS ---")
+        for word, count in sorted(results.items()):
+            print(f"{word}: {count}")
+    elif 'longest' in results:
+        import b1
+        b1.print_longest([results['longest']])
+    else:
+        print("❌ Không có dữ liệu hợp lệ")
+
+
+# =======================
+# COORDINATOR
+# =======================
+class TaskInfo:
+    # Trạng thái của 1 map/reduce task
+    def __init__(self, kind, task_id):
+        self.kind = kind
+        self.task_id = task_id
+        self.done = False
+        self.running = {}      # attempt -> (worker_id, thời điểm bắt đầu)
+        self.next_attempt = 0
+        self.result = None     # MAP: (address, [tên file theo partition]), REDUCE: đường dẫn kết quả
+        self.duration = None
+
+
+class CoordinatorServicer(mapreduce_pb2_grpc.CoordinatorServicer):
+    """
+    Giao task cho worker theo kiểu pull: worker rảnh thì gọi RequestTask
+    - Các reduce task chỉ được giao khi mọi map task đã xong
+    - Attempt lỗi hoặc quá TASK_TIMEOUT (worker chết) thì task được giao lại
+    - Hết task mới: worker rảnh chạy dự phòng (speculative) các attempt chậm bất thường,
+      attempt nào báo xong trước được dùng, báo cáo của attempt còn lại bị bỏ qua
+    - Reducer không tải được partition của 1 map task (worker giữ file đã chết)
+      thì map task đó được chạy lại
+    """
+
+    def __init__(self, job_name, splits, num_reducers, output_dir,
+                 task_timeout=TASK_TIMEOUT, speculative_factor=SPECULATIVE_FACTOR):
+        self.job_name = job_name
+        self.splits = splits
+        self.num_reducers = num_reducers
+        self.output_dir = output_dir
+        self.task_timeout = task_timeout
+        self.speculative_factor = speculative_factor
+        self.map_tasks = [TaskInfo(mapreduce_pb2.MAP, i) for i in range(len(splits))]
+        self.reduce_tasks = [TaskInfo(mapreduce_pb2.REDUCE, i) for i in range(num_reducers)]
+        self.worker_addresses = {}  # worker_id -> địa chỉ FileTransferService của worker
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        self.last_contact = time.monotonic()  # Lần cuối 1 worker gọi RequestTask/ReportTask
+
+    def log(self, task, message):
+        print(f"[COORDINATOR] {KIND_NAMES[task.kind]} task {task.task_id}: {message}")
+
+    def pick_task(self, tasks, worker_id):
+        now = time.monotonic()
+        pending = [task for task in tasks if not task.done]
+
+        # 1. Task chưa có attempt nào đang chạy (mới, hoặc attempt trước bị lỗi)
+        for task in pending:
+            if not task.running:
+                return task
+
+        # 2. Attempt quá hạn: worker coi như đã chết
+        for task in pending:
+            for attempt, (owner, started) in list(task.running.items()):
+                if now - started > self.task_timeout:
+                    self.log(task, f"attempt {attempt} on {owner} timed out, re-executing")
+                    del task.running[attempt]
+            if not task.running:
+                return task
+
+        # 3. Chạy dự phòng attempt chậm hơn nhiều so với các task đã xong
+        durations = [task.duration for task in tasks if task.done]
+        if not durations:
+            return None
+        limit = max(MIN_SPECULATIVE_SECONDS, self.speculative_factor * statistics.median(durations))
+        for task in pending:
+            if len(task.running) == 1:
+                (owner, started), = task.running.values()
+                if owner != worker_id and now - started > limit:
+                    self.log(task, f"running {now - started:.1f}s on {owner}, starting a backup attempt")
+                    return task
+        return None
+
+    def build_task(self, task, attempt):
+        message = mapreduce_pb2.Task(kind=task.kind, task_id=task.task_id, attempt=attempt,
+                                     job=self.job_name, num_reducers=self.num_reducers)
+        if task.kind == mapreduce_pb2.MAP:
+            path, start, end = self.splits[task.task_id]
+            message.split.CopyFrom(mapreduce_pb2.Split(path=path, start=start, end=end))
+        else:
+            message.output_dir = self.output_dir
+            for map_task in self.map_tasks:
+                address, filenames = map_task.result
+                message.inputs.add(map_task=map_task.task_id, address=address,
+                                   filename=filenames[task.task_id])
+        return message
+
+    def RequestTask(self, request, context):
+        with self.lock:
+            self.last_contact = time.monotonic()
+            self.worker_addresses[request.worker_id] = request.address
+            if self.finished.is_set():
+                return mapreduce_pb2.Task(kind=mapreduce_pb2.EXIT)
+            maps_done = all(task.done for task in self.map_tasks)
+            task = self.pick_task(self.reduce_tasks if maps_done else self.map_tasks, request.worker_id)
+            if task is None:
+                return mapreduce_pb2.Task(kind=mapreduce_pb2.WAIT)
+
+            attempt = task.next_attempt
+            task.next_attempt += 1
+            task.running[attempt] = (request.worker_id, time.monotonic())
+            return self.build_task(task, attempt)
+
+    def ReportTask(self, request, context):
+        with self.lock:
+            self.last_contact = time.monotonic()
+            tasks = self.map_tasks if request.kind == mapreduce_pb2.MAP else self.reduce_tasks
+            task = tasks[request.task_id]
+            started = task.running.pop(request.attempt, None)
+            if task.done:
+                # Attempt khác (chạy dự phòng) đã hoàn thành trước
+                return mapreduce_pb2.ReportReply(accepted=False)
+
+            if request.success:
+                task.done = True
+                task.duration = time.monotonic() - started[1] if started else 0.0
+                task.running.clear()
+                if task.kind == mapreduce_pb2.MAP:
+                    task.result = (self.worker_addresses[request.worker_id], list(request.partitions))
+                else:
+                    task.result = request.output
+                if all(t.done for t in self.reduce_tasks):
+                    self.finished.set()
+                return mapreduce_pb2.ReportReply(accepted=True)
+
+            self.log(task, f"attempt {request.attempt} failed on {request.worker_id}: {request.message}")
+            for map_id in request.lost_map_tasks:
+                map_task = self.map_tasks[map_id]
+                if map_task.done:
+                    self.log(map_task, "output is unreachable, re-executing")
+                    map_task.done = False
+                    map_task.result = None
+            return mapreduce_pb2.ReportReply(accepted=True)
+
+    def idle_seconds(self):
+        with self.lock:
+            return time.monotonic() - self.last_contact
+
+    def collect_results(self):
+        # Gộp file kết quả của các reducer (mỗi reducer giữ 1 phần key riêng biệt)
+        results = {}
+        for task in self.reduce_tasks:
+            with open(task.result, encoding='utf-8') as f:
+                results.update((key, as_tuple(value)) for key, value in json.load(f))
+        return results
+
+
+def create_coordinator(servicer, host=HOST, port=PORT):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=16), options=grpc_options())
+    mapreduce_pb2_grpc.add_CoordinatorServicer_to_server(servicer, server)
+    server.add_insecure_port(f'{host}:{port}')
+    server.start()
+    return server
+
+
+# =======================
+# WORKER
+# =======================
+class IntermediateServicer(FileTransferServicer):
+    # Phục vụ các file intermediate (mr-*) của worker qua DownloadFile, thay vì file đã nhận
+    def served_path(self, filename):
+        name = os.path.basename(filename)
+        if not name.startswith('mr-'):
+            return None
+        path = os.path.join(self.output_dir, name)
+        return path if os.path.isfile(path) else None
+
+
+def start_file_server(work_dir, host=HOST):
+    """
+    Mỗi worker chạy 1 FileTransferService (port tự chọn) để reducer tải partition
+    Returns: (server, địa chỉ host:port)
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4), options=grpc_options())
+    file_transfer_pb2_grpc.add_FileTransferServiceServicer_to_server(IntermediateServicer(work_dir), server)
+    port = server.add_insecure_port(f'{host}:0')
+    server.start()
+    return server, f'{host}:{port}'
+
+
+def write_json(path, data):
+    # Ghi file tạm rồi đổi tên: các attempt trùng nhau không bao giờ thấy file ghi dở
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def run_map(job, task, work_dir):
+    """
+    Chạy mapper (có combiner) trên split, ghi mỗi partition ra 1 file intermediate
+    Tên file gồm cả attempt nên các attempt dự phòng không ghi đè lên nhau
+    Returns: list tên file theo thứ tự partition
+    """
+    partitions = mapreduce.map_task((job, reader_split(task.job, task.split)))
+    filenames = []
+    for p, bucket in enumerate(partitions):
+        filename = f"mr-{task.task_id}-{task.attempt}-{p}.json"
+        write_json(os.path.join(work_dir, filename), bucket)
+        filenames.append(filename)
+    return filenames
+
+
+def run_reduce(job, task, work_dir, address):
+    """
+    Tải partition của mọi map task qua DownloadFile rồi chạy reducer
+    Returns: (đường dẫn kết quả, list map task không tải được)
+    """
+    fetch_dir = tempfile.mkdtemp(prefix=f"fetch-{task.task_id}-", dir=work_dir)
+    buckets = []
+    lost = []
+    try:
+        for location in task.inputs:
+            if location.address == address:
+                path = os.path.join(work_dir, location.filename)
+            else:
+                path = os.path.join(fetch_dir, location.filename)
+                if not client.download_file(location.filename, path, address=location.address):
+                    lost.append(location.map_task)
+                    continue
+            with open(path, encoding='utf-8') as f:
+                buckets.append({key: [as_tuple(value) for value in values]
+                                for key, values in json.load(f).items()})
+        if lost:
+            return None, lost
+
+        results = mapreduce.reduce_task((job, buckets))
+        output = os.path.join(task.output_dir, f"mr-out-{task.task_id}.json")
+        write_json(output, list(results.items()))
+        return output, []
+    finally:
+        shutil.rmtree(fetch_dir, ignore_errors=True)
+
+
+def run_worker(coordinator, work_dir=None, fail_prob=0.0, delay=0.0, crash_after=None):
+    """
+    Vòng lặp của worker: xin task, chạy, báo kết quả, tới khi nhận EXIT
+    fail_prob / delay / crash_after: giả lập task lỗi, worker chậm, worker chết (để thử re-execution)
+    """
+    worker_id = f"worker-{os.getpid()}"
+    work_dir = work_dir or tempfile.mkdtemp(prefix='mr_worker_')
+    file_server, address = start_file_server(work_dir)
+    print(f"[{worker_id}] Serving intermediate files from {work_dir} on {address}")
+    jobs = {}
+    completed = 0
+
+    try:
+        with grpc.insecure_channel(coordinator, options=grpc_options()) as channel:
+            stub = mapreduce_pb2_grpc.CoordinatorStub(channel)
+            while True:
+                try:
+                    task = stub.RequestTask(mapreduce_pb2.WorkerInfo(worker_id=worker_id, address=address),
+                                            wait_for_ready=True, timeout=TASK_TIMEOUT)
+                except grpc.RpcError as e:
+                    print(f"[{worker_id}] Coordinator unreachable: {e.code()}")
+                    break
+                if task.kind == mapreduce_pb2.WAIT:
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                if task.kind == mapreduce_pb2.EXIT:
+                    break
+                if crash_after is not None and completed >= crash_after:
+                    # Chết đột ngột: không báo cáo, file server cũng mất theo
+                    print(f"[{worker_id}] Crashing (simulated)", flush=True)
+                    os._exit(1)
+
+                key = (task.job, task.num_reducers)
+                if key not in jobs:
+                    jobs[key] = load_job(task.job, task.num_reducers)
+                report = mapreduce_pb2.TaskReport(worker_id=worker_id, kind=task.kind,
+                                                  task_id=task.task_id, attempt=task.attempt)
+                start = time.perf_counter()
+                try:
+                    time.sleep(delay)
+                    if random.random() < fail_prob:
+                        raise RuntimeError("simulated task failure")
+                    if task.kind == mapreduce_pb2.MAP:
+                        report.partitions.extend(run_map(jobs[key], task, work_dir))
+                    else:
+                        output, lost = run_reduce(jobs[key], task, work_dir, address)
+                        if lost:
+                            report.lost_map_tasks.extend(lost)
+                            raise RuntimeError(f"cannot fetch output of map tasks {lost}")
+                        report.output = output
+                    report.success = True
+                except Exception as e:
+                    report.message = str(e)
+
+                try:
+                    reply = stub.ReportTask(report, timeout=TASK_TIMEOUT)
+                except grpc.RpcError as e:
+                    print(f"[{worker_id}] Coordinator unreachable: {e.code()}")
+                    break
+                completed += 1
+                status = 'done' if report.success else f'failed ({report.message})'
+                note = '' if reply.accepted else ', result discarded (another attempt finished first)'
+                print(f"[{worker_id}] {KIND_NAMES[task.kind]} task {task.task_id} attempt {task.attempt} "
+                      f"{status} in {time.perf_counter() - start:.2f}s{note}", flush=True)
+    finally:
+        # Dừng file server kể cả khi vòng lặp thoát vì lỗi ngoài dự kiến
+        file_server.stop(0)
+    print(f"[{worker_id}] Exiting after {completed} tasks")
+
+
+# =======================
+# CHẠY CỤC BỘ: 1 COORDINATOR + NHIỀU WORKER PROCESS
+# =======================
+def start_coordinator(args, output_dir):
+    num_reducers = args.reducers or load_job(args.job).num_reducers
+    splits = make_splits(args.job, args.inputs, args.splits)
+    servicer = CoordinatorServicer(args.job, splits, num_reducers, output_dir,
+                                   args.task_timeout, args.speculative_factor)
+    server = create_coordinator(servicer, args.host, args.port)
+    print(f"[COORDINATOR] {args.job}: {len(splits)} map tasks, {num_reducers} reduce tasks "
+          f"on {args.host}:{args.port}")
+    return servicer, server
+
+
+def run_local(args):
+    """
+    Chạy coordinator trong process này và args.workers worker process trên localhost
+    Output của mỗi worker được ghi vào worker-<i>.log trong thư mục tạm
+    Returns: exit code, 1 nếu mọi worker đã thoát trước khi job xong
+    """
+    run_dir = tempfile.mkdtemp(prefix='mr_cluster_')
+    output_dir = os.path.join(run_dir, 'output')
+    os.mkdir(output_dir)
+    servicer, server = start_coordinator(args, output_dir)
+    coordinator = f'{args.host}:{args.port}'
+
+    workers = []
+    for i in range(args.workers):
+        command = [sys.executable, os.path.abspath(__file__), 'worker', '--coordinator', coordinator,
+                   '--work-dir', os.path.join(run_dir, f'worker-{i}')]
+        if i < args.crash_workers:
+            command += ['--crash-after', '1']
+        elif i < args.crash_workers + args.slow_workers:
+            command += ['--delay', str(args.slow_delay)]
+        if args.fail_prob:
+            command += ['--fail-prob', str(args.fail_prob)]
+        os.mkdir(os.path.join(run_dir, f'worker-{i}'))
+        log = open(os.path.join(run_dir, f'worker-{i}.log'), 'w')
+        workers.append(subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT))
+        log.close()
+    print(f"[COORDINATOR] Started {args.workers} workers, logs in {run_dir}")
+
+    try:
+        start = time.perf_counter()
+        while not servicer.finished.wait(POLL_INTERVAL):
+            # Không còn worker nào sống thì không ai chạy lại được các task còn lại
+            if all(proc.poll() is not None for proc in workers):
+                print(f"[COORDINATOR] All workers exited before the job finished, logs in {run_dir}")
+                return 1
+        print(f"[COORDINATOR] Job finished in {time.perf_counter() - start:.2f}s")
+        results = servicer.collect_results()
+        # Chờ các worker nhận EXIT
+        for proc in workers:
+            try:
+                proc.wait(timeout=POLL_INTERVAL * 20)
+            except subprocess.TimeoutExpired:
+                proc.terminate()
+    finally:
+        for proc in workers:
+            if proc.poll() is None:
+                proc.kill()
+        server.stop(0)
+    print_results(args.job, results)
+    if not args.keep:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="MapReduce phân tán: coordinator gRPC + các worker process")
+    sub = parser.add_subparsers(dest='mode', required=True)
+
+    def add_job_args(p):
+        p.add_argument('inputs', nargs='+', help="Các file input")
+        p.add_argument('--job', choices=JOBS, default='wordcount')
+        p.add_argument('--splits', type=int, default=8, help="Số map task (wordcount)")
+        p.add_argument('--reducers', type=int, default=None, help="Số reduce task (mặc định theo job)")
+        p.add_argument('--host', default=HOST)
+        p.add_argument('--port', type=int, default=PORT)
+        p.add_argument('--task-timeout', type=float, default=TASK_TIMEOUT,
+                       help="Giây trước khi coi attempt là đã chết và giao lại")
+        p.add_argument('--speculative-factor', type=float, default=SPECULATIVE_FACTOR,
+                       help="Chạy dự phòng attempt lâu hơn factor x median thời gian task")
+
+    local = sub.add_parser('local', help="Coordinator + N worker process trên localhost")
+    add_job_args(local)
+    local.add_argument('--workers', type=int, default=3)
+    local.add_argument('--crash-workers', type=int, default=0, help="Số worker chết sau task đầu tiên")
+    local.add_argument('--slow-workers', type=int, default=0, help="Số worker chậm (--slow-delay mỗi task)")
+    local.add_argument('--slow-delay', type=float, default=5.0)
+    local.add_argument('--fail-prob', type=float, default=0.0, help="Xác suất 1 task báo lỗi")
+    local.add_argument('--keep', action='store_true', help="Giữ thư mục tạm (log, file intermediate)")
+
+    coordinator = sub.add_parser('coordinator', help="Chỉ chạy coordinator, chờ worker kết nối")
+    add_job_args(coordinator)
+    coordinator.add_argument('--output-dir', default='.', help="Thư mục reducer ghi kết quả")
+    coordinator.add_argument('--idle-timeout', type=float, default=WORKER_IDLE_TIMEOUT,
+                             help="Bỏ job nếu không worker nào liên lạc trong số giây này "
+                                  "(phải lớn hơn thời gian của task dài nhất)")
+
+    worker = sub.add_parser('worker', help="Chạy 1 worker")
+    worker.add_argument('--coordinator', default=f'{HOST}:{PORT}')
+    worker.add_argument('--work-dir', default=None)
+    worker.add_argument('--fail-prob', type=float, default=0.0)
+    worker.add_argument('--delay', type=float, default=0.0)
+    worker.add_argument('--crash-after', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.mode == 'worker':
+        run_worker(args.coordinator, args.work_dir, args.fail_prob, args.delay, args.crash_after)
+        return 0
+    if args.mode == 'local':
+        return run_local(args)
+
+    servicer, server = start_coordinator(args, os.path.abspath(args.output_dir))
+    try:
+        # Worker ở máy khác: chỉ biết worker còn sống qua RequestTask/ReportTask
+        while not servicer.finished.wait(POLL_INTERVAL):
+            if servicer.idle_seconds() > args.idle_timeout:
+                print(f"[COORDINATOR] No worker contacted the coordinator for {args.idle_timeout:.0f}s, "
+                      f"giving up")
+                return 1
+        print_results(args.job, servicer.collect_results())
+        # Cho các worker thời gian nhận EXIT
+        time.sleep(POLL_INTERVAL * 5)
+    finally:
+        server.stop(0)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+
+BLOCK_SIZE = 1024 * 1024  # Kích thước block mặc định (1MB, < 4MB max message của gRPC)
+UPLOAD_ID = re.compile(r'[0-9a-f]{32}')  # Định dạng upload_id do make_upload_id() tạo ra
+JOURNAL_INTERVAL = 64     # Số block tối đa giữa 2 lần fsync journal
+
+
+def block_hash(data):
+    # Hash nội dung của 1 block (content address)
+    return hashlib.sha256(data).digest()
+
+
+def make_upload_id(filename, file_size, block_size, block_hashes):
+    """
+    upload_id được tính từ nội dung file => client gọi lại StartUpload với cùng file
+    sẽ nhận lại đúng phiên cũ và tiếp tục từ chỗ đã dừng
+    """
+    h = hashlib.sha256(f"{filename}\0{file_size}\0{block_size}\0".encode('utf-8'))
+    for digest in block_hashes:
+        h.update(digest)
+    return h.hexdigest()[:32]
+
+
+def is_upload_id(upload_id):
+    # upload_id từ client được dùng trong tên file: chỉ chấp nhận đúng định dạng của make_upload_id()
+    return UPLOAD_ID.fullmatch(upload_id) is not None
+
+
+class BlockIndex:
+    """
+    Chỉ mục content-addressed: hash của block -> vị trí của block đó trong 1 file đã nhận
+    Dùng để không phải nhận lại các block server đã có (dedup)
+    """
+
+    def __init__(self):
+        self.blocks = {}
+        self.lock = threading.Lock()
+
+    def add_file(self, path, block_size, block_hashes):
+        with self.lock:
+            for i, digest in enumerate(block_hashes):
+                self.blocks.setdefault(digest, (path, i * block_size))
+
+    def read(self, digest, length):
+        """
+        Đọc lại block có hash digest từ file đã nhận
+        Returns: bytes, hoặc None nếu file đã bị xóa/sửa (hash không còn khớp)
+        """
+        with self.lock:
+            location = self.blocks.get(digest)
+        if location is None:
+            return None
+        path, offset = location
+        try:
+            with open(path, 'rb') as f:
+                data = os.pread(f.fileno(), length, offset)
+        except OSError:
+            data = b''
+        if len(data) == length and block_hash(data) == digest:
+            return data
+        with self.lock:
+            self.blocks.pop(digest, None)
+        return None
+
+
+class ResumableUpload:
+    """
+    Phiên upload có thể tiếp tục sau khi bị ngắt
+    File tạm và journal có tên cố định theo upload_id:
+      .received_<filename>.<upload_id>.part    : dữ liệu, ghi bằng pwrite()
+      .received_<filename>.<upload_id>.journal : dòng đầu là manifest (JSON),
+                                                 mỗi dòng sau là chỉ số 1 block đã ghi bền vững
+    Một block chỉ được ghi vào journal sau khi dữ liệu đã fdatasync()
+    """
+
+    def __init__(self, output_dir, upload_id, filename, file_size, block_size, block_hashes):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.file_size = file_size
+        self.block_size = block_size
+        self.block_hashes = list(block_hashes)
+        self.lock = threading.Lock()
+        self.done = set()      # Block đã ghi bền vững (có trong journal)
+        self.pending = []      # Block đã ghi nhưng chưa fsync
+
+        base = os.path.join(output_dir, f".received_{filename}.{upload_id}")
+        self.temp_path = base + '.part'
+        self.journal_path = base + '.journal'
+        manifest = json.dumps({
+            'filename': filename,
+            'file_size': file_size,
+            'block_size': block_size,
+            'block_hashes': [digest.hex() for digest in self.block_hashes],
+        })
+
+        resuming = os.path.exists(self.temp_path) and os.path.exists(self.journal_path)
+        if resuming:
+            with open(self.journal_path) as journal:
+                lines = journal.read().split('\n')
+            if lines[0] == manifest:
+                # Dòng cuối có thể bị ghi dở khi server chết => bỏ qua
+                self.done = {int(line) for line in lines[1:] if line.isdigit()}
+            else:
+                resuming = False
+
+        self.fd = os.open(self.temp_path, os.O_RDWR | os.O_CREAT)
+        if not resuming:
+            self.done = set()
+            os.ftruncate(self.fd, file_size)
+            with open(self.journal_path, 'w') as journal:
+                journal.write(manifest + '\n')
+        self.journal = open(self.journal_path, 'a')
+
+    @classmethod
+    def load(cls, output_dir, upload_id):
+        # Khôi phục phiên từ journal trên đĩa (ví dụ sau khi server khởi động lại)
+        if not is_upload_id(upload_id):
+            return None
+        paths = glob.glob(os.path.join(glob.escape(output_dir),
+                                       f".received_*.{glob.escape(upload_id)}.journal"))
+        if not paths:
+            return None
+        with open(paths[0]) as journal:
+            manifest = json.loads(journal.readline())
+        block_hashes = [bytes.fromhex(d) for d in manifest['block_hashes']]
+        # Journal phải đúng là của upload_id này (upload_id tính từ manifest)
+        if make_upload_id(manifest['filename'], manifest['file_size'],
+                          manifest['block_size'], block_hashes) != upload_id:
+            return None
+        return cls(output_dir, upload_id, manifest['filename'], manifest['file_size'],
+                   manifest['block_size'], block_hashes)
+
+    @property
+    def num_blocks(self):
+        return len(self.block_hashes)
+
+    def block_length(self, index):
+        return min(self.block_size, self.file_size - index * self.block_size)
+
+    def missing_blocks(self):
+        with self.lock:
+            written = self.done.union(self.pending)
+        return [i for i in range(self.num_blocks) if i not in written]
+
+    def committed_offset(self):
+        # Độ dài đoạn đầu file đã ghi bền vững liên tục
+        with self.lock:
+            index = 0
+            while index in self.done:
+                index += 1
+        return min(index * self.block_size, self.file_size)
+
+    def fill_from_index(self, block_index):
+        # Copy các block server đã có sẵn thay vì chờ client gửi
+        reused = 0
+        for i in self.missing_blocks():
+            data = block_index.read(self.block_hashes[i], self.block_length(i))
+            if data is not None:
+                os.pwrite(self.fd, data, i * self.block_size)
+                self.mark_written(i)
+                reused += 1
+        self.commit()
+        return reused
+
+    def write_block(self, offset, data):
+        # Mỗi chunk phải là đúng 1 block và khớp hash trong manifest
+        index, remainder = divmod(offset, self.block_size)
+        if remainder or index >= self.num_blocks or len(data) != self.block_length(index):
+            raise ValueError(f"Chunk at offset {offset} is not a block of this upload")
+        if block_hash(data) != self.block_hashes[index]:
+            raise ValueError(f"Block {index} does not match its hash")
+        os.pwrite(self.fd, data, offset)
+        self.mark_written(index)
+
+    def mark_written(self, index):
+        with self.lock:
+            self.pending.append(index)
+            flush = len(self.pending) >= JOURNAL_INTERVAL
+        if flush:
+            self.commit()
+
+    def commit(self):
+        # fdatasync dữ liệu trước, sau đó mới ghi các block vào journal
+        with self.lock:
+            if not self.pending:
+                return
+            os.fdatasync(self.fd)
+            self.journal.write(''.join(f"{i}\n" for i in self.pending))
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            self.done.update(self.pending)
+            self.pending = []
+
+    def is_complete(self):
+        self.commit()
+        with self.lock:
+            return len(self.done) == self.num_blocks
+
+    def close(self):
+        self.commit()
+        self.journal.close()
+        os.close(self.fd)
+
+    def finish(self, output_path):
+        # Đổi tên file tạm thành file đích và xóa journal
+        self.close()
+        os.replace(self.temp_path, output_path)
+        os.remove(self.journal_path)
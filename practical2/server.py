@@ -1,70 +1,311 @@
+import argparse
 import grpc
+from collections import OrderedDict
 from concurrent import futures
+import mmap
 import os
 import sys
+import tempfile
+import threading
+import time
+import uuid
 
 # Thêm đường dẫn generated vào sys.path để import được module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'generated'))
+# Kiểm tra toàn vẹn dùng chung với practical1 (thêm vào cuối để không che client/server của practical2)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'practical1'))
 
 import file_transfer_pb2
 import file_transfer_pb2_grpc
+from chunking import MAX_CHUNK_SIZE, SUPPORTED_COMPRESSIONS, decode_content
+from grpc_config import MAX_CONCURRENT_STREAMS, grpc_options
+from integrity import (ALGORITHMS, MAX_REPAIR_ROUNDS, BlockHasher, block_digest, block_range,
+                       corrupt_blocks, inject_corruption)
+from resumable import BlockIndex, ResumableUpload, is_upload_id, make_upload_id
 
 # Cấu hình server
 HOST = '127.0.0.1'
 PORT = 50051
+MAX_WORKERS = 10  # Số thread xử lý RPC đồng thời
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Kích thước chunk mặc định khi tải file (1MB)
+MAPPED_FILES = 64  # Số file được giữ mmap sẵn cho các lần tải sau
+SESSION_TTL = 600.0  # Phiên upload không có stream nào hoạt động quá lâu (giây) thì bị hủy
+SWEEP_INTERVAL = 60.0  # Chu kỳ dọn các phiên hết hạn (giây)
+
+class UploadSession:
+    """
+    Trạng thái của 1 phiên upload song song (nhiều stream UploadRange cùng ghi 1 file)
+    """
+
+    def __init__(self, output_dir, filename, file_size):
+        self.filename = filename
+        self.file_size = file_size
+        self.lock = threading.Lock()
+        self.ranges = []  # Các range (offset, length) đã nhận đủ
+        self.active = 0   # Số stream UploadRange đang ghi vào phiên
+        self.discarded = False
+        self.last_active = time.monotonic()
+        # File tạm được cấp phát trước đủ kích thước, các stream ghi bằng pwrite()
+        # vào đúng vị trí của mình nên không cần khóa khi ghi
+        self.fd, self.temp_path = tempfile.mkstemp(
+            prefix=f".received_{filename}.", suffix='.part', dir=output_dir
+        )
+        if file_size:
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(self.fd, 0, file_size)
+            else:
+                os.ftruncate(self.fd, file_size)
+
+    def enter(self):
+        # 1 stream bắt đầu ghi vào phiên
+        with self.lock:
+            if self.discarded:
+                raise ValueError(f"Upload of {self.filename} was aborted")
+            self.active += 1
+            self.last_active = time.monotonic()
+
+    def leave(self):
+        # fd chỉ được đóng khi không còn stream nào dùng, tránh pwrite() vào fd đã bị cấp lại
+        with self.lock:
+            self.active -= 1
+            self.last_active = time.monotonic()
+            close = self.discarded and self.active == 0
+        if close:
+            os.close(self.fd)
+
+    def write(self, data, offset):
+        if self.discarded:
+            raise ValueError(f"Upload of {self.filename} was aborted")
+        os.pwrite(self.fd, data, offset)
+        self.last_active = time.monotonic()
+
+    def is_idle(self, now, ttl=SESSION_TTL):
+        return self.active == 0 and now - self.last_active > ttl
+
+    def add_range(self, offset, length):
+        with self.lock:
+            self.ranges.append((offset, length))
+
+    def is_complete(self):
+        # Các range đã nhận phải phủ kín [0, file_size) không chồng lấn
+        position = 0
+        with self.lock:
+            for offset, length in sorted(self.ranges):
+                if offset != position:
+                    return False
+                position += length
+        return position == self.file_size
+
+    def finish(self, output_path):
+        with self.lock:
+            self.discarded = True
+        os.close(self.fd)
+        os.replace(self.temp_path, output_path)
+
+    def discard(self):
+        # Các stream còn đang chạy sẽ lỗi ở lần ghi tiếp theo, stream cuối cùng đóng fd
+        with self.lock:
+            if self.discarded:
+                return
+            self.discarded = True
+            close = self.active == 0
+        os.remove(self.temp_path)
+        if close:
+            os.close(self.fd)
+
+
+class RepairSession:
+    """
+    File của 1 UploadFile có block không khớp digest của client
+    File tạm được giữ lại để client gửi lại đúng các block hỏng bằng RepairUpload
+    """
+
+    def __init__(self, filename, temp_path, file_size, block_size, checksum, digests, bad):
+        self.filename = filename
+        self.temp_path = temp_path
+        self.file_size = file_size
+        self.block_size = block_size
+        self.checksum = checksum
+        self.digests = digests
+        self.bad = set(bad)   # Block chưa khớp digest
+        self.rounds = 0       # Số lần client đã gửi lại
+        self.fd = os.open(temp_path, os.O_WRONLY)
+        self.last_active = time.monotonic()  # Lần cuối server trả danh sách block hỏng
+
+    def write_block(self, offset, data):
+        # Chỉ ghi đè block khi dữ liệu mới khớp digest
+        index, remainder = divmod(offset, self.block_size)
+        if (remainder or index >= len(self.digests)
+                or len(data) != block_range(index, self.file_size, self.block_size)[1]):
+            raise ValueError(f"Chunk at offset {offset} is not a block of this upload")
+        if block_digest(data, self.checksum) == self.digests[index]:
+            os.pwrite(self.fd, data, offset)
+            self.bad.discard(index)
+
+    def finish(self, output_path):
+        os.close(self.fd)
+        os.replace(self.temp_path, output_path)
+
+    def discard(self):
+        os.close(self.fd)
+        os.remove(self.temp_path)
+
+
+class MappedFileCache:
+    """
+    Giữ mmap của các file được tải gần đây (LRU)
+    Các lần tải lặp lại đọc thẳng từ page cache qua mmap, không cần open/read lại.
+    File được thay thế bằng os.replace() có inode mới nên cache tự nhận ra và map lại;
+    mmap cũ không bị close() mà để GC thu hồi, các lượt tải đang dùng nó vẫn đọc tiếp được
+    """
+
+    def __init__(self, capacity=MAPPED_FILES):
+        self.capacity = capacity
+        self.entries = OrderedDict()  # path -> ((inode, size, mtime_ns), mmap)
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        # Returns: mmap của file, hoặc None nếu file rỗng (không mmap được)
+        st = os.stat(path)
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                return entry[1]
+        if st.st_size == 0:
+            return None
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with self.lock:
+            self.entries[path] = (key, mapped)
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        return mapped
+
 
 class FileTransferServicer(file_transfer_pb2_grpc.FileTransferServiceServicer):
     """
     Servicer class implement RPC methods được định nghĩa trong .proto file
     """
     
+    def __init__(self, output_dir=os.path.dirname(os.path.abspath(__file__)), corrupt_prob=0.0):
+        # Thư mục lưu các file nhận được
+        self.output_dir = output_dir
+        # Chỉ dùng để thử cơ chế gửi lại: xác suất làm hỏng 1 chunk nhận được
+        self.corrupt_prob = corrupt_prob
+        # Các phiên upload song song đang diễn ra: upload_id -> UploadSession
+        self.sessions = {}
+        # Các UploadFile đang chờ gửi lại block hỏng: upload_id -> RepairSession
+        self.repairs = {}
+        self.sessions_lock = threading.Lock()
+        # Chỉ mục hash -> block của các file đã nhận, dùng để dedup
+        self.block_index = BlockIndex()
+        # mmap của các file được tải gần đây
+        self.mapped_files = MappedFileCache()
+        # Client lỗi giữa chừng và không quay lại: dọn phiên để không giữ fd và file tạm mãi
+        threading.Thread(target=self.sweep_sessions, daemon=True).start()
+
+    def GetCapabilities(self, request, context):
+        """
+        RPC method để client biết server giải nén được những kiểu nén nào
+        """
+        return file_transfer_pb2.ServerCapabilities(compressions=SUPPORTED_COMPRESSIONS)
+
     def UploadFile(self, request_iterator, context):
         """
         RPC method để nhận file từ client
         request_iterator: stream các FileChunk từ client
         context: gRPC context
         Returns: UploadResponse
+
+        Mỗi chunk được ghi thẳng xuống một file tạm, khi nhận đủ (is_last) file tạm
+        được đổi tên (atomic rename) thành file đích => bộ nhớ dùng cho mỗi upload
+        không phụ thuộc kích thước file, và không bao giờ có file đích ghi dở
+        Client gửi kèm digest của từng block: server hash ngay khi ghi, block nào không khớp
+        thì giữ file tạm và trả về danh sách block để client gửi lại bằng RepairUpload
         """
         filename = None
-        received_data = bytearray()
+        temp_file = None
+        hasher = None
+        total_bytes = 0
+        completed = False
         
         try:
             # Nhận từng chunk từ client stream
             for chunk in request_iterator:
                 if filename is None:
-                    filename = chunk.filename
+                    # basename() để client không ghi được ra ngoài output_dir
+                    filename = os.path.basename(chunk.filename)
+                    if not filename:
+                        break
                     print(f"[SERVER] Receiving file: {filename}")
+                    # File tạm nằm cùng thư mục với file đích để os.replace() là atomic
+                    temp_file = tempfile.NamedTemporaryFile(
+                        'wb', prefix=f".received_{filename}.", suffix='.part',
+                        dir=self.output_dir, delete=False
+                    )
+                    if chunk.checksum:
+                        if chunk.checksum not in ALGORITHMS or not chunk.verify_block_size:
+                            raise ValueError(f"Unsupported checksum {chunk.checksum}")
+                        hasher = BlockHasher(chunk.verify_block_size, chunk.checksum)
                 
-                # Gộp dữ liệu từ các chunks
-                received_data.extend(chunk.content)
+                # Giải nén (nếu có) và ghi chunk xuống đĩa ngay, không giữ lại trong bộ nhớ
+                data = inject_corruption(decode_content(chunk), self.corrupt_prob)
+                temp_file.write(data)
+                if hasher is not None:
+                    hasher.update(data)
+                total_bytes += len(data)
                 
                 # Kiểm tra xem đã nhận hết chưa
                 if chunk.is_last:
                     print(f"[SERVER] Received last chunk")
+                    completed = True
                     break
             
-            # Lưu file với prefix "received_"
-            if filename:
-                output_filename = f"received_{filename}"
-                output_path = os.path.join(os.path.dirname(__file__), output_filename)
-                
-                # Ghi dữ liệu vào file
-                with open(output_path, 'wb') as f:
-                    f.write(received_data)
-                
-                print(f"[SERVER] File saved successfully: {output_filename}")
-                print(f"[SERVER] Total bytes received: {len(received_data)}")
-                
-                # Trả về response thành công
+            if not filename:
+                return file_transfer_pb2.UploadResponse(
+                    success=False,
+                    message="No filename received"
+                )
+            if not completed:
                 return file_transfer_pb2.UploadResponse(
-                    success=True,
-                    message=f"File {filename} uploaded successfully ({len(received_data)} bytes)"
+                    success=False,
+                    message=f"Upload of {filename} ended before the last chunk"
                 )
-            else:
+            
+            temp_file.close()
+            bad = corrupt_blocks(list(chunk.block_digests), hasher.finish()) if hasher is not None else []
+            if bad:
+                upload_id = uuid.uuid4().hex
+                with self.sessions_lock:
+                    self.repairs[upload_id] = RepairSession(
+                        filename, temp_file.name, total_bytes, hasher.block_size, hasher.algorithm,
+                        list(chunk.block_digests), bad
+                    )
+                temp_file = None
+                print(f"[SERVER] {len(bad)} corrupt block(s) in {filename}, waiting for retransmission")
                 return file_transfer_pb2.UploadResponse(
                     success=False,
-                    message="No filename received"
+                    message=f"{len(bad)} corrupt block(s) in {filename}",
+                    upload_id=upload_id,
+                    corrupt_blocks=bad
                 )
+            
+            # Lưu file với prefix "received_"
+            output_filename = f"received_{filename}"
+            os.replace(temp_file.name, os.path.join(self.output_dir, output_filename))
+            temp_file = None
+            
+            print(f"[SERVER] File saved successfully: {output_filename}")
+            print(f"[SERVER] Total bytes received: {total_bytes}")
+            
+            # Trả về response thành công
+            return file_transfer_pb2.UploadResponse(
+                success=True,
+                message=f"File {filename} uploaded successfully ({total_bytes} bytes)"
+            )
                 
         except Exception as e:
             print(f"[SERVER] Error: {e}")
@@ -72,26 +313,404 @@ class FileTransferServicer(file_transfer_pb2_grpc.FileTransferServiceServicer):
                 success=False,
                 message=f"Error: {str(e)}"
             )
+        finally:
+            # Upload lỗi hoặc dang dở: xóa file tạm
+            if temp_file is not None:
+                temp_file.close()
+                os.remove(temp_file.name)
+
+    def RepairUpload(self, request_iterator, context):
+        """
+        RPC method để nhận lại các block bị hỏng của 1 UploadFile (mỗi chunk là đúng 1 block)
+        Hết block hỏng thì file tạm được đổi tên thành file đích; vẫn còn block hỏng sau
+        MAX_REPAIR_ROUNDS lần gửi lại thì file bị bỏ
+        """
+        upload_id = None
+        session = None
+        try:
+            for chunk in request_iterator:
+                if session is None:
+                    upload_id = chunk.upload_id
+                    # Lấy phiên ra khỏi dict: 2 stream không thể cùng sửa 1 file
+                    with self.sessions_lock:
+                        session = self.repairs.pop(upload_id, None)
+                    if session is None:
+                        return file_transfer_pb2.UploadResponse(
+                            success=False, message=f"Unknown upload {upload_id}"
+                        )
+                if chunk.content:
+                    session.write_block(chunk.offset, inject_corruption(chunk.content, self.corrupt_prob))
+                if chunk.is_last:
+                    break
+            if session is None:
+                return file_transfer_pb2.UploadResponse(success=False, message="Empty repair stream")
+
+            if session.bad:
+                session.rounds += 1
+                if session.rounds >= MAX_REPAIR_ROUNDS:
+                    print(f"[SERVER] Checksum mismatch, discarded: {session.filename}")
+                    session.discard()
+                    return file_transfer_pb2.UploadResponse(
+                        success=False, message=f"{session.filename} is still corrupt, discarded"
+                    )
+                session.last_active = time.monotonic()
+                with self.sessions_lock:
+                    self.repairs[upload_id] = session
+                return file_transfer_pb2.UploadResponse(
+                    success=False,
+                    message=f"{len(session.bad)} corrupt block(s) in {session.filename}",
+                    upload_id=upload_id,
+                    corrupt_blocks=sorted(session.bad)
+                )
+
+            output_filename = f"received_{session.filename}"
+            session.finish(os.path.join(self.output_dir, output_filename))
+            print(f"[SERVER] File repaired and saved: {output_filename}")
+            return file_transfer_pb2.UploadResponse(
+                success=True,
+                message=f"File {session.filename} uploaded successfully ({session.file_size} bytes)"
+            )
 
-def serve():
+        except Exception as e:
+            print(f"[SERVER] Error: {e}")
+            if session is not None:
+                session.discard()
+            return file_transfer_pb2.UploadResponse(success=False, message=f"Error: {str(e)}")
+
+    def get_session(self, chunk):
+        # Lấy phiên upload theo upload_id, tạo mới nếu đây là stream đầu tiên tới server
+        with self.sessions_lock:
+            session = self.sessions.get(chunk.upload_id)
+            if session is None:
+                filename = os.path.basename(chunk.filename)
+                if not filename:
+                    raise ValueError("No filename received")
+                session = UploadSession(self.output_dir, filename, chunk.file_size)
+                self.sessions[chunk.upload_id] = session
+                print(f"[SERVER] Parallel upload {chunk.upload_id}: {filename} ({chunk.file_size} bytes)")
+            return session
+
+    def abort_session(self, upload_id, session):
+        # Hủy phiên upload song song: bỏ khỏi dict và xóa file tạm
+        with self.sessions_lock:
+            if self.sessions.get(upload_id) is session:
+                del self.sessions[upload_id]
+        session.discard()
+
+    def expire_sessions(self, ttl=SESSION_TTL):
+        # Hủy các phiên upload song song không có stream nào hoạt động trong ttl giây,
+        # và các UploadFile chờ gửi lại block hỏng mà client không quay lại
+        # (client chết, hoặc client cũ không biết RepairUpload)
+        now = time.monotonic()
+        with self.sessions_lock:
+            expired = [(upload_id, session) for upload_id, session in self.sessions.items()
+                       if isinstance(session, UploadSession) and session.is_idle(now, ttl)]
+            for upload_id, _ in expired:
+                del self.sessions[upload_id]
+            stale = [(upload_id, repair) for upload_id, repair in self.repairs.items()
+                     if now - repair.last_active > ttl]
+            for upload_id, _ in stale:
+                del self.repairs[upload_id]
+        for upload_id, session in expired + stale:
+            print(f"[SERVER] Upload {upload_id} idle for more than {ttl:.0f}s, discarded")
+            session.discard()
+
+    def sweep_sessions(self):
+        while True:
+            time.sleep(SWEEP_INTERVAL)
+            self.expire_sessions()
+
+    def UploadRange(self, request_iterator, context):
+        """
+        RPC method để nhận 1 byte-range của file trong phiên upload song song
+        Mỗi chunk mang offset tuyệt đối trong file, được ghi thẳng bằng os.pwrite()
+        Range lỗi hoặc thiếu dữ liệu thì cả phiên bị hủy (client sẽ không gọi CompleteUpload)
+        """
+        upload_id = None
+        session = None
+        entered = completed = False
+        range_offset = range_length = 0
+        written = 0
+        
+        try:
+            for chunk in request_iterator:
+                if session is None:
+                    if not chunk.upload_id:
+                        raise ValueError("Missing upload_id")
+                    upload_id = chunk.upload_id
+                    session = self.get_session(chunk)
+                    session.enter()
+                    entered = True
+                    range_offset, range_length = chunk.offset, chunk.length
+                    if range_offset + range_length > session.file_size:
+                        raise ValueError("Range is outside of the file")
+                
+                if chunk.content:
+                    end = chunk.offset + len(chunk.content)
+                    if chunk.offset < range_offset or end > range_offset + range_length:
+                        raise ValueError("Chunk is outside of its range")
+                    session.write(chunk.content, chunk.offset)
+                    written += len(chunk.content)
+                
+                if chunk.is_last:
+                    break
+            
+            if session is None:
+                return file_transfer_pb2.UploadResponse(success=False, message="Empty range stream")
+            if written != range_length:
+                return file_transfer_pb2.UploadResponse(
+                    success=False,
+                    message=f"Range at {range_offset} incomplete ({written}/{range_length} bytes)"
+                )
+            
+            session.add_range(range_offset, range_length)
+            completed = True
+            return file_transfer_pb2.UploadResponse(
+                success=True,
+                message=f"Range {range_offset}-{range_offset + range_length} received"
+            )
+        
+        except Exception as e:
+            print(f"[SERVER] Error: {e}")
+            return file_transfer_pb2.UploadResponse(success=False, message=f"Error: {str(e)}")
+        finally:
+            if entered:
+                session.leave()
+            # Range lỗi, thiếu dữ liệu hoặc bị client hủy giữa chừng
+            if session is not None and not completed:
+                self.abort_session(upload_id, session)
+
+    def CompleteUpload(self, request, context):
+        """
+        RPC method để hoàn tất phiên upload song song hoặc resumable
+        Kiểm tra dữ liệu đã đủ rồi đổi tên file tạm thành file đích
+        """
+        with self.sessions_lock:
+            session = self.sessions.get(request.upload_id)
+            if isinstance(session, UploadSession):
+                del self.sessions[request.upload_id]
+        if session is None:
+            return file_transfer_pb2.UploadResponse(
+                success=False,
+                message=f"Unknown upload {request.upload_id}"
+            )
+        
+        output_filename = f"received_{session.filename}"
+        output_path = os.path.join(self.output_dir, output_filename)
+        
+        if isinstance(session, ResumableUpload):
+            # Upload resumable chưa đủ thì giữ lại để client gửi tiếp
+            if not session.is_complete():
+                missing = len(session.missing_blocks())
+                return file_transfer_pb2.UploadResponse(
+                    success=False,
+                    message=f"Upload of {session.filename} is missing {missing} blocks"
+                )
+            with self.sessions_lock:
+                self.sessions.pop(request.upload_id, None)
+            session.finish(output_path)
+            self.block_index.add_file(output_path, session.block_size, session.block_hashes)
+            print(f"[SERVER] File saved successfully: {output_filename}")
+            return file_transfer_pb2.UploadResponse(
+                success=True,
+                message=f"File {session.filename} uploaded successfully ({session.file_size} bytes)"
+            )
+        
+        if session.file_size != request.file_size or not session.is_complete():
+            session.discard()
+            return file_transfer_pb2.UploadResponse(
+                success=False,
+                message=f"Upload of {session.filename} is incomplete"
+            )
+        
+        session.finish(output_path)
+        print(f"[SERVER] File saved successfully: {output_filename} ({len(session.ranges)} ranges)")
+        return file_transfer_pb2.UploadResponse(
+            success=True,
+            message=f"File {session.filename} uploaded successfully ({session.file_size} bytes)"
+        )
+
+    def get_resumable(self, upload_id):
+        # Lấy phiên resumable trong bộ nhớ, hoặc khôi phục từ journal trên đĩa
+        if not is_upload_id(upload_id):
+            return None
+        with self.sessions_lock:
+            session = self.sessions.get(upload_id)
+            if session is None:
+                session = ResumableUpload.load(self.output_dir, upload_id)
+                if session is not None:
+                    self.sessions[upload_id] = session
+        if not isinstance(session, ResumableUpload):
+            return None
+        return session
+
+    def upload_status(self, session, reused=0):
+        return file_transfer_pb2.UploadStatus(
+            upload_id=session.upload_id,
+            committed_offset=session.committed_offset(),
+            missing_blocks=session.missing_blocks(),
+            reused_blocks=reused
+        )
+
+    def StartUpload(self, request, context):
+        """
+        RPC method để bắt đầu hoặc tiếp tục 1 upload resumable
+        Client gửi hash của từng block, server trả về các block còn thiếu:
+        bỏ qua block đã ghi ở lần upload trước và block đã có trong file khác (dedup)
+        """
+        filename = os.path.basename(request.filename)
+        block_count = -(-request.file_size // request.block_size) if request.block_size else -1
+        if not filename or len(request.block_hashes) != block_count:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid upload manifest")
+        
+        upload_id = make_upload_id(filename, request.file_size, request.block_size, request.block_hashes)
+        with self.sessions_lock:
+            session = self.sessions.get(upload_id)
+            if session is None:
+                session = ResumableUpload(
+                    self.output_dir, upload_id, filename,
+                    request.file_size, request.block_size, request.block_hashes
+                )
+                self.sessions[upload_id] = session
+        
+        reused = session.fill_from_index(self.block_index)
+        status = self.upload_status(session, reused)
+        print(f"[SERVER] Upload {upload_id}: {filename}, {len(status.missing_blocks)}/"
+              f"{session.num_blocks} blocks needed, {reused} reused")
+        return status
+
+    def QueryUploadStatus(self, request, context):
+        """
+        RPC method để xem trạng thái của 1 upload resumable
+        """
+        if not is_upload_id(request.upload_id):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Invalid upload id {request.upload_id!r}")
+        session = self.get_resumable(request.upload_id)
+        if session is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown upload {request.upload_id}")
+        return self.upload_status(session)
+
+    def UploadBlocks(self, request_iterator, context):
+        """
+        RPC method để nhận các block còn thiếu của upload resumable
+        Mỗi chunk là đúng 1 block, được kiểm tra hash trước khi ghi
+        """
+        session = None
+        received = 0
+        
+        try:
+            for chunk in request_iterator:
+                if session is None:
+                    session = self.get_resumable(chunk.upload_id)
+                    if session is None:
+                        raise ValueError(f"Unknown upload {chunk.upload_id}")
+                if chunk.content:
+                    session.write_block(chunk.offset, chunk.content)
+                    received += 1
+                if chunk.is_last:
+                    break
+            
+            return file_transfer_pb2.UploadResponse(
+                success=True,
+                message=f"{received} blocks received"
+            )
+        
+        except Exception as e:
+            print(f"[SERVER] Error: {e}")
+            return file_transfer_pb2.UploadResponse(success=False, message=f"Error: {str(e)}")
+        finally:
+            # Các block đã nhận (kể cả khi stream bị ngắt) được ghi bền vững vào journal
+            if session is not None:
+                session.commit()
+
+    def served_path(self, filename):
+        # Chỉ phục vụ các file đã nhận (received_*) nằm trong output_dir
+        name = os.path.basename(filename)
+        if not name.startswith('received_'):
+            return None
+        path = os.path.join(self.output_dir, name)
+        return path if os.path.isfile(path) else None
+
+    def DownloadFile(self, request, context):
+        """
+        RPC method để tải file (server streaming)
+        Dữ liệu được cắt trực tiếp từ mmap của file, chỉ đọc đúng byte-range được yêu cầu
+        """
+        path = self.served_path(request.filename)
+        if path is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"File {request.filename} not found")
+        
+        mapped = self.mapped_files.get(path)
+        file_size = len(mapped) if mapped is not None else 0
+        if request.offset > file_size:
+            context.abort(grpc.StatusCode.OUT_OF_RANGE, f"Offset {request.offset} is past the end of file")
+        end = file_size if request.length == 0 else min(file_size, request.offset + request.length)
+        chunk_size = min(request.chunk_size or DOWNLOAD_CHUNK_SIZE, MAX_CHUNK_SIZE)
+        name = os.path.basename(path)
+        
+        position = request.offset
+        while position < end:
+            n = min(chunk_size, end - position)
+            yield file_transfer_pb2.FileChunk(
+                filename=name,
+                content=mapped[position:position + n],
+                offset=position,
+                file_size=file_size
+            )
+            position += n
+        yield file_transfer_pb2.FileChunk(filename=name, is_last=True, offset=end, file_size=file_size)
+
+    def ListFiles(self, request, context):
+        """
+        RPC method để liệt kê các file đã nhận kèm size/mtime
+        Client so sánh với bản local để chỉ tải những file đã thay đổi
+        """
+        files = []
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                if (entry.name.startswith('received_') and entry.name.startswith(request.prefix)
+                        and entry.is_file()):
+                    st = entry.stat()
+                    files.append(file_transfer_pb2.FileInfo(
+                        filename=entry.name,
+                        size=st.st_size,
+                        mtime_ns=st.st_mtime_ns
+                    ))
+        files.sort(key=lambda info: info.filename)
+        return file_transfer_pb2.FileList(files=files)
+
+def create_server(host=HOST, port=PORT, servicer=None, max_workers=MAX_WORKERS, options=None):
     """
-    Khởi động gRPC server
+    Tạo và start gRPC server (không chặn)
+    options: channel arguments, mặc định lấy từ grpc_config
+    Returns: grpc.Server
     """
+    if options is None:
+        options = grpc_options(max_concurrent_streams=MAX_CONCURRENT_STREAMS)
+    
     # Tạo gRPC server với thread pool
     # ThreadPoolExecutor quản lý các threads để xử lý requests đồng thời
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers), options=options)
     
     # Đăng ký servicer với server
     # add_FileTransferServiceServicer_to_server được generate tự động từ .proto
     file_transfer_pb2_grpc.add_FileTransferServiceServicer_to_server(
-        FileTransferServicer(), server
+        servicer or FileTransferServicer(), server
     )
     
     # Bind server với địa chỉ và port
-    server.add_insecure_port(f'{HOST}:{PORT}')
+    server.add_insecure_port(f'{host}:{port}')
     
     # Start server
     server.start()
+    return server
+
+def serve(corrupt_prob=0.0):
+    """
+    Khởi động gRPC server
+    corrupt_prob: giả lập lỗi đường truyền (xác suất làm hỏng 1 chunk nhận được)
+    """
+    server = create_server(servicer=FileTransferServicer(corrupt_prob=corrupt_prob))
     print(f"[SERVER] gRPC Server started on {HOST}:{PORT}")
     print("[SERVER] Waiting for clients...")
     
@@ -103,4 +722,7 @@ def serve():
         server.stop(0)
 
 if __name__ == '__main__':
-    serve()
+    parser = argparse.ArgumentParser(description="gRPC file transfer server")
+    parser.add_argument('--corrupt-prob', type=float, default=0.0,
+                        help="Giả lập lỗi đường truyền: xác suất làm hỏng 1 chunk nhận được")
+    serve(parser.parse_args().corrupt_prob)
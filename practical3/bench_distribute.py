@@ -0,0 +1,88 @@
+from mpi4py import MPI
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+
+import mpi_transfer
+
+# Run for each rank count, e.g.:
+#   for n in 2 4 8; do mpiexec -n $n python bench_distribute.py --size-mb 256; done
+
+
+def make_file(path, size_mb):
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def run_sequential(comm, source, output_dir, chunk_size):
+    """
+    Baseline: root sends the whole file to every other rank, one after another.
+    """
+    rank = comm.Get_rank()
+    if rank == 0:
+        for dest in range(1, comm.Get_size()):
+            mpi_transfer.run_sender_buffered(comm, dest, source, chunk_size)
+    else:
+        rank_dir = os.path.join(output_dir, f"rank{rank}")
+        os.makedirs(rank_dir, exist_ok=True)
+        mpi_transfer.run_receiver(comm, 0, rank_dir)
+
+
+def run_mode(comm, mode, source, output_dir, chunk_size):
+    # Returns the elapsed time of one distribution, output discarded
+    comm.Barrier()
+    start = MPI.Wtime()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if mode == 'sequential':
+            run_sequential(comm, source, output_dir, chunk_size)
+        elif mode == 'bcast':
+            mpi_transfer.run_broadcast(comm, source, 0, chunk_size, output_dir)
+        else:
+            mpi_transfer.run_scatter(comm, source, 0, chunk_size, output_dir)
+    comm.Barrier()
+    return MPI.Wtime() - start
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(usage="mpiexec -n N python bench_distribute.py [--size-mb M]")
+    parser.add_argument('--size-mb', type=int, default=256, help="Size of the test file in MB")
+    parser.add_argument('--chunk-size', type=int, default=mpi_transfer.BUFFER_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if size < 2:
+        if rank == 0:
+            print("Run with: mpiexec -n N python bench_distribute.py (N >= 2)")
+        sys.exit(1)
+
+    workdir = tempfile.mkdtemp() if rank == 0 else None
+    workdir = comm.bcast(workdir, root=0)
+    source = os.path.join(workdir, 'bench.bin')
+    if rank == 0:
+        make_file(source, args.size_mb)
+        print(f"{size} ranks, file size {args.size_mb} MB, chunk {args.chunk_size} bytes")
+        print(f"{'mode':<11} {'seconds':>9} {'delivered MB/s':>15}")
+
+    try:
+        for mode in ['sequential', 'bcast', 'scatter']:
+            elapsed = run_mode(comm, mode, source, workdir, args.chunk_size)
+            # Data that reached other ranks: a full copy each, or the whole file once for scatter
+            delivered = args.size_mb if mode == 'scatter' else args.size_mb * (size - 1)
+            if rank == 0:
+                print(f"{mode:<11} {elapsed:>9.3f} {delivered / elapsed:>15.1f}")
+    finally:
+        comm.Barrier()
+        if rank == 0:
+            shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
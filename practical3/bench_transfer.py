@@ -0,0 +1,77 @@
+from mpi4py import MPI
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+
+import mpi_transfer
+
+# Chunk sizes swept for each mode
+CHUNK_SIZES = [4 * 1024, 64 * 1024, 1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024]
+
+
+def make_file(path, size_mb):
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def timed_transfer(comm, mode, source, output_dir, chunk_size):
+    """
+    Run one transfer Rank 0 -> Rank 1 and return the elapsed time seen by Rank 0.
+    Program output is discarded so printing does not skew the numbers.
+    """
+    comm.Barrier()
+    start = MPI.Wtime()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if comm.Get_rank() == 0:
+            if mode == 'buffer':
+                mpi_transfer.run_sender_buffered(comm, 1, source, chunk_size)
+            else:
+                mpi_transfer.run_sender(comm, 1, source, chunk_size)
+        elif comm.Get_rank() == 1:
+            mpi_transfer.run_receiver(comm, 0, output_dir)
+    # The transfer is finished when the receiver has written everything
+    comm.Barrier()
+    return MPI.Wtime() - start
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+
+    parser = argparse.ArgumentParser(usage="mpiexec -n 2 python bench_transfer.py [--size-mb N]")
+    parser.add_argument('--size-mb', type=int, default=256, help="Size of the test file in MB")
+    args = parser.parse_args()
+
+    if comm.Get_size() < 2:
+        if rank == 0:
+            print("Run with: mpiexec -n 2 python bench_transfer.py")
+        sys.exit(1)
+
+    # Rank 0 creates the test file, every rank uses the same directory (single machine)
+    workdir = tempfile.mkdtemp() if rank == 0 else None
+    workdir = comm.bcast(workdir, root=0)
+    source = os.path.join(workdir, 'bench.bin')
+    if rank == 0:
+        make_file(source, args.size_mb)
+        print(f"File size: {args.size_mb} MB")
+        print(f"{'mode':<8} {'chunk':>10} {'seconds':>9} {'MB/s':>9}")
+
+    try:
+        for mode in ['pickle', 'buffer']:
+            for chunk_size in CHUNK_SIZES:
+                elapsed = timed_transfer(comm, mode, source, workdir, chunk_size)
+                if rank == 0:
+                    print(f"{mode:<8} {chunk_size:>10} {elapsed:>9.3f} {args.size_mb / elapsed:>9.1f}")
+    finally:
+        comm.Barrier()
+        if rank == 0:
+            shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,112 @@
 from mpi4py import MPI
+import argparse
 import os
 import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# End-to-end checksums are shared with practical1 (appended so local modules still win)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'practical1'))
+
+from integrity import (DEFAULT_ALGORITHM, MAX_REPAIR_ROUNDS, VERIFY_BLOCK_SIZE, BlockHasher, block_digest,
+                       block_range, corrupt_blocks, inject_corruption)
 
 # Constants for MPI Tags
 # We use tags to separate metadata messages from raw data messages
 TAG_METADATA = 1
 TAG_DATA = 2
+TAG_DIGEST = 3   # Per-block digests, sent by the sender after the data
+TAG_REPAIR = 4   # List of corrupt blocks the receiver wants again (empty list = done)
 CHUNK_SIZE = 4096  # 4KB chunks
+BUFFER_CHUNK_SIZE = 4 * 1024 * 1024  # 4MB chunks for the buffer-based fast path
+RECV_BUFFERS = 3  # Receiver buffers: one being written/hashed, two receiving
+CHECKSUM = DEFAULT_ALGORITHM  # Per-block digest of point-to-point transfers ('crc32' or 'blake2b')
+# Default MPI-IO hints for the parallel copy mode (ROMIO names, ignored if unsupported)
+DEFAULT_IO_HINTS = {
+    'romio_cb_read': 'enable',      # Collective buffering on reads
+    'romio_cb_write': 'enable',     # Collective buffering on writes
+    'cb_buffer_size': str(16 * 1024 * 1024),
+}
+
+def read_full(f, view):
+    """
+    Fill `view` from the file, looping over short reads.
+    Returns the number of bytes read (less than len(view) only at EOF).
+    """
+    total = 0
+    while total < len(view):
+        n = f.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+
+def verify_metadata():
+    # Tells the receiver how to hash the stream so both sides compute the same digests
+    return {'checksum': CHECKSUM, 'verify_block_size': VERIFY_BLOCK_SIZE}
+
+
+def send_repairs(comm, dest_rank, filename, digests):
+    """
+    Sender side of the end-to-end check.
+    Sends the block digests computed while streaming (no second pass over the file),
+    then resends whichever blocks the receiver reports as corrupt until it is satisfied.
+    """
+    comm.send(digests, dest=dest_rank, tag=TAG_DIGEST)
+    filesize = os.path.getsize(filename)
+    with open(filename, 'rb') as f:
+        while True:
+            blocks = comm.recv(source=dest_rank, tag=TAG_REPAIR)
+            if not blocks:
+                return
+            print(f"[Sender] Resending {len(blocks)} corrupt block(s)")
+            for index in blocks:
+                offset, length = block_range(index, filesize, VERIFY_BLOCK_SIZE)
+                comm.Send([os.pread(f.fileno(), length, offset), MPI.BYTE], dest=dest_rank, tag=TAG_DATA)
+
 
-def run_sender(comm, dest_rank, filename):
+def abort_send(comm, dest_rank, filename, sent_bytes, filesize):
+    # The file changed size while it was being sent: None instead of the digests
+    # tells the receiver to discard what it got
+    print(f"[Sender] Error: '{filename}' changed while sending ({sent_bytes} of {filesize} bytes), aborted.")
+    comm.send(None, dest=dest_rank, tag=TAG_DIGEST)
+
+
+def verify_and_repair(comm, source_rank, f, metadata, hasher, corrupt_prob=0.0):
+    """
+    Receiver side of the end-to-end check.
+    Compares the digests computed while writing with the sender's and pulls
+    corrupt blocks again with pwrite (at most MAX_REPAIR_ROUNDS rounds).
+    Returns True if every block matches.
+    """
+    expected = comm.recv(source=source_rank, tag=TAG_DIGEST)
+    if expected is None:
+        print("[Receiver] Sender could not read the whole file.")
+        return False
+    bad = corrupt_blocks(expected, hasher.finish())
+    f.flush()
+    rounds = 0
+    while bad and rounds < MAX_REPAIR_ROUNDS:
+        rounds += 1
+        print(f"[Receiver] {len(bad)} corrupt block(s), requesting retransmission")
+        comm.send(bad, dest=source_rank, tag=TAG_REPAIR)
+        still_bad = []
+        for index in bad:
+            offset, length = block_range(index, metadata['filesize'], metadata['verify_block_size'])
+            buffer = bytearray(length)
+            comm.Recv([buffer, MPI.BYTE], source=source_rank, tag=TAG_DATA)
+            data = inject_corruption(buffer, corrupt_prob)
+            if block_digest(data, metadata['checksum']) == expected[index]:
+                os.pwrite(f.fileno(), data, offset)
+            else:
+                still_bad.append(index)
+        bad = still_bad
+    comm.send([], dest=source_rank, tag=TAG_REPAIR)
+    return not bad
+
+
+def run_sender(comm, dest_rank, filename, chunk_size=CHUNK_SIZE):
     """
     Logic for the Sender (Rank 0)
     Reads a file and sends it to the destination rank.
@@ -24,28 +122,141 @@ def run_sender(comm, dest_rank, filename):
 
     # 1. Send Metadata
     # mpi4py's lowercase 'send' method uses pickle, so we can send Python dicts directly.
-    metadata = {'filename': os.path.basename(filename), 'filesize': filesize}
+    metadata = {'filename': os.path.basename(filename), 'filesize': filesize, **verify_metadata()}
     comm.send(metadata, dest=dest_rank, tag=TAG_METADATA)
 
-    # 2. Send File Content
+    # 2. Send File Content, hashing each chunk as it goes out
+    hasher = BlockHasher(VERIFY_BLOCK_SIZE, CHECKSUM)
     sent_bytes = 0
     with open(filename, 'rb') as f:
         while True:
-            chunk = f.read(CHUNK_SIZE)
+            chunk = f.read(chunk_size)
             if not chunk:
                 break
             comm.send(chunk, dest=dest_rank, tag=TAG_DATA)
+            hasher.update(chunk)
             sent_bytes += len(chunk)
 
     # 3. Send EOF Signal (Empty bytes) to indicate end of transmission
     comm.send(b'', dest=dest_rank, tag=TAG_DATA)
+    if sent_bytes != filesize:
+        abort_send(comm, dest_rank, filename, sent_bytes, filesize)
+        return
+    print(f"[Sender] Transfer complete. Sent {sent_bytes} bytes.")
+
+    # 4. Digests last, then resend any corrupt blocks
+    send_repairs(comm, dest_rank, filename, hasher.finish())
+
+
+def run_sender_buffered(comm, dest_rank, filename, chunk_size=BUFFER_CHUNK_SIZE):
+    """
+    Fast path for the Sender (Rank 0)
+    Uses uppercase Isend on two preallocated bytearrays (no pickling):
+    while one buffer is in flight, the next chunk is read into the other one.
+    The receiver knows the file size, so no EOF sentinel is needed.
+    """
+    if not os.path.isfile(filename):
+        print(f"[Sender] Error: File '{filename}' not found.")
+        comm.send(None, dest=dest_rank, tag=TAG_METADATA)
+        return
+
+    filesize = os.path.getsize(filename)
+    print(f"[Sender] Sending '{filename}' ({filesize} bytes) to Rank {dest_rank} "
+          f"in {chunk_size}-byte buffers...")
+
+    # 1. Send Metadata (small, so pickling is fine here)
+    metadata = {'filename': os.path.basename(filename), 'filesize': filesize, 'chunk_size': chunk_size,
+                **verify_metadata()}
+    comm.send(metadata, dest=dest_rank, tag=TAG_METADATA)
+
+    # 2. Double-buffered send: read and hash chunk k+1 while chunk k is being transferred
+    hasher = BlockHasher(VERIFY_BLOCK_SIZE, CHECKSUM)
+    buffers = [memoryview(bytearray(chunk_size)) for _ in range(2)]
+    requests = [MPI.REQUEST_NULL, MPI.REQUEST_NULL]
+    num_chunks = -(-filesize // chunk_size)
+    sent_bytes = 0
+    index = 0
+    with open(filename, 'rb', buffering=0) as f:
+        while index < num_chunks:
+            slot = index % 2
+            requests[slot].Wait()  # Buffer is free again once its previous send completed
+            length = min(chunk_size, filesize - sent_bytes)
+            n = read_full(f, buffers[slot][:length])
+            if n < length:
+                break  # The file shrank since its size was sent
+            hasher.update(buffers[slot][:n])
+            requests[slot] = comm.Isend([buffers[slot][:n], MPI.BYTE], dest=dest_rank, tag=TAG_DATA)
+            sent_bytes += n
+            index += 1
+    MPI.Request.Waitall(requests)
+
+    if index < num_chunks:
+        # The receiver has an Irecv posted for every chunk of the announced size:
+        # complete them with empty messages so it never blocks, then abort the transfer
+        for _ in range(num_chunks - index):
+            comm.Send([b'', MPI.BYTE], dest=dest_rank, tag=TAG_DATA)
+        abort_send(comm, dest_rank, filename, sent_bytes, filesize)
+        return
+
     print(f"[Sender] Transfer complete. Sent {sent_bytes} bytes.")
+    send_repairs(comm, dest_rank, filename, hasher.finish())
+
+
+def receive_buffered(comm, source_rank, f, filesize, chunk_size, hasher=None, corrupt_prob=0.0):
+    """
+    Fast path for the Receiver: uppercase Irecv into RECV_BUFFERS preallocated buffers.
+    A helper thread writes and hashes chunk k while the main thread waits on chunk k+1,
+    so checksumming never holds up MPI progress (file writes, zlib.crc32 and hashlib
+    release the GIL, and so does Wait()).
+    Returns the number of bytes written.
+    """
+    buffers = [memoryview(bytearray(chunk_size)) for _ in range(RECV_BUFFERS)]
+    requests = [MPI.REQUEST_NULL] * RECV_BUFFERS
+    num_chunks = -(-filesize // chunk_size)
 
+    def chunk_length(k):
+        return min(chunk_size, filesize - k * chunk_size)
 
-def run_receiver(comm, source_rank):
+    def post(k):
+        slot = k % RECV_BUFFERS
+        requests[slot] = comm.Irecv([buffers[slot][:chunk_length(k)], MPI.BYTE],
+                                    source=source_rank, tag=TAG_DATA)
+
+    def store(k):
+        # Runs on the helper thread, one chunk at a time and in order
+        data = inject_corruption(buffers[k % RECV_BUFFERS][:chunk_length(k)], corrupt_prob)
+        f.write(data)
+        if hasher is not None:
+            hasher.update(data)
+
+    for k in range(min(RECV_BUFFERS, num_chunks)):
+        post(k)
+
+    with ThreadPoolExecutor(max_workers=1) as helper:
+        pending = None
+        for k in range(num_chunks):
+            requests[k % RECV_BUFFERS].Wait()
+            if pending is not None:
+                # Chunk k-1 is on disk and hashed: its buffer can receive chunk k-1+RECV_BUFFERS
+                pending.result()
+                if k - 1 + RECV_BUFFERS < num_chunks:
+                    post(k - 1 + RECV_BUFFERS)
+            pending = helper.submit(store, k)
+        if pending is not None:
+            pending.result()
+    return filesize
+
+
+def run_receiver(comm, source_rank, output_dir='.', corrupt_prob=0.0):
     """
     Logic for the Receiver (Rank 1)
     Listens for a file from the source rank and writes it to disk.
+    Handles both the pickle path and the buffer-based fast path,
+    depending on the metadata sent by the sender.
+    Every block is hashed as it is written and checked against the sender's digests;
+    corrupt blocks are fetched again, and the file is deleted if they stay corrupt.
+    corrupt_prob: testing only, chance of damaging each received chunk
+    Returns True if the file was received intact.
     """
     print(f"[Receiver] Waiting for file from Rank {source_rank}...")
 
@@ -54,27 +265,257 @@ def run_receiver(comm, source_rank):
     
     if metadata is None:
         print("[Receiver] Sender aborted (File not found).")
-        return
+        return False
 
     # Prefix the filename so we don't overwrite the original if running in the same folder
-    filename = "mpi_recv_" + metadata['filename']
+    filename = os.path.join(output_dir, "mpi_recv_" + os.path.basename(metadata['filename']))
     filesize = metadata['filesize']
     print(f"[Receiver] Incoming file: '{filename}' expecting {filesize} bytes.")
+    hasher = BlockHasher(metadata['verify_block_size'], metadata['checksum'])
 
-    # 2. Receive Data Loop
-    received_bytes = 0
     with open(filename, 'wb') as f:
-        while True:
-            # We receive chunks until we get an empty byte string
-            chunk = comm.recv(source=source_rank, tag=TAG_DATA)
-            
-            if not chunk: # Empty bytes means EOF
-                break
+        # Buffer-based fast path: the sender told us its chunk size
+        if 'chunk_size' in metadata:
+            received_bytes = receive_buffered(comm, source_rank, f, filesize, metadata['chunk_size'],
+                                              hasher, corrupt_prob)
+        else:
+            # 2. Receive Data Loop
+            received_bytes = 0
+            while True:
+                # We receive chunks until we get an empty byte string
+                chunk = comm.recv(source=source_rank, tag=TAG_DATA)
                 
-            f.write(chunk)
-            received_bytes += len(chunk)
+                if not chunk: # Empty bytes means EOF
+                    break
+                    
+                chunk = inject_corruption(chunk, corrupt_prob)
+                f.write(chunk)
+                hasher.update(chunk)
+                received_bytes += len(chunk)
+
+        # 3. Compare digests, fetch corrupt blocks again
+        ok = verify_and_repair(comm, source_rank, f, metadata, hasher, corrupt_prob)
 
-    print(f"[Receiver] Saved to '{filename}'. Total bytes: {received_bytes}")
+    if not ok:
+        os.remove(filename)
+        print(f"[Receiver] Transfer not verified, discarded '{filename}'")
+        return False
+    print(f"[Receiver] Saved to '{filename}'. Total bytes: {received_bytes} ({metadata['checksum']} verified)")
+    return True
+
+
+def share_metadata(comm, filename, root, chunk_size):
+    """
+    Root checks the file and broadcasts its metadata to every rank.
+    Returns the metadata dict, or None on every rank if the file is missing.
+    """
+    metadata = None
+    if comm.Get_rank() == root:
+        if filename and os.path.isfile(filename):
+            metadata = {'filename': os.path.basename(filename),
+                        'filesize': os.path.getsize(filename),
+                        'chunk_size': chunk_size}
+        else:
+            print(f"[Rank {root}] Error: File '{filename}' not found.")
+    return comm.bcast(metadata, root=root)
+
+
+def run_broadcast(comm, filename, root=0, chunk_size=BUFFER_CHUNK_SIZE, output_dir='.'):
+    """
+    One-to-many distribution: every rank except root receives a full copy.
+    Each chunk goes through comm.Ibcast, so the MPI library uses its tree /
+    pipelined broadcast algorithms (log-depth) instead of N-1 sequential sends.
+    Two buffers keep one broadcast in flight while the previous chunk is
+    read (root) or written to disk (other ranks).
+    """
+    rank = comm.Get_rank()
+    metadata = share_metadata(comm, filename, root, chunk_size)
+    if metadata is None:
+        if rank != root:
+            print(f"[Rank {rank}] Root aborted (File not found).")
+        return
+
+    filesize = metadata['filesize']
+    num_chunks = -(-filesize // chunk_size)
+    buffers = [memoryview(bytearray(chunk_size)) for _ in range(2)]
+    requests = [MPI.REQUEST_NULL, MPI.REQUEST_NULL]
+
+    def chunk_length(k):
+        return min(chunk_size, filesize - k * chunk_size)
+
+    if rank == root:
+        print(f"[Rank {rank}] Broadcasting '{filename}' ({filesize} bytes) to {comm.Get_size() - 1} ranks...")
+        f = open(filename, 'rb', buffering=0)
+    else:
+        # Rank in the name so several ranks on one machine don't share an output file
+        out_name = os.path.join(output_dir, f"mpi_recv_rank{rank}_" + metadata['filename'])
+        f = open(out_name, 'wb')
+
+    def finish(k):
+        # Wait for broadcast k; non-root ranks then write it out
+        if k < 0:
+            return
+        requests[k % 2].Wait()
+        if rank != root:
+            f.write(buffers[k % 2][:chunk_length(k)])
+
+    with f:
+        for k in range(num_chunks):
+            slot = k % 2
+            finish(k - 2)  # Buffer `slot` is reused for chunk k
+            view = buffers[slot][:chunk_length(k)]
+            if rank == root:
+                read_full(f, view)
+            requests[slot] = comm.Ibcast([view, MPI.BYTE], root=root)
+        finish(num_chunks - 2)
+        finish(num_chunks - 1)
+
+    if rank == root:
+        print(f"[Rank {rank}] Broadcast complete.")
+    else:
+        print(f"[Rank {rank}] Saved to '{out_name}'. Total bytes: {filesize}")
+
+
+def run_scatter(comm, filename, root=0, chunk_size=BUFFER_CHUNK_SIZE, output_dir='.'):
+    """
+    Sharded distribution: the file is split into one contiguous shard per rank
+    (root included) and each rank receives only its own shard.
+    Shards are moved in rounds of Scatterv with at most chunk_size bytes per rank,
+    so root never holds more than size * chunk_size bytes in memory.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    metadata = share_metadata(comm, filename, root, chunk_size)
+    if metadata is None:
+        if rank != root:
+            print(f"[Rank {rank}] Root aborted (File not found).")
+        return
+
+    filesize = metadata['filesize']
+    shard_size = -(-filesize // size)
+    starts = [min(i * shard_size, filesize) for i in range(size)]
+    lengths = [min(shard_size, filesize - start) for start in starts]
+    num_rounds = -(-max(lengths) // chunk_size)
+    displacements = [i * chunk_size for i in range(size)]
+
+    recv_view = memoryview(bytearray(chunk_size))
+    send_view = memoryview(bytearray(chunk_size * size)) if rank == root else None
+    src = open(filename, 'rb', buffering=0) if rank == root else None
+    out_name = os.path.join(output_dir, f"mpi_shard{rank}_" + metadata['filename'])
+
+    with open(out_name, 'wb') as out:
+        for r in range(num_rounds):
+            counts = [max(0, min(chunk_size, length - r * chunk_size)) for length in lengths]
+            if rank == root:
+                # Pack this round's piece of every shard into the send buffer
+                for i in range(size):
+                    if counts[i]:
+                        src.seek(starts[i] + r * chunk_size)
+                        read_full(src, send_view[displacements[i]:displacements[i] + counts[i]])
+                sendbuf = [send_view, counts, displacements, MPI.BYTE]
+            else:
+                sendbuf = None
+            comm.Scatterv(sendbuf, [recv_view[:counts[rank]], MPI.BYTE], root=root)
+            out.write(recv_view[:counts[rank]])
+    if src is not None:
+        src.close()
+
+    print(f"[Rank {rank}] Shard bytes {starts[rank]}-{starts[rank] + lengths[rank]} "
+          f"saved to '{out_name}'.")
+
+
+def make_info(hints):
+    # Build an MPI.Info object from a {key: value} dict of MPI-IO hints
+    info = MPI.Info.Create()
+    for key, value in hints.items():
+        info.Set(key, str(value))
+    return info
+
+
+def rank_region(filesize, rank, size):
+    # Contiguous, disjoint [start, start + length) region handled by one rank
+    share = -(-filesize // size)
+    start = min(rank * share, filesize)
+    return start, min(share, filesize - start)
+
+
+def collective_rounds(comm, filesize, chunk_size):
+    """
+    Yield (offset, length) of this rank's pieces, one per round.
+    Every rank runs the same number of rounds (collective calls must match),
+    ranks that are already done get zero-length pieces.
+    """
+    start, length = rank_region(filesize, comm.Get_rank(), comm.Get_size())
+    share = -(-filesize // comm.Get_size())
+    for r in range(-(-share // chunk_size)):
+        yield start + r * chunk_size, max(0, min(chunk_size, length - r * chunk_size))
+
+
+def run_parallel_copy(comm, src, dest, chunk_size=BUFFER_CHUNK_SIZE, hints=None):
+    """
+    MPI-IO copy: every rank reads and writes its own region of the file with
+    collective Read_at_all / Write_at_all, so the I/O is spread over all ranks
+    instead of going through a single process.
+    hints: MPI-IO hints (collective buffering, striping, ...), see DEFAULT_IO_HINTS
+    """
+    rank = comm.Get_rank()
+    metadata = share_metadata(comm, src, 0, chunk_size)
+    if metadata is None:
+        return False
+
+    info = make_info(DEFAULT_IO_HINTS if hints is None else hints)
+    fin = MPI.File.Open(comm, src, MPI.MODE_RDONLY, info)
+    fout = MPI.File.Open(comm, dest, MPI.MODE_CREATE | MPI.MODE_WRONLY, info)
+    filesize = fin.Get_size()
+    fout.Set_size(filesize)  # Collective: drop any leftover tail of an older dest file
+
+    buffer = memoryview(bytearray(chunk_size))
+    copied = 0
+    for offset, n in collective_rounds(comm, filesize, chunk_size):
+        fin.Read_at_all(offset, [buffer[:n], MPI.BYTE])
+        fout.Write_at_all(offset, [buffer[:n], MPI.BYTE])
+        copied += n
+
+    fin.Close()
+    fout.Close()
+    info.Free()
+
+    total = comm.reduce(copied, op=MPI.SUM, root=0)
+    if rank == 0:
+        print(f"[Rank 0] Copied '{src}' -> '{dest}' ({total} bytes) with {comm.Get_size()} ranks.")
+    return True
+
+
+def verify_copy(comm, src, dest, chunk_size=BUFFER_CHUNK_SIZE):
+    """
+    Collectively checksum both files: each rank CRC32s its own region of
+    src and dest, and root compares the per-region checksums.
+    Returns True on every rank if the files are identical.
+    """
+    fin = MPI.File.Open(comm, src, MPI.MODE_RDONLY)
+    fout = MPI.File.Open(comm, dest, MPI.MODE_RDONLY)
+    filesize = fin.Get_size()
+    same_size = filesize == fout.Get_size()
+
+    src_buffer = memoryview(bytearray(chunk_size))
+    dest_buffer = memoryview(bytearray(chunk_size))
+    src_crc = dest_crc = 0
+    for offset, n in collective_rounds(comm, filesize, chunk_size):
+        fin.Read_at_all(offset, [src_buffer[:n], MPI.BYTE])
+        fout.Read_at_all(offset, [dest_buffer[:n], MPI.BYTE])
+        src_crc = zlib.crc32(src_buffer[:n], src_crc)
+        dest_crc = zlib.crc32(dest_buffer[:n], dest_crc)
+    fin.Close()
+    fout.Close()
+
+    checksums = comm.gather((src_crc, dest_crc), root=0)
+    ok = None
+    if comm.Get_rank() == 0:
+        ok = same_size and all(a == b for a, b in checksums)
+        for i, (a, b) in enumerate(checksums):
+            print(f"[Rank 0] Region {i}: src crc32={a:08x} dest crc32={b:08x}")
+        print(f"[Rank 0] Verify {'OK' if ok else 'FAILED'}")
+    return comm.bcast(ok, root=0)
 
 
 if __name__ == "__main__":
@@ -83,6 +524,37 @@ if __name__ == "__main__":
     rank = comm.Get_rank()
     size = comm.Get_size()
 
+    parser = argparse.ArgumentParser(usage="mpiexec -n 2 python mpi_transfer.py <file_to_send> [options]")
+    parser.add_argument('file', nargs='?', help="File to send from Rank 0")
+    parser.add_argument('--mode', choices=['buffer', 'pickle', 'bcast', 'scatter', 'copy'], default='buffer',
+                        help="buffer: uppercase Isend/Irecv fast path, pickle: lowercase send/recv, "
+                             "bcast: full copy to every rank, scatter: one shard per rank, "
+                             "copy: parallel MPI-IO copy to --dest")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help=f"Bytes per message (default {CHUNK_SIZE} for pickle, {BUFFER_CHUNK_SIZE} otherwise)")
+    parser.add_argument('--dest', help="Destination path for --mode copy")
+    parser.add_argument('--hint', action='append', default=[], metavar='KEY=VALUE',
+                        help="MPI-IO hint for --mode copy (repeatable), replaces the defaults")
+    parser.add_argument('--verify', action='store_true',
+                        help="After --mode copy, checksum the destination against the source")
+    parser.add_argument('--corrupt-prob', type=float, default=0.0,
+                        help="Testing only: chance that the receiver damages each chunk it gets "
+                             "(exercises block retransmission in the buffer and pickle modes)")
+    args = parser.parse_args()
+
+    # Parallel MPI-IO copy works with any number of ranks
+    if args.mode == 'copy':
+        if args.file is None or args.dest is None:
+            if rank == 0:
+                print("Usage: mpiexec -n N python mpi_transfer.py <src> --mode copy --dest <dest>")
+            sys.exit(1)
+        hints = dict(h.split('=', 1) for h in args.hint) if args.hint else None
+        copied = run_parallel_copy(comm, args.file, args.dest,
+                                   chunk_size=args.chunk_size or BUFFER_CHUNK_SIZE, hints=hints)
+        if copied and args.verify and not verify_copy(comm, args.file, args.dest):
+            sys.exit(1)
+        sys.exit(0 if copied else 1)
+
     # This script requires exactly 2 processes to demonstrate 1-to-1 transfer
     if size < 2:
         if rank == 0:
@@ -90,22 +562,31 @@ if __name__ == "__main__":
             print("Run with: mpiexec -n 2 python mpi_transfer.py <file_to_send>")
         sys.exit(1)
 
+    # One-to-many modes: every rank takes part
+    if args.mode == 'bcast':
+        run_broadcast(comm, args.file, root=0, chunk_size=args.chunk_size or BUFFER_CHUNK_SIZE)
+    elif args.mode == 'scatter':
+        run_scatter(comm, args.file, root=0, chunk_size=args.chunk_size or BUFFER_CHUNK_SIZE)
+
     # Rank 0 acts as the Sender
-    if rank == 0:
+    elif rank == 0:
         # Check command line args for filename
-        if len(sys.argv) < 2:
+        if args.file is None:
             print("Usage: mpiexec -n 2 python mpi_transfer.py <file_to_send>")
             # Send abort signal to receiver if we can't run
             comm.send(None, dest=1, tag=TAG_METADATA)
             sys.exit(1)
             
-        file_to_send = sys.argv[1]
-        run_sender(comm, dest_rank=1, filename=file_to_send)
+        if args.mode == 'buffer':
+            run_sender_buffered(comm, dest_rank=1, filename=args.file,
+                                chunk_size=args.chunk_size or BUFFER_CHUNK_SIZE)
+        else:
+            run_sender(comm, dest_rank=1, filename=args.file, chunk_size=args.chunk_size or CHUNK_SIZE)
         
     # Rank 1 acts as the Receiver
     elif rank == 1:
-        run_receiver(comm, source_rank=0)
+        run_receiver(comm, source_rank=0, corrupt_prob=args.corrupt_prob)
     
     # Any other ranks stay idle
     else:
-        print(f"[Rank {rank}] Idle. Only Ranks 0 and 1 are used in this demo.")
\ No newline at end of file
+        print(f"[Rank {rank}] Idle. Only Ranks 0 and 1 are used in this mode (try --mode bcast).")
\ No newline at end of file
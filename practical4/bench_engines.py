@@ -0,0 +1,57 @@
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+import wordcount
+from bench_wordcount import make_corpus
+
+# Mỗi engine: hàm nhận (path, workers), trả về dict {word: count}
+ENGINES = {
+    'threads': lambda path, workers: wordcount.run_threads(path),
+    'processes': wordcount.run_processes,
+    'bytes': wordcount.run_bytes,
+    'streaming': lambda path, workers: dict(wordcount.run_streaming(path)),
+    'mapreduce': wordcount.run_framework,
+}
+
+
+def measure(run):
+    # Chạy 1 engine, bỏ output in ra của engine
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="So sánh tokens/giây của các engine wordcount theo kích thước input")
+    parser.add_argument('--sizes-mb', type=int, nargs='+', default=[16, 64, 256], help="Các kích thước corpus (MB)")
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--workers', type=int, default=None, help="Số worker (mặc định: số core)")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count() or 1} cores")
+    print(f"{'size MB':>8} {'engine':<10} {'seconds':>8} {'Mtokens/s':>10} {'MB/s':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(workdir, f'corpus_{size_mb}.txt')
+            make_corpus(path, size_mb)
+            expected = None
+            for engine in args.engines:
+                elapsed, result = measure(lambda: ENGINES[engine](path, args.workers))
+                tokens = sum(result.values())
+                print(f"{size_mb:>8} {engine:<10} {elapsed:>8.2f} {tokens / elapsed / 1e6:>10.2f} "
+                      f"{size_mb / elapsed:>8.1f}")
+                if expected is None:
+                    expected = result
+                elif dict(result) != dict(expected):
+                    print(f"  MISMATCH: {engine} differs from {args.engines[0]}!", file=sys.stderr)
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+
+from bench_wordcount import make_corpus
+
+
+def run(mpiexec, ranks, path):
+    # Chạy mpi_wordcount.py với `ranks` rank, lấy thời gian tổng rank 0 tự đo
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = shlex.split(mpiexec) + ['-n', str(ranks), sys.executable, 'mpi_wordcount.py', path, '--summary']
+    output = subprocess.run(command, cwd=here, capture_output=True, text=True, check=True).stdout
+    return float(re.search(r"total\s+([\d.]+)s", output).group(1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Đo khả năng mở rộng của mpi_wordcount.py theo số rank")
+    parser.add_argument('--size-mb', type=int, default=1024, help="Kích thước corpus (MB)")
+    parser.add_argument('--input', help="Dùng file có sẵn thay vì sinh corpus")
+    parser.add_argument('--ranks', type=int, nargs='+', default=None,
+                        help="Các số rank cần đo (mặc định: 1, 2, 4, ... tới số core)")
+    parser.add_argument('--mpiexec', default='mpiexec', help="Lệnh mpiexec (có thể kèm tham số)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    ranks = args.ranks or [1 << i for i in range(cores.bit_length())] + [cores]
+    # Luôn đo 1 rank để làm mốc tính speedup
+    ranks = sorted(set(ranks) | {1})
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = args.input
+        if path is None:
+            path = os.path.join(workdir, 'corpus.txt')
+            make_corpus(path, args.size_mb)
+        print(f"Corpus: {os.path.getsize(path) / 1024 / 1024:.0f} MB, {cores} cores")
+        print(f"{'ranks':>5} {'seconds':>8} {'speedup':>8} {'efficiency':>10}")
+
+        baseline = None
+        for n in ranks:
+            elapsed = run(args.mpiexec, n, path)
+            baseline = baseline or elapsed
+            speedup = baseline / elapsed
+            print(f"{n:>5} {elapsed:>8.2f} {speedup:>7.2f}x {speedup / n:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
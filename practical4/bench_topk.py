@@ -0,0 +1,74 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import heavy_hitters
+import wordcount
+from bench_wordcount import make_corpus
+
+EPSILONS = [0.01, 0.001, 0.0001]
+
+
+def measure(run):
+    # Đo thời gian và bộ nhớ cấp phát lớn nhất (tracemalloc) của 1 lần đếm
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def accuracy(approx_top, exact, exact_top):
+    """
+    recall: tỉ lệ từ của top-K thật có mặt trong top-K xấp xỉ
+    max_error: sai số tương đối lớn nhất của count ước lượng so với count thật
+    """
+    expected = {word for word, _ in exact_top}
+    recall = len(expected & {word for word, _ in approx_top}) / len(expected)
+    max_error = max((count - exact[word]) / exact[word] for word, count in approx_top)
+    return recall, max_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="So sánh độ chính xác và bộ nhớ của top-K xấp xỉ với đếm chính xác")
+    parser.add_argument('--size-mb', type=int, default=50, help="Kích thước corpus (MB)")
+    parser.add_argument('--vocabulary', type=int, default=500000, help="Số từ phân biệt trong corpus sinh ra")
+    parser.add_argument('--top', type=int, default=100, help="K")
+    parser.add_argument('--input', help="Dùng file có sẵn thay vì sinh corpus")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = args.input
+        if path is None:
+            path = os.path.join(workdir, 'corpus.txt')
+            make_corpus(path, args.size_mb, vocabulary=args.vocabulary)
+        print(f"Corpus: {os.path.getsize(path) / 1024 / 1024:.0f} MB, top {args.top}")
+
+        exact, elapsed, peak = measure(
+            lambda: Counter(word for text in wordcount.read_text_blocks(path) for word in text.split())
+        )
+        exact_top = heavy_hitters.top_k(exact.items(), args.top)
+        print(f"{'mode':<12} {'epsilon':>8} {'cells':>9} {'peak MB':>8} {'seconds':>8} {'recall':>7} {'max err':>8}")
+        print(f"{'exact':<12} {'-':>8} {len(exact):>9} {peak / 1024 / 1024:>8.1f} {elapsed:>8.2f} {1:>7.2f} {0:>8.4f}")
+
+        for epsilon in EPSILONS:
+            for mode in ['spacesaving', 'cms']:
+                if mode == 'spacesaving':
+                    summary = heavy_hitters.SpaceSaving.from_error(epsilon, args.top)
+                else:
+                    summary = heavy_hitters.CountMinSketch.from_error(args.top, epsilon)
+                _, elapsed, peak = measure(
+                    lambda: heavy_hitters.count_approximate(wordcount.read_text_blocks(path), summary)
+                )
+                recall, max_error = accuracy(heavy_hitters.top_k(summary.items(), args.top), exact, exact_top)
+                print(f"{mode:<12} {epsilon:>8} {summary.memory_cells():>9} {peak / 1024 / 1024:>8.1f} "
+                      f"{elapsed:>8.2f} {recall:>7.2f} {max_error:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
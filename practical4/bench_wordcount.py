@@ -0,0 +1,61 @@
+import argparse
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+import wordcount
+
+
+def make_corpus(path, size_mb, vocabulary=50000, seed=1):
+    # Sinh corpus ngẫu nhiên với phân phối tần suất lệch (giống văn bản thật)
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    weights = [1 / (i + 1) for i in range(vocabulary)]
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w') as f:
+        while written < target:
+            line = ' '.join(rng.choices(words, weights, k=2000)) + '\n'
+            f.write(line)
+            written += len(line)
+
+
+def timed(label, run, baseline=None):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+    speedup = f"{baseline / elapsed:6.2f}x" if baseline else "  1.00x"
+    print(f"{label:<24} {elapsed:8.2f}s {speedup}")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="So sánh engine threads và processes của wordcount.py")
+    parser.add_argument('--size-mb', type=int, default=300, help="Kích thước corpus (MB)")
+    parser.add_argument('--input', help="Dùng file có sẵn thay vì sinh corpus")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores} | {w for w in (8, 16) if w <= cores})
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = args.input
+        if path is None:
+            path = os.path.join(workdir, 'corpus.txt')
+            make_corpus(path, args.size_mb)
+        print(f"Corpus: {os.path.getsize(path) / 1024 / 1024:.0f} MB, {cores} cores")
+
+        baseline, expected = timed(f"threads x{wordcount.NUM_MAPPERS}", lambda: wordcount.run_threads(path))
+        for workers in worker_counts:
+            _, result = timed(f"processes x{workers}",
+                              lambda: wordcount.run_processes(path, workers), baseline)
+            if dict(result) != expected:
+                print("  MISMATCH with threads engine!", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import heapq
+import math
+import random
+import zlib
+from collections import Counter
+
+# Cấu hình mặc định cho chế độ xấp xỉ
+EPSILON = 0.001   # Sai số tối đa = EPSILON * tổng số từ
+DELTA = 0.01      # Xác suất vượt sai số (chỉ dùng cho Count-Min Sketch)
+PRIME = (1 << 61) - 1  # Số nguyên tố Mersenne cho họ hàm hash (a * x + b) mod p
+
+
+def top_k(items, k):
+    """
+    Lấy k cặp (word, count) lớn nhất bằng heap kích thước k: O(n log k) thay vì sort toàn bộ
+    items: iterable (word, count), có thể là generator (không cần giữ hết trong bộ nhớ)
+    Returns: list (word, count) theo count giảm dần, cùng count thì theo word tăng dần
+    """
+    # Khoá (-count, word) để chọn đúng k phần tử theo thứ tự đã hứa, không phụ thuộc thứ tự đầu vào
+    return heapq.nsmallest(k, items, key=lambda item: (-item[1], item[0]))
+
+
+class SpaceSaving:
+    """
+    Thuật toán Space-Saving (Metwally et al.): theo dõi tối đa `capacity` từ
+    Khi đầy, từ mới thay thế từ có count nhỏ nhất và kế thừa count đó làm sai số
+    Đảm bảo: count ước lượng >= count thật và sai số <= N / capacity (N = tổng số từ)
+    => capacity = ceil(1 / epsilon) cho sai số <= epsilon * N, bộ nhớ cố định
+    (không nhỏ hơn k, nếu không thì không đủ chỗ cho top-K)
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}   # word -> count ước lượng
+        self.errors = {}   # word -> sai số tối đa (count kế thừa khi thay thế)
+        self.heap = []     # min-heap (count, word), có thể chứa entry cũ (xóa lười)
+        self.total = 0
+
+    @classmethod
+    def from_error(cls, epsilon=EPSILON, k=0):
+        return cls(max(math.ceil(1 / epsilon), k))
+
+    def _pop_min(self):
+        # Bỏ qua các entry đã cũ (count trong heap khác count hiện tại)
+        while True:
+            count, word = heapq.heappop(self.heap)
+            if self.counts.get(word) == count:
+                return count, word
+
+    def add(self, word, weight=1):
+        self.total += weight
+        if word in self.counts:
+            self.counts[word] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[word] = weight
+            self.errors[word] = 0
+        else:
+            min_count, victim = self._pop_min()
+            del self.counts[victim], self.errors[victim]
+            self.counts[word] = min_count + weight
+            self.errors[word] = min_count
+        heapq.heappush(self.heap, (self.counts[word], word))
+        # Dọn các entry cũ để heap không lớn quá 4 lần capacity
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(count, word) for word, count in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def update(self, counts):
+        # Thêm cả 1 Counter cục bộ (Space-Saving có trọng số giữ nguyên đảm bảo sai số)
+        for word, count in counts.items():
+            self.add(word, count)
+
+    def error_bound(self):
+        return self.total // self.capacity
+
+    def items(self):
+        return self.counts.items()
+
+    def memory_cells(self):
+        return self.capacity
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch: mảng depth x width bộ đếm, mỗi hàng dùng 1 hàm hash
+    Ước lượng = min trên các hàng: >= count thật, và <= count thật + epsilon * N
+    với xác suất >= 1 - delta khi width = ceil(e / epsilon), depth = ceil(ln(1 / delta))
+    Mỗi hàng dùng hàm hash ((a * crc32(word) + b) mod PRIME) mod width với a, b ngẫu nhiên
+    (họ hash universal: các hàng độc lập nhau). crc32 thay cho hash() vì hash() của str
+    thay đổi theo PYTHONHASHSEED => cùng seed luôn cho cùng kết quả giữa các lần chạy
+    Sketch không lưu từ, nên giữ thêm tập `k` ứng viên lớn nhất để trả về top-K
+    """
+
+    def __init__(self, width, depth, k, seed=0):
+        self.width = width
+        self.depth = depth
+        self.k = k
+        rng = random.Random(seed)
+        self.hashes = [(rng.randrange(1, PRIME), rng.randrange(PRIME)) for _ in range(depth)]
+        self.rows = [[0] * width for _ in range(depth)]
+        self.candidates = {}  # word -> count ước lượng, tối đa k từ
+        self.heap = []        # min-heap (count, word) của candidates, có thể chứa entry cũ (xóa lười)
+        self.total = 0
+
+    @classmethod
+    def from_error(cls, k, epsilon=EPSILON, delta=DELTA, seed=0):
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)), k, seed)
+
+    @staticmethod
+    def _key(word):
+        return zlib.crc32(word.encode('utf-8'))
+
+    def _min_candidate(self):
+        # Đỉnh heap, bỏ qua các entry đã cũ (count trong heap khác count hiện tại)
+        while True:
+            count, word = self.heap[0]
+            if self.candidates.get(word) == count:
+                return count, word
+            heapq.heappop(self.heap)
+
+    def add(self, word, weight=1):
+        self.total += weight
+        estimate = None
+        x = self._key(word)
+        for (a, b), row in zip(self.hashes, self.rows):
+            index = (a * x + b) % PRIME % self.width
+            row[index] += weight
+            if estimate is None or row[index] < estimate:
+                estimate = row[index]
+
+        # Cập nhật tập ứng viên top-K: min lấy từ heap (O(log k)) thay vì quét cả tập
+        if word not in self.candidates and len(self.candidates) >= self.k:
+            if not self.k:
+                return
+            floor, smallest = self._min_candidate()
+            if estimate <= floor:
+                return
+            heapq.heappop(self.heap)
+            del self.candidates[smallest]
+        self.candidates[word] = estimate
+        heapq.heappush(self.heap, (estimate, word))
+        # Dọn các entry cũ để heap không lớn quá 4 lần k
+        if len(self.heap) > 4 * self.k:
+            self.heap = [(count, word) for word, count in self.candidates.items()]
+            heapq.heapify(self.heap)
+
+    def update(self, counts):
+        for word, count in counts.items():
+            self.add(word, count)
+
+    def estimate(self, word):
+        x = self._key(word)
+        return min(row[(a * x + b) % PRIME % self.width] for (a, b), row in zip(self.hashes, self.rows))
+
+    def error_bound(self):
+        return math.ceil(math.e / self.width * self.total)
+
+    def items(self):
+        return self.candidates.items()
+
+    def memory_cells(self):
+        return self.width * self.depth + self.k
+
+
+def count_approximate(blocks, summary):
+    """
+    Đếm xấp xỉ trên các block văn bản: đếm chính xác trong block bằng Counter
+    rồi đưa vào summary (SpaceSaving hoặc CountMinSketch) => bộ nhớ chỉ phụ thuộc
+    kích thước block và kích thước summary, không phụ thuộc số từ phân biệt của file
+    """
+    for text in blocks:
+        summary.update(Counter(text.split()))
+    return summary
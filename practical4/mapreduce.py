@@ -0,0 +1,126 @@
+import os
+import zlib
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+
+NUM_REDUCERS = 4     # Số partition (reducer) mặc định
+COMBINE_BATCH = 64   # Gọi combiner khi 1 key gom đủ số value này ở phía map
+
+
+def stable_hash(key):
+    """
+    Hash ổn định giữa các process: hash() của str/bytes bị random theo từng process
+    (PYTHONHASHSEED), nếu dùng hash() thì cùng 1 key có thể rơi vào 2 partition khác nhau
+    """
+    if isinstance(key, int):
+        return key
+    if isinstance(key, str):
+        key = key.encode('utf-8')
+    elif not isinstance(key, bytes):
+        key = repr(key).encode('utf-8')
+    return zlib.crc32(key)
+
+
+def read_lines(path):
+    # Reader mặc định: mỗi split là 1 file, mỗi record là 1 dòng
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from f
+
+
+class Job:
+    """
+    Mô tả 1 job MapReduce
+    mapper(record): trả về iterable các cặp (key, value)
+    reducer(key, values): gộp list value của 1 key thành kết quả cuối
+    combiner(key, values): (tùy chọn) gộp một phần value ở phía map, kết quả phải
+        cùng kiểu với value (ví dụ sum, max) để còn gộp tiếp được
+    reader(split): sinh các record từ 1 input split (mặc định: các dòng của file)
+    Với engine processes, các hàm phải khai báo ở mức module để pickle được
+    """
+
+    def __init__(self, mapper, reducer, combiner=None, reader=read_lines,
+                 num_reducers=NUM_REDUCERS, partitioner=stable_hash):
+        self.mapper = mapper
+        self.reducer = reducer
+        self.combiner = combiner
+        self.reader = reader
+        self.num_reducers = num_reducers
+        self.partitioner = partitioner
+
+    def partition(self, key):
+        return self.partitioner(key) % self.num_reducers
+
+
+def map_task(args):
+    """
+    Chạy mapper trên 1 split, chia output theo partition
+    Có combiner thì mỗi key chỉ giữ tối đa COMBINE_BATCH value trước khi gộp lại,
+    nên không bao giờ giữ toàn bộ các cặp trung gian trong bộ nhớ
+    Returns: list num_reducers dict {key: [values]}
+    """
+    job, split = args
+    partitions = [{} for _ in range(job.num_reducers)]
+    combiner = job.combiner
+
+    for record in job.reader(split):
+        for key, value in job.mapper(record):
+            bucket = partitions[job.partition(key)]
+            values = bucket.get(key)
+            if values is None:
+                bucket[key] = [value]
+                continue
+            values.append(value)
+            if combiner is not None and len(values) >= COMBINE_BATCH:
+                bucket[key] = [combiner(key, values)]
+
+    if combiner is not None:
+        for bucket in partitions:
+            for key, values in bucket.items():
+                if len(values) > 1:
+                    bucket[key] = [combiner(key, values)]
+    return partitions
+
+
+def reduce_task(args):
+    """
+    Gộp output của 1 partition từ mọi map task rồi gọi reducer cho từng key
+    Returns: dict {key: kết quả reducer}
+    """
+    job, buckets = args
+    grouped = {}
+    for bucket in buckets:
+        for key, values in bucket.items():
+            if key in grouped:
+                grouped[key].extend(values)
+            else:
+                grouped[key] = values
+    return {key: job.reducer(key, values) for key, values in grouped.items()}
+
+
+def run_job(job, splits, engine='threads', workers=None):
+    """
+    Chạy job trên danh sách input split
+    engine: 'threads' (ThreadPool, hợp với I/O) hoặc 'processes' (Pool, không bị GIL)
+    MAP: mỗi split 1 task -> SHUFFLE: partition p của mọi map task -> reducer p
+    -> REDUCE: mỗi partition 1 task
+    Returns: dict {key: kết quả reducer}
+    """
+    splits = list(splits)
+    if not splits:
+        return {}
+    workers = workers or os.cpu_count() or 1
+    pool_class = Pool if engine == 'processes' else ThreadPool
+
+    with pool_class(min(workers, len(splits))) as pool:
+        map_outputs = pool.map(map_task, [(job, split) for split in splits])
+
+        # SHUFFLE: chỉ chuyển dict của từng partition, không tách lại từng cặp
+        reduce_inputs = [(job, [output[p] for output in map_outputs])
+                         for p in range(job.num_reducers)]
+        del map_outputs
+        reduce_outputs = pool.map(reduce_task, reduce_inputs)
+
+    results = {}
+    for output in reduce_outputs:
+        results.update(output)
+    return results
@@ -0,0 +1,143 @@
+from mpi4py import MPI
+import argparse
+import heapq
+import os
+import sys
+from collections import Counter
+
+# Dùng lại lớp MPI-IO của practical3
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'practical3'))
+
+import mpi_transfer
+from heavy_hitters import top_k
+from mapreduce import stable_hash
+from wordcount import decode_counts, split_offsets
+
+CHUNK_SIZE = mpi_transfer.BUFFER_CHUNK_SIZE  # Mỗi vòng đọc 4MB
+
+
+def count_rank_region(fh, start, end, rounds, chunk_size=CHUNK_SIZE):
+    """
+    MAP: đọc đoạn [start, end) của rank qua MPI-IO (Read_at_all, mọi rank chạy cùng số vòng)
+    và đếm từ trên bytes; từ bị cắt ở cuối chunk được ghép vào chunk sau
+    Returns: Counter {word: count} của rank
+    """
+    buffer = memoryview(bytearray(chunk_size))
+    byte_counts = Counter()
+    leftover = b''
+    for r in range(rounds):
+        offset = start + r * chunk_size
+        n = max(0, min(chunk_size, end - offset))
+        fh.Read_at_all(offset, [buffer[:n], MPI.BYTE])
+        if n == 0:
+            continue
+        data = leftover + bytes(buffer[:n])
+        tokens = data.split()
+        # Chunk không kết thúc bằng khoảng trắng: token cuối có thể chưa đủ
+        leftover = tokens.pop() if tokens and not data[-1:].isspace() else b''
+        byte_counts.update(tokens)
+    if leftover:
+        byte_counts[leftover] += 1
+    return decode_counts(byte_counts)
+
+
+def partition_counts(counts, size):
+    """
+    Chia count cục bộ theo hash của từ: partition p gửi cho rank p
+    stable_hash thay vì hash() vì hash của str khác nhau giữa các process
+    """
+    partitions = [{} for _ in range(size)]
+    for word, count in counts.items():
+        partitions[stable_hash(word) % size][word] = count
+    return partitions
+
+
+def run_mpi_wordcount(comm, path, chunk_size=CHUNK_SIZE, top=None, hints=None):
+    """
+    Word count phân tán trên các rank MPI
+    1. Rank 0 chia file thành các đoạn byte kết thúc tại khoảng trắng, bcast cho mọi rank
+    2. MAP: mỗi rank đọc đoạn của mình bằng MPI-IO và đếm cục bộ
+    3. SHUFFLE: alltoall các partition theo hash => mỗi rank chỉ giữ 1 phần từ vựng
+    4. REDUCE: mỗi rank cộng các count nhận được
+    5. GATHER: rank 0 gom các phần đã sắp xếp (hoặc top-K của mỗi rank) và merge
+    Returns: list (word, count) ở rank 0 (đã sắp xếp theo word, hoặc top-K), None ở rank khác
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    timings = {}
+
+    regions = None
+    if rank == 0:
+        if not os.path.exists(path):
+            print(f"Cannot open file {path}", file=sys.stderr)
+        else:
+            regions = split_offsets(path, size)
+            regions += [(0, 0)] * (size - len(regions))
+    regions = comm.bcast(regions, root=0)
+    if regions is None:
+        return None
+
+    comm.Barrier()
+    start_time = MPI.Wtime()
+
+    info = mpi_transfer.make_info(mpi_transfer.DEFAULT_IO_HINTS if hints is None else hints)
+    fh = MPI.File.Open(comm, path, MPI.MODE_RDONLY, info)
+    start, end = regions[rank]
+    rounds = comm.allreduce(-(-(end - start) // chunk_size), op=MPI.MAX)
+    counts = count_rank_region(fh, start, end, rounds, chunk_size)
+    fh.Close()
+    info.Free()
+    timings['map'] = MPI.Wtime()
+
+    received = comm.alltoall(partition_counts(counts, size))
+    del counts
+    timings['shuffle'] = MPI.Wtime()
+
+    reduced = Counter()
+    for part in received:
+        reduced.update(part)
+    del received
+    local = top_k(reduced.items(), top) if top else sorted(reduced.items())
+    timings['reduce'] = MPI.Wtime()
+
+    gathered = comm.gather(local, root=0)
+    timings['gather'] = MPI.Wtime()
+    if rank != 0:
+        return None
+
+    # Mỗi rank giữ 1 phần từ vựng riêng biệt nên chỉ cần merge các phần đã sắp xếp
+    if top:
+        results = top_k((item for part in gathered for item in part), top)
+    else:
+        results = list(heapq.merge(*gathered))
+    previous = start_time
+    for phase, moment in timings.items():
+        print(f"[Rank 0] {phase:<8} {moment - previous:8.3f}s")
+        previous = moment
+    print(f"[Rank 0] total    {previous - start_time:8.3f}s with {size} ranks")
+    return results
+
+
+if __name__ == "__main__":
+    comm = MPI.COMM_WORLD
+
+    parser = argparse.ArgumentParser(usage="mpiexec -n N python mpi_wordcount.py [input] [options]")
+    parser.add_argument('input', nargs='?', default="input.txt", help="File input (mặc định: input.txt)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Số byte mỗi vòng đọc MPI-IO")
+    parser.add_argument('--top', type=int, default=None, help="Chỉ in K từ xuất hiện nhiều nhất")
+    parser.add_argument('--summary', action='store_true',
+                        help="Chỉ in số từ phân biệt và tổng số từ (dùng khi benchmark)")
+    args = parser.parse_args()
+
+    if comm.Get_rank() == 0:
+        print(f"--- STARTING MAPREDUCE WITH MPI ({comm.Get_size()} RANKS) ---")
+    results = run_mpi_wordcount(comm, args.input, args.chunk_size, args.top)
+    if comm.Get_rank() == 0:
+        if results is None:
+            sys.exit(1)
+        if args.summary:
+            print(f"Distinct words: {len(results)}, total words: {sum(count for _, count in results)}")
+        else:
+            print("\n--- FINAL RESULTS ---")
+            for word, count in results:
+                print(f"{word}: {count}")
@@ -1,8 +1,34 @@
+import argparse
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import re
+import tempfile
 import threading
 import sys
-from collections import defaultdict
+from collections import Counter, defaultdict
+from itertools import chain, groupby
+from multiprocessing import Pool
+
+import heavy_hitters
+import mapreduce
 
 NUM_MAPPERS = 3  # Số luồng xử lý song song
+WHITESPACE = re.compile(rb'[ \t\n\r\x0b\x0c]')  # Khoảng trắng ASCII dùng làm điểm cắt
+
+# Cấu hình chế độ streaming (out-of-core)
+READ_SIZE = 1024 * 1024   # Mỗi lần đọc 1MB từ file
+MEMORY_LIMIT_MB = 256     # Giới hạn bộ nhớ mặc định cho dictionary đếm từ
+BYTES_PER_ENTRY = 160     # Ước lượng bộ nhớ cho 1 từ trong dict (str + int + slot của dict)
+MAX_MERGE_FANIN = 128     # Số file spill tối đa được mở cùng lúc khi merge
+
+# Cấu hình chế độ incremental (snapshot)
+SNAPSHOT_VERSION = 2
+SNAPSHOT_SUFFIX = '.wcstate.json'  # Snapshot mặc định: <input>.wcstate.json
+SAMPLE_WINDOWS = 16                # Số cửa sổ lấy mẫu khi kiểm tra nhanh phần đầu file (--verify quick)
+SAMPLE_SIZE = 4096                 # Kích thước mỗi cửa sổ (bytes)
 
 global_results = {} # Dictionary lưu kết quả
 global_count = 0
@@ -44,32 +70,278 @@ def mapper(args):
         lock.release()
 
 
-def main():
-    # BƯỚC 1: Đọc file input
-    try:
-        with open("input.txt", "r") as fp:
-            full_text = fp.read()
-    except FileNotFoundError:
-        print("Cannot open file input.txt", file=sys.stderr)
-        return 1
-    except Exception as e:
-        print(f"Error reading file: {e}", file=sys.stderr)
-        return 1
+def split_offsets(path, num_splits):
+    """
+    Chia file thành num_splits đoạn byte [start, end) gần bằng nhau,
+    mỗi điểm cắt được dời tới khoảng trắng (ASCII) kế tiếp để không cắt đôi một từ
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    offsets = [0]
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with mm:
+            for i in range(1, num_splits):
+                pos = max(offsets[-1], size * i // num_splits)
+                # Tìm khoảng trắng gần nhất từ pos trở đi
+                match = WHITESPACE.search(mm, pos)
+                pos = match.start() if match else size
+                if pos > offsets[-1]:
+                    offsets.append(pos)
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def count_region(args):
+    """
+    Worker (process): đếm từ trong đoạn byte [start, end) của file, đọc qua mmap
+    Điểm cắt luôn là khoảng trắng ASCII nên decode từng đoạn UTF-8 riêng là an toàn
+    """
+    path, start, end = args
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with mm:
+            text = mm[start:end].decode('utf-8')
+    return Counter(text.split())
+
+
+def merge_counters(counters):
+    """
+    Gộp các Counter ngay tại process cha, theo thứ tự các đoạn
+    Gửi Counter qua pipe (pickle 2 chiều) tốn hơn nhiều so với phép cộng, nên không gộp
+    trên pool: 16 Counter x 50k từ mất 2.4s khi gộp theo cây trên pool, 0.37s khi gộp tại chỗ
+    """
+    total = Counter()
+    for counts in counters:
+        total.update(counts)
+    return total
+
+
+def run_processes(path, workers=None):
+    """
+    Engine dùng process pool (không bị GIL giới hạn)
+    Mỗi worker tự đọc đoạn của mình từ file qua mmap, không truyền văn bản qua pipe
+    Returns: Counter {word: count}
+    """
+    workers = workers or os.cpu_count() or 1
+    # Chia nhỏ hơn số worker một chút để cân bằng tải giữa các process
+    regions = split_offsets(path, workers * 4)
+    with Pool(workers) as pool:
+        # imap: gộp kết quả của các đoạn đã xong trong khi worker còn đếm các đoạn sau
+        counts = merge_counters(pool.imap(count_region, [(path, start, end) for start, end in regions]))
+    print(f"[Pool] {workers} workers counted {len(regions)} regions.")
+    return counts
+
+
+def count_region_bytes(args):
+    """
+    Worker (process): như count_region nhưng tách từ trên bytes, không decode văn bản
+    Returns: Counter {bytes: count}
+    """
+    path, start, end = args
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with mm:
+            return Counter(mm[start:end].split())
+
+
+def decode_counts(byte_counts):
+    """
+    Chỉ decode các token phân biệt ở bước cuối
+    bytes.split() chỉ tách theo khoảng trắng ASCII còn str.split() tách cả khoảng trắng
+    Unicode (U+00A0, U+3000, \x1c-\x1f...), nên token còn chứa khoảng trắng loại đó được
+    tách tiếp => kết quả giống hệt str.split() trên toàn văn bản
+    """
+    counts = Counter()
+    for token, count in byte_counts.items():
+        word = token.decode('utf-8')
+        if word.isascii() and word.isprintable():
+            counts[word] += count
+            continue
+        for part in word.split():
+            counts[part] += count
+    return counts
+
+
+def run_bytes(path, workers=None):
+    """
+    Engine đếm trên bytes: Counter(bytes.split()) trong mỗi worker (vòng lặp ở C),
+    gộp Counter ở process cha rồi mới decode các token phân biệt
+    Returns: Counter {word: count}
+    """
+    workers = workers or os.cpu_count() or 1
+    regions = split_offsets(path, workers * 4)
+    with Pool(workers) as pool:
+        byte_counts = merge_counters(pool.imap(count_region_bytes,
+                                               [(path, start, end) for start, end in regions]))
+    print(f"[Pool] {workers} workers counted {len(regions)} regions (bytes).")
+    return decode_counts(byte_counts)
+
+
+def read_region(split):
+    # Reader cho framework mapreduce: split = (path, start, end), 1 record = văn bản của đoạn
+    path, start, end = split
+    with open(path, 'rb') as f:
+        f.seek(start)
+        yield f.read(end - start).decode('utf-8')
+
+
+def map_words(text):
+    for word in text.split():
+        yield word, 1
+
+
+def sum_counts(word, counts):
+    # Dùng cho cả combiner (phía map) và reducer
+    return sum(counts)
+
+
+WORDCOUNT_JOB = mapreduce.Job(map_words, sum_counts, combiner=sum_counts, reader=read_region)
+
+
+def run_framework(path, workers=None, engine='processes'):
+    """
+    Word count biểu diễn thành 1 job trên module mapreduce dùng chung
+    (combiner phía map + shuffle chia partition theo hash)
+    Returns: dict {word: count}
+    """
+    workers = workers or os.cpu_count() or 1
+    regions = split_offsets(path, workers * 4)
+    return mapreduce.run_job(WORDCOUNT_JOB, [(path, start, end) for start, end in regions],
+                             engine, workers)
+
+
+def read_byte_blocks(path, start=0, read_size=READ_SIZE):
+    """
+    Đọc file từ byte `start` theo từng block, mỗi block kết thúc tại khoảng trắng ASCII
+    (phần từ bị cắt dở được ghép vào block sau)
+    Yields: (block, complete), complete=False chỉ với phần cuối file không kết thúc bằng khoảng trắng
+    """
+    leftover = b''
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while True:
+            block = f.read(read_size)
+            if not block:
+                break
+            data = leftover + block
+            cut = max(data.rfind(ws) for ws in (b' ', b'\n', b'\t', b'\r', b'\x0b', b'\x0c'))
+            if cut == -1:
+                # Không có khoảng trắng: cả block là 1 phần của 1 từ rất dài
+                leftover = data
+                continue
+            leftover = data[cut + 1:]
+            yield data[:cut + 1], True
+    if leftover:
+        yield leftover, False
+
+
+def read_text_blocks(path, read_size=READ_SIZE):
+    """
+    Decode UTF-8 từng block của read_byte_blocks => split() từng block
+    cho kết quả giống hệt split() trên toàn bộ file
+    """
+    for block, _ in read_byte_blocks(path, 0, read_size):
+        yield block.decode('utf-8')
+
+
+def spill(items, spill_dir):
+    # Ghi các cặp (word, count) đã sắp xếp ra file, mỗi dòng "word\tcount"
+    fd, path = tempfile.mkstemp(prefix='spill_', suffix='.txt', dir=spill_dir)
+    os.close(fd)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for word, count in items:
+            f.write(f"{word}\t{count}\n")
+    return path
+
+
+def read_spill(path):
+    # Từ không chứa khoảng trắng nên tab và newline là dấu phân cách an toàn
+    with open(path, encoding='utf-8', newline='\n') as f:
+        for line in f:
+            word, count = line[:-1].split('\t')
+            yield word, int(count)
+
+
+def merge_spills(paths):
+    """
+    K-way merge các file spill đã sắp xếp (heap), cộng dồn count của cùng 1 từ
+    Yields: (word, count) theo thứ tự tăng dần của word
+    """
+    merged = heapq.merge(*(read_spill(path) for path in paths), key=lambda item: item[0])
+    for word, group in groupby(merged, key=lambda item: item[0]):
+        yield word, sum(count for _, count in group)
+
+
+def run_streaming(path, memory_limit_mb=MEMORY_LIMIT_MB, read_size=READ_SIZE):
+    """
+    Engine out-of-core: đọc file tăng dần và giữ dictionary đếm từ trong giới hạn bộ nhớ
+    Khi dictionary vượt ngưỡng, ghi các count đã sắp xếp ra file spill và làm rỗng dict;
+    cuối cùng k-way merge các file spill. Kết quả chính xác như khi đếm trong RAM
+    Yields: (word, count) theo thứ tự tăng dần của word
+    """
+    max_entries = max(1, memory_limit_mb * 1024 * 1024 // BYTES_PER_ENTRY)
+    counts = Counter()
+    with tempfile.TemporaryDirectory(prefix='wordcount_spill_') as spill_dir:
+        spills = []
+        for text in read_text_blocks(path, read_size):
+            counts.update(text.split())
+            if len(counts) > max_entries:
+                spills.append(spill(sorted(counts.items()), spill_dir))
+                counts.clear()
+        
+        if not spills:
+            # Vừa đủ bộ nhớ: không cần spill
+            yield from sorted(counts.items())
+            return
+        
+        if counts:
+            spills.append(spill(sorted(counts.items()), spill_dir))
+            counts.clear()
+        print(f"[Streaming] {len(spills)} spill files, merging...", file=sys.stderr)
+        
+        # Nếu quá nhiều file spill, merge từng nhóm trước để không mở quá nhiều file
+        while len(spills) > MAX_MERGE_FANIN:
+            groups = [spills[i:i + MAX_MERGE_FANIN] for i in range(0, len(spills), MAX_MERGE_FANIN)]
+            spills = [spill(merge_spills(group), spill_dir) if len(group) > 1 else group[0]
+                      for group in groups]
+        yield from merge_spills(spills)
+
+
+def start_streaming(items):
+    """
+    Chạy generator của run_streaming tới kết quả đầu tiên: toàn bộ phần đọc file và spill
+    xảy ra ở đây => lỗi đọc/decode được báo trước khi in kết quả, phần merge vẫn in dần
+    """
+    first = next(items, None)
+    return items if first is None else chain([first], items)
+
+
+def run_threads(path, num_mappers=NUM_MAPPERS):
+    """
+    Engine dùng threading (bản gốc): đọc cả file, chia theo số từ cho các thread
+    Returns: dict {word: count}
+    """
+    global global_results, global_count
+    global_results = {}
+    global_count = 0
+
+    with open(path, "r") as fp:
+        full_text = fp.read()
     
     # BƯỚC 2: Chia văn bản và tạo các luồng
     threads = []  # Danh sách chứa các thread object
     words = full_text.split()
     
     # Tính số từ mỗi luồng sẽ xử lý (chia đều)
-    words_per_chunk = len(words) // NUM_MAPPERS
+    words_per_chunk = len(words) // num_mappers
     
-    print("--- STARTING MAPREDUCE WITH PYTHON MULTITHREADING ---")
-    
-    # Tạo NUM_MAPPERS luồng, mỗi luồng xử lý một phần văn bản
-    for i in range(NUM_MAPPERS):
+    # Tạo num_mappers luồng, mỗi luồng xử lý một phần văn bản
+    for i in range(num_mappers):
         start_idx = i * words_per_chunk
         # Luồng cuối cùng nhận tất cả từ còn lại (kể cả phần dư)
-        if i == NUM_MAPPERS - 1:
+        if i == num_mappers - 1:
             chunk_words = words[start_idx:]
         else:
             chunk_words = words[start_idx:start_idx + words_per_chunk]
@@ -86,11 +358,216 @@ def main():
     for thread in threads:
         thread.join() #Đảm bảo tất cả thread xử lý xong trước khi in kết quả
     
+    return global_results
+
+
+def prefix_sample(f, offset):
+    """
+    Checksum nhanh của phần đầu file [0, offset): BLAKE2 của SAMPLE_WINDOWS cửa sổ rải đều
+    (luôn gồm đầu và cuối phần đầu file) => kiểm tra O(1) thay vì đọc lại toàn bộ
+    """
+    digest = hashlib.blake2b(str(offset).encode())
+    if offset:
+        step = max(1, (offset - SAMPLE_SIZE) // max(1, SAMPLE_WINDOWS - 1))
+        positions = sorted({min(i * step, max(0, offset - SAMPLE_SIZE)) for i in range(SAMPLE_WINDOWS)})
+        for pos in positions:
+            f.seek(pos)
+            digest.update(f.read(min(SAMPLE_SIZE, offset - pos)))
+    return digest.hexdigest()
+
+
+def empty_snapshot():
+    # segments: các offset kết thúc của từng lần chạy, chain: BLAKE2 nối chuỗi qua các segment
+    return {'version': SNAPSHOT_VERSION, 'offset': 0, 'segments': [], 'chain': '', 'sample': '', 'counts': {}}
+
+
+def chain_digest(previous):
+    """
+    Checksum đầy đủ cập nhật được theo từng segment mới: H(checksum trước + dữ liệu của segment)
+    Returns: đối tượng hash, gọi update() với dữ liệu của segment theo từng block
+    """
+    return hashlib.blake2b(bytes.fromhex(previous))
+
+
+def load_snapshot(path, snapshot_path, verify='full'):
+    """
+    Đọc snapshot và kiểm tra phần đầu file đã đếm có bị thay đổi không
+    verify: 'full' tính lại chain trên toàn bộ phần đầu (đọc lại, nhưng chỉ hash, nhanh hơn
+    đếm lại nhiều), 'quick' chỉ so checksum lấy mẫu (O(1)) => bỏ sót sửa đổi nằm ngoài
+    các cửa sổ mẫu, chỉ dùng khi biết chắc file chỉ được nối thêm
+    Returns: snapshot hợp lệ, hoặc snapshot rỗng (đếm lại từ đầu) nếu không dùng được
+    """
+    try:
+        with open(snapshot_path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return empty_snapshot()
+    except (OSError, ValueError) as e:
+        print(f"[Incremental] Cannot read snapshot ({e}), recounting from scratch")
+        return empty_snapshot()
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        print("[Incremental] Snapshot version mismatch, recounting from scratch")
+        return empty_snapshot()
+
+    offset = snapshot['offset']
+    if os.path.getsize(path) < offset:
+        print("[Incremental] Input is shorter than the snapshot, recounting from scratch")
+        return empty_snapshot()
+    with open(path, 'rb') as f:
+        changed = prefix_sample(f, offset) != snapshot['sample']
+        if not changed and verify == 'full':
+            chain, start = '', 0
+            for end in snapshot['segments']:
+                digest = chain_digest(chain)
+                f.seek(start)
+                while start < end:
+                    block = f.read(min(READ_SIZE, end - start))
+                    digest.update(block)
+                    start += len(block)
+                chain = digest.hexdigest()
+            changed = chain != snapshot['chain']
+    if changed:
+        print("[Incremental] Already counted data has changed, recounting from scratch")
+        return empty_snapshot()
+    return snapshot
+
+
+def save_snapshot(snapshot, snapshot_path):
+    # Ghi file tạm rồi os.replace để snapshot không bao giờ bị ghi dở
+    temp_path = f"{snapshot_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f)
+    os.replace(temp_path, snapshot_path)
+
+
+def run_incremental(path, snapshot_path=None, verify='full'):
+    """
+    Chỉ đếm phần được nối thêm vào cuối file kể từ lần chạy trước rồi gộp vào snapshot
+    Snapshot lưu count + offset + checksum của phần đầu đã đếm; offset luôn dừng ở
+    khoảng trắng, từ cuối file chưa có khoảng trắng phía sau (có thể còn được nối tiếp)
+    được đếm vào kết quả nhưng không lưu vào snapshot
+    Returns: Counter {word: count}
+    """
+    snapshot_path = snapshot_path or path + SNAPSHOT_SUFFIX
+    snapshot = load_snapshot(path, snapshot_path, verify)
+    offset = snapshot['offset']
+    counts = Counter(snapshot['counts'])
+    tail = Counter()
+    new_bytes = 0
+    segment = chain_digest(snapshot['chain'])
+
+    for block, complete in read_byte_blocks(path, offset):
+        words = block.decode('utf-8').split()
+        if not complete:
+            tail.update(words)
+            break
+        counts.update(words)
+        segment.update(block)
+        offset += len(block)
+        new_bytes += len(block)
+
+    print(f"[Incremental] Reused {snapshot['offset']} bytes, counted {new_bytes} new bytes.")
+    if new_bytes:
+        snapshot['chain'] = segment.hexdigest()
+        snapshot['segments'].append(offset)
+        snapshot['offset'] = offset
+        snapshot['counts'] = counts
+        with open(path, 'rb') as f:
+            snapshot['sample'] = prefix_sample(f, offset)
+        save_snapshot(snapshot, snapshot_path)
+
+    counts.update(tail)
+    return counts
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="MapReduce word count")
+    parser.add_argument('input', nargs='?', default="input.txt", help="File input (mặc định: input.txt)")
+    parser.add_argument('--engine', choices=['threads', 'processes', 'bytes', 'streaming', 'mapreduce'],
+                        default='processes',
+                        help="threads: bản gốc dùng threading, processes: process pool + mmap, "
+                             "bytes: như processes nhưng đếm trên bytes, chỉ decode các từ phân biệt, "
+                             "streaming: đọc tăng dần, spill ra đĩa khi vượt --memory-mb, "
+                             "mapreduce: job trên module mapreduce dùng chung")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Số worker (mặc định: số core cho processes, NUM_MAPPERS cho threads)")
+    parser.add_argument('--memory-mb', type=int, default=MEMORY_LIMIT_MB,
+                        help="Giới hạn bộ nhớ cho dictionary ở chế độ streaming (MB)")
+    parser.add_argument('--top', type=int, default=None,
+                        help="Chỉ in K từ xuất hiện nhiều nhất (dùng heap thay vì sort toàn bộ)")
+    parser.add_argument('--approx', choices=['spacesaving', 'cms'], default=None,
+                        help="Đếm xấp xỉ top-K với bộ nhớ cố định (mặc định --top 100)")
+    parser.add_argument('--epsilon', type=float, default=heavy_hitters.EPSILON,
+                        help="Chế độ xấp xỉ: sai số tối đa = epsilon * tổng số từ")
+    parser.add_argument('--delta', type=float, default=heavy_hitters.DELTA,
+                        help="Chế độ cms: xác suất vượt sai số")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Chỉ đếm phần nối thêm vào cuối file, dùng lại snapshot của lần chạy trước")
+    parser.add_argument('--snapshot', default=None,
+                        help=f"File snapshot cho --incremental (mặc định: <input>{SNAPSHOT_SUFFIX})")
+    parser.add_argument('--verify', choices=['quick', 'full'], default='full',
+                        help="Kiểm tra phần đã đếm: full hash lại toàn bộ (mặc định), "
+                             "quick chỉ lấy mẫu (O(1), bỏ sót sửa đổi ngoài các cửa sổ mẫu)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # BƯỚC 1: Kiểm tra file input
+    if not os.path.exists(args.input):
+        print(f"Cannot open file {args.input}", file=sys.stderr)
+        return 1
+    
+    try:
+        if args.approx:
+            top = args.top or 100
+            print(f"--- STARTING APPROXIMATE TOP-{top} ({args.approx}, epsilon={args.epsilon}) ---")
+            if args.approx == 'spacesaving':
+                summary = heavy_hitters.SpaceSaving.from_error(args.epsilon, top)
+            else:
+                summary = heavy_hitters.CountMinSketch.from_error(top, args.epsilon, args.delta)
+            heavy_hitters.count_approximate(read_text_blocks(args.input), summary)
+            print(f"Total words: {summary.total}, max overestimate: {summary.error_bound()}")
+            items = heavy_hitters.top_k(summary.items(), top)
+        elif args.incremental:
+            print("--- STARTING INCREMENTAL WORD COUNT ---")
+            items = run_incremental(args.input, args.snapshot, args.verify).items()
+        elif args.engine == 'threads':
+            print("--- STARTING MAPREDUCE WITH PYTHON MULTITHREADING ---")
+            items = run_threads(args.input, args.workers or NUM_MAPPERS).items()
+        elif args.engine == 'streaming':
+            print("--- STARTING STREAMING WORD COUNT ---")
+            # Generator đã sắp xếp sẵn, in dần mà không cần giữ toàn bộ kết quả
+            items = start_streaming(run_streaming(args.input, args.memory_mb))
+        elif args.engine == 'bytes':
+            print("--- STARTING MAPREDUCE WITH PYTHON MULTIPROCESSING (BYTES) ---")
+            items = run_bytes(args.input, args.workers).items()
+        elif args.engine == 'mapreduce':
+            print("--- STARTING MAPREDUCE JOB (mapreduce.py) ---")
+            items = run_framework(args.input, args.workers).items()
+        else:
+            print("--- STARTING MAPREDUCE WITH PYTHON MULTIPROCESSING ---")
+            items = run_processes(args.input, args.workers).items()
+        
+        if args.top and not args.approx:
+            items = heavy_hitters.top_k(items, args.top)
+        elif (args.engine != 'streaming' or args.incremental) and not args.approx:
+            items = sorted(items)
+    except Exception as e:
+        print(f"Error reading file: {e}", file=sys.stderr)
+        return 1
+    
     # BƯỚC 4: In kết quả
     print("\n--- FINAL RESULTS ---")
 
-    for word, count in sorted(global_results.items()):
-        print(f"{word}: {count}")
+    try:
+        for word, count in items:
+            print(f"{word}: {count}")
+    except Exception as e:
+        # Chế độ streaming còn đọc các file spill trong lúc in
+        print(f"Error reading file: {e}", file=sys.stderr)
+        return 1
     
     return 0
 
@@ -98,4 +575,3 @@ def main():
 # (không chạy khi file này được import vào file khác)
 if __name__ == "__main__":
     sys.exit(main())
-
@@ -1,11 +1,29 @@
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing import Pool
+import argparse
+import heapq
+import math
+import mmap
+import os
 import sys
 import threading
+import time
+
+# Dùng lại module mapreduce của practical4
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'practical4'))
+
+import mapreduce
 
 # Lock để tránh in chồng chéo khi nhiều thread
 Lock = threading.Lock()
 
+DETAIL_BATCH = 4096       # Số dòng chi tiết gom lại trước khi ghi (1 lần lấy lock / batch)
+PROGRESS_EVERY = 1024     # Cập nhật bộ đếm tiến độ sau mỗi số dòng này
+PROGRESS_INTERVAL = 1.0   # Chu kỳ in tiến độ mặc định (giây)
+MIN_SPLIT_SIZE = 4 * 1024 * 1024   # Split nhỏ nhất khi chia file theo byte-range (4MB)
+SPLIT_READ_SIZE = 8 * 1024 * 1024  # Mỗi lần decode tối đa 8MB của split
+
 
 # =======================
 # MAPPER
@@ -26,53 +44,331 @@ def reducer(key, values):
     return max(values)
 
 
+def reducer_top(key, values, top_n):
+    # Giữ top_n đường dẫn dài nhất, giảm dần
+    return heapq.nlargest(top_n, values)
+
+
+class LongestTracker:
+    """
+    Combiner phía map: chỉ giữ giá trị lớn nhất đang có (hoặc min-heap top_n phần tử)
+    thay vì lưu 1 tuple cho mỗi dòng => bộ nhớ O(top_n), không tăng theo kích thước file
+    """
+
+    def __init__(self, top_n=1):
+        self.top_n = top_n
+        self.best = None  # top_n == 1: (length, path) lớn nhất
+        self.heap = []    # top_n > 1: min-heap top_n (length, path) lớn nhất
+
+    def add(self, value):
+        if self.top_n == 1:
+            if self.best is None or value > self.best:
+                self.best = value
+        elif len(self.heap) < self.top_n:
+            heapq.heappush(self.heap, value)
+        elif value > self.heap[0]:
+            heapq.heapreplace(self.heap, value)
+
+    def values(self):
+        if self.top_n == 1:
+            return [self.best] if self.best is not None else []
+        return list(self.heap)
+
+
+def print_longest(values, top_n=1):
+    # REDUCE: gộp các kết quả cục bộ của map task và in kết quả
+    if top_n > 1:
+        print(f"Top {top_n} đường dẫn dài nhất:")
+        for length, path in reducer_top("longest", values, top_n):
+            print(f"  {length:4d} | {path}")
+        return
+
+    # tìm longest path
+    max_length, longest_path = reducer("longest", values)
+
+    
+    print(f"Độ dài lớn nhất: {max_length} ký tự")
+    print("Đường dẫn dài nhất:")
+    print(f"  {longest_path}")
+
+
+# =======================
+# JOB TRÊN FRAMEWORK MAPREDUCE
+# =======================
+def map_longest(line):
+    # mapper của framework phải trả về iterable các cặp (key, value)
+    output = mapper(line)
+    if output:
+        yield output
+
+
+# reducer (max) cũng dùng làm combiner: mỗi map task chỉ gửi đi 1 giá trị
+LONGEST_JOB = mapreduce.Job(map_longest, reducer, combiner=reducer, num_reducers=1)
+
+
+def mapreduce_framework(input_files, engine='threads'):
+    """
+    Cùng bài toán nhưng chạy như 1 job trên mapreduce.run_job (threads hoặc processes)
+    """
+    existing = []
+    for filename in input_files:
+        if os.path.exists(filename):
+            existing.append(filename)
+        else:
+            print(f"❌ Không tìm thấy file: {filename}")
+
+    results = mapreduce.run_job(LONGEST_JOB, existing, engine, workers=min(8, len(input_files)))
+    if not results:
+        print("❌ Không có dữ liệu hợp lệ")
+        return
+
+    max_length, longest_path = results["longest"]
+    print(f"Độ dài lớn nhất: {max_length} ký tự")
+    print("Đường dẫn dài nhất:")
+    print(f"  {longest_path}")
+
+
+# =======================
+# OUTPUT CHI TIẾT VÀ TIẾN ĐỘ
+# =======================
+class DetailSink:
+    """
+    Nơi ghi thông tin chi tiết từng dòng (stdout hoặc file có buffer)
+    Mỗi map task gom dòng vào list riêng và chỉ lấy lock khi ghi cả batch,
+    các thread không phải xếp hàng lấy lock cho từng dòng
+    """
+
+    def __init__(self, path=None):
+        self.file = open(path, 'w', encoding='utf-8', buffering=1024 * 1024) if path else sys.stdout
+
+    def write_batch(self, lines):
+        if lines:
+            with Lock:
+                self.file.write(''.join(lines))
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class FileProgress:
+    # Bộ đếm của 1 file: chỉ thread map của file đó ghi, reporter chỉ đọc (không cần lock)
+    def __init__(self, filename):
+        self.filename = filename
+        try:
+            self.total_bytes = os.path.getsize(filename)
+        except OSError:
+            self.total_bytes = 0
+        self.lines = 0
+        self.bytes = 0
+        self.done = False
+
+
+class ProgressReporter:
+    """
+    Thread nền, cứ `interval` giây đọc bộ đếm của mỗi file và in ra stderr:
+    lines/s, MB/s, phần trăm và ETA
+    """
+
+    def __init__(self, files, interval=PROGRESS_INTERVAL):
+        self.files = files
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        last = [(0, 0)] * len(self.files)
+        last_time = time.perf_counter()
+        while not self.stopped.wait(self.interval):
+            now = time.perf_counter()
+            elapsed = now - last_time
+            last_time = now
+            for i, progress in enumerate(self.files):
+                lines, nbytes = progress.lines, progress.bytes
+                last_lines, last_bytes = last[i]
+                last[i] = (lines, nbytes)
+                if progress.done and lines == last_lines:
+                    continue
+                line_rate = (lines - last_lines) / elapsed
+                byte_rate = (nbytes - last_bytes) / elapsed
+                percent = 100 * nbytes / progress.total_bytes if progress.total_bytes else 100
+                remaining = progress.total_bytes - nbytes
+                eta = f"{remaining / byte_rate:.0f}s" if byte_rate > 0 else "?"
+                print(f"[progress] {progress.filename}: {lines} lines, {line_rate:,.0f} lines/s, "
+                      f"{byte_rate / 1024 / 1024:.1f} MB/s, {percent:.0f}%, ETA {eta}", file=sys.stderr)
+
+
 # =======================
 # MAP TASK (1 THREAD / FILE)
 # =======================
-def map_task(filename):
+def map_task(filename, top_n=1, detail=None, progress=None):
     """
     Mỗi thread xử lý 1 file input
+    Output mỗi task là O(top_n) nhờ LongestTracker
+    detail: DetailSink nhận thông tin từng dòng (None = không ghi)
+    progress: FileProgress để ProgressReporter theo dõi (None = không theo dõi)
     """
-    results = []
+    tracker = LongestTracker(top_n)
+    pending = [] # các dòng chi tiết chưa ghi
+    line_num = 0
 
     try:
         with open(filename, 'r', encoding='utf-8') as f:
             for line_num, line in enumerate(f, 1):
+                if progress is not None and line_num % PROGRESS_EVERY == 0:
+                    # Vị trí của buffer nhị phân bên dưới: đủ chính xác cho tiến độ
+                    progress.lines = line_num
+                    progress.bytes = f.buffer.tell()
+
                 # gọi hàm mapper cho mỗi dòng
                 output = mapper(line)
                 if output:
-                    # lưu key, value vào kết quả thread
-                    results.append(output)
+                    key, value = output
+                    tracker.add(value)
 
-                    key, (length, path) = output
-                    with Lock:
-                        # in thông tin đường dẫn và độ dài
-                        print(f"[{filename}] Line {line_num:3d} | Length={length:3d} | {path}")
+                    if detail is not None:
+                        # thông tin đường dẫn và độ dài
+                        length, path = value
+                        pending.append(f"[{filename}] Line {line_num:3d} | Length={length:3d} | {path}\n")
+                        if len(pending) >= DETAIL_BATCH:
+                            detail.write_batch(pending)
+                            pending = []
+
+            if progress is not None:
+                progress.lines = line_num
+                progress.bytes = progress.total_bytes
 
     except FileNotFoundError:
         with Lock:
             print(f"❌ Không tìm thấy file: {filename}")
+    finally:
+        if detail is not None:
+            detail.write_batch(pending)
+        if progress is not None:
+            progress.done = True
 
-    return results
+    return [("longest", value) for value in tracker.values()]
+
+
+# =======================
+# MAP THEO BYTE-RANGE (PROCESS POOL + MMAP)
+# =======================
+def split_files(input_files, workers):
+    """
+    Chia tất cả file input thành các byte-range [start, end) khoảng bằng nhau,
+    điểm cắt dời tới ngay sau newline kế tiếp => mỗi split chứa trọn các dòng.
+    Số split tỉ lệ với tổng kích thước input (không phụ thuộc số file)
+    """
+    sizes = []
+    for filename in input_files:
+        try:
+            sizes.append((filename, os.path.getsize(filename)))
+        except OSError:
+            print(f"❌ Không tìm thấy file: {filename}")
+    total = sum(size for _, size in sizes)
+    split_size = max(MIN_SPLIT_SIZE, math.ceil(total / (workers * 4)))
+
+    splits = []
+    for filename, size in sizes:
+        if size == 0:
+            continue
+        with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                newline = mm.find(b'\n', min(start + split_size, size) - 1)
+                end = size if newline == -1 else newline + 1
+                splits.append((filename, start, end))
+                start = end
+    return splits
+
+
+def map_split(args):
+    """
+    Worker (process): chạy mapper trên các dòng của 1 split, đọc qua mmap
+    Decode từng đoạn <= SPLIT_READ_SIZE kết thúc bằng newline, tách dòng như khi đọc file
+    ở text mode (universal newlines: CRLF và CR đều là xuống dòng)
+    Returns: list (length, path) tối đa top_n phần tử
+    """
+    filename, start, end, top_n = args
+    tracker = LongestTracker(top_n)
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < end:
+            newline = mm.find(b'\n', min(pos + SPLIT_READ_SIZE, end) - 1, end)
+            stop = end if newline == -1 else newline + 1
+            text = mm[pos:stop].decode('utf-8')
+            pos = stop
+            for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+                output = mapper(line)
+                if output:
+                    tracker.add(output[1])
+    return tracker.values()
+
+
+def mapreduce_splits(input_files, top_n=1, workers=None, map_function=map_split):
+    """
+    Song song trong từng file: các split theo byte-range chạy trên process pool
+    (không bị GIL), số task tăng theo số core và kích thước input
+    map_function: worker xử lý 1 split (map_split hoặc longest_numpy.scan_split)
+    """
+    workers = workers or os.cpu_count() or 1
+    splits = split_files(input_files, workers)
+    if not splits:
+        print("❌ Không có dữ liệu hợp lệ")
+        return
+
+    with Pool(min(workers, len(splits))) as pool:
+        partials = pool.map(map_function, [split + (top_n,) for split in splits])
+
+    values = [value for partial in partials for value in partial]
+    if not values:
+        print("❌ Không có dữ liệu hợp lệ")
+        return
+    print_longest(values, top_n)
 
 
 # =======================
 # MAPREDUCE (MULTITHREADING)
 # =======================
 # khởi tạo xử lý luồng
-def mapreduce_multithreading(input_files):
+def mapreduce_multithreading(input_files, top_n=1, verbosity=0, detail_file=None,
+                             progress_interval=0):
+    """
+    verbosity >= 1: in chi tiết từng dòng ra stdout (mặc định tắt)
+    detail_file: ghi chi tiết từng dòng vào file (có buffer) thay vì stdout
+    progress_interval > 0: in tiến độ ra stderr theo chu kỳ (giây)
+    """
     map_output = []
+    detail = DetailSink(detail_file) if detail_file or verbosity >= 1 else None
+    files = [FileProgress(f) for f in input_files]
+    reporter = ProgressReporter(files, progress_interval) if progress_interval > 0 else None
 
     # -------- MAP PHASE (parallel) --------
-    # tối đa 8 threads hoặc ít hơn nếu có ít file hơn
-    with ThreadPoolExecutor(max_workers=min(8, len(input_files))) as executor:
-        # khởi chạy các task map song song
-        futures = [executor.submit(map_task, f) for f in input_files]
+    if reporter:
+        reporter.start()
+    try:
+        # tối đa 8 threads hoặc ít hơn nếu có ít file hơn
+        with ThreadPoolExecutor(max_workers=min(8, len(input_files))) as executor:
+            # khởi chạy các task map song song
+            futures = [executor.submit(map_task, f, top_n, detail, progress)
+                       for f, progress in zip(input_files, files)]
 
-        # lấy kết quả khi các thread hoàn thành
-        for future in as_completed(futures):
-            # gom kết quả mapper từ tất cả thread
-            map_output.extend(future.result())
+            # lấy kết quả khi các thread hoàn thành
+            for future in as_completed(futures):
+                # gom kết quả mapper từ tất cả thread
+                map_output.extend(future.result())
+    finally:
+        if reporter:
+            reporter.stop()
+        if detail:
+            detail.close()
 
     if not map_output:
         print("❌ Không có dữ liệu hợp lệ")
@@ -85,15 +381,9 @@ def mapreduce_multithreading(input_files):
         shuffled[key].append(value)
 
     # -------- REDUCE PHASE --------
-    # xử lý từng key
+    # mỗi map task chỉ gửi tối đa top_n giá trị nên reduce chỉ gộp các kết quả cục bộ
     for key, values in shuffled.items():
-        # tìm longest path
-        max_length, longest_path = reducer(key, values)
-
-        
-        print(f"Độ dài lớn nhất: {max_length} ký tự")
-        print("Đường dẫn dài nhất:")
-        print(f"  {longest_path}")
+        print_longest(values, top_n)
 
 
 # =======================
@@ -104,8 +394,34 @@ def main():
         print("❌ Cần ít nhất 1 file input")
         sys.exit(1)
 
-    input_files = sys.argv[1:]
-    mapreduce_multithreading(input_files)
+    parser = argparse.ArgumentParser(description="Tìm đường dẫn dài nhất bằng MapReduce")
+    parser.add_argument('input_files', nargs='+', help="Các file input")
+    parser.add_argument('--engine', choices=['original', 'threads', 'processes', 'splits', 'numpy'],
+                        default='original',
+                        help="original: bản multithreading gốc, threads/processes: job trên mapreduce.py, "
+                             "splits: chia byte-range theo dòng, chạy trên process pool + mmap, "
+                             "numpy: như splits nhưng tính độ dài dòng bằng NumPy (cần numpy)")
+    parser.add_argument('--top', type=int, default=1,
+                        help="Số đường dẫn dài nhất cần tìm (engine original, splits, numpy)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Số process cho engine splits/numpy (mặc định: số core)")
+    parser.add_argument('-v', '--verbose', action='count', default=0,
+                        help="In chi tiết từng dòng ra stdout (mặc định tắt vì làm chậm các thread)")
+    parser.add_argument('--detail-file', help="Ghi chi tiết từng dòng vào file này thay vì stdout")
+    parser.add_argument('--progress', type=float, default=PROGRESS_INTERVAL,
+                        help="Chu kỳ in tiến độ ra stderr (giây), 0 để tắt")
+    args = parser.parse_args()
+
+    if args.engine == 'original':
+        mapreduce_multithreading(args.input_files, args.top, args.verbose, args.detail_file, args.progress)
+    elif args.engine == 'splits':
+        mapreduce_splits(args.input_files, args.top, args.workers)
+    elif args.engine == 'numpy':
+        # Import khi cần để numpy chỉ là dependency của engine này
+        import longest_numpy
+        mapreduce_splits(args.input_files, args.top, args.workers, longest_numpy.scan_split)
+    else:
+        mapreduce_framework(args.input_files, args.engine)
 
 
 if __name__ == "__main__":
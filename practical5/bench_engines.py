@@ -0,0 +1,58 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import b1
+import longest_numpy
+from bench_longest import make_path_list
+
+
+def timed(label, run, baseline=None):
+    # Chạy 1 engine, thu output để so sánh với bản gốc
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+    speedup = f"{baseline / elapsed:6.2f}x" if baseline else "  1.00x"
+    print(f"{label:<20} {elapsed:8.2f}s {speedup}")
+    return elapsed, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="So sánh tốc độ các engine tìm đường dẫn dài nhất")
+    parser.add_argument('--size-mb', type=int, default=512, help="Kích thước danh sách đường dẫn (MB)")
+    parser.add_argument('--input', help="Dùng file có sẵn thay vì sinh dữ liệu")
+    parser.add_argument('--top', type=int, default=1, help="Số đường dẫn dài nhất cần tìm")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as workdir:
+        path = args.input
+        if path is None:
+            path = os.path.join(workdir, 'paths.txt')
+            make_path_list(path, args.size_mb)
+        print(f"Input: {os.path.getsize(path) / 1024 / 1024:.0f} MB, {cores} cores")
+
+        baseline, expected = timed("original (1 thread)", lambda: b1.mapreduce_multithreading([path], args.top))
+        runs = [
+            ("splits x1", lambda: b1.mapreduce_splits([path], args.top, 1)),
+            ("numpy x1", lambda: b1.mapreduce_splits([path], args.top, 1, longest_numpy.scan_split)),
+        ]
+        if cores > 1:
+            runs += [
+                (f"splits x{cores}", lambda: b1.mapreduce_splits([path], args.top, cores)),
+                (f"numpy x{cores}", lambda: b1.mapreduce_splits([path], args.top, cores, longest_numpy.scan_split)),
+            ]
+        for label, run in runs:
+            _, output = timed(label, run, baseline)
+            if output != expected:
+                print("  MISMATCH with original engine!", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Chạy trong process riêng để đo peak RSS (ru_maxrss) của từng lần chạy
+# Output của b1 bị bỏ qua, chỉ in peak RSS (KB)
+RUN_CODE = {
+    'combiner': """
+import os, resource, sys, b1
+sys.stdout = open(os.devnull, 'w')
+b1.mapreduce_multithreading([sys.argv[1]], int(sys.argv[2]))
+sys.stderr.write(str(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+""",
+    # Cách cũ: giữ 1 tuple cho mỗi dòng rồi mới max()
+    'materialize': """
+import os, resource, sys, b1
+with open(sys.argv[1], encoding='utf-8') as f:
+    results = [output for output in map(b1.mapper, f) if output]
+b1.reducer('longest', [value for _, value in results])
+sys.stderr.write(str(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+""",
+}
+
+SEGMENTS = ['home', 'user', 'var', 'log', 'projects', 'python', 'data', 'tmp', 'src', 'lib', 'cache']
+
+
+def make_path_list(path, size_mb, seed=1):
+    # Sinh danh sách đường dẫn ngẫu nhiên (độ sâu 2..12 thư mục)
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            lines = []
+            for _ in range(10000):
+                depth = rng.randint(2, 12)
+                parts = rng.choices(SEGMENTS, k=depth)
+                lines.append('/' + '/'.join(parts) + f"/file{rng.randrange(100000)}.txt\n")
+            block = ''.join(lines)
+            f.write(block)
+            written += len(block)
+
+
+def run(mode, path, top_n):
+    here = os.path.dirname(os.path.abspath(__file__))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', RUN_CODE[mode], path, str(top_n)],
+                          cwd=here, stderr=subprocess.PIPE, text=True, check=True)
+    return time.perf_counter() - start, int(proc.stderr) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory của bước map khi input lớn dần")
+    parser.add_argument('--sizes-mb', type=int, nargs='+', default=[256, 1024, 4096],
+                        help="Kích thước các danh sách đường dẫn sinh ra (MB)")
+    parser.add_argument('--top', type=int, default=1, help="Số đường dẫn dài nhất cần tìm")
+    parser.add_argument('--materialize-max-mb', type=int, default=1024,
+                        help="Chỉ chạy cách cũ (giữ mọi tuple) với file không lớn hơn giá trị này")
+    args = parser.parse_args()
+
+    print(f"{'size MB':>8} {'mode':<12} {'seconds':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(workdir, f'paths_{size_mb}.txt')
+            make_path_list(path, size_mb)
+            modes = ['combiner'] + (['materialize'] if size_mb <= args.materialize_max_mb else [])
+            for mode in modes:
+                elapsed, peak_mb = run(mode, path, args.top)
+                print(f"{size_mb:>8} {mode:<12} {elapsed:>8.2f} {peak_mb:>8.1f}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import mmap
+
+import numpy as np
+
+from b1 import LongestTracker, mapper
+
+BLOCK_SIZE = 16 * 1024 * 1024  # Mỗi lần quét 16MB (các mảng tạm của NumPy tỉ lệ với block)
+MAX_TRIM_STEPS = 8             # Số bước cắt khoảng trắng đầu/cuối dòng tối đa
+
+# Khoảng trắng ASCII mà str.strip() bỏ đi (\t \n \v \f \r, \x1c-\x1f, dấu cách)
+ASCII_WHITESPACE = np.zeros(256, dtype=bool)
+ASCII_WHITESPACE[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+
+
+def line_bounds(data, base):
+    """
+    Tìm vị trí bắt đầu/kết thúc (tuyệt đối) của mọi dòng trong block bằng NumPy
+    Cả '\n' và '\r' đều là điểm ngắt (universal newlines); '\r\n' sinh thêm 1 dòng rỗng, bị bỏ qua
+    """
+    breaks = np.flatnonzero((data == 10) | (data == 13))
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(data)]))
+    return starts + base, ends + base
+
+
+def trim(buffer, starts, ends):
+    """
+    Bỏ khoảng trắng ASCII ở đầu/cuối tất cả các dòng cùng lúc (vector hóa)
+    Mỗi bước dịch 1 byte cho mọi dòng còn khoảng trắng; dòng có chuỗi khoảng trắng
+    dài hơn MAX_TRIM_STEPS chỉ bị cắt một phần => độ dài vẫn là cận trên
+    """
+    starts, ends = starts.copy(), ends.copy()
+    for _ in range(MAX_TRIM_STEPS):
+        active = (ends > starts) & ASCII_WHITESPACE[buffer[np.maximum(ends - 1, 0)]]
+        if not active.any():
+            break
+        ends[active] -= 1
+    for _ in range(MAX_TRIM_STEPS):
+        active = (ends > starts) & ASCII_WHITESPACE[buffer[np.minimum(starts, len(buffer) - 1)]]
+        if not active.any():
+            break
+        starts[active] += 1
+    return starts, ends
+
+
+def char_lengths(buffer, data, base, starts, ends):
+    """
+    Số ký tự của mỗi dòng = số byte trừ số byte tiếp nối UTF-8 (10xxxxxx)
+    Block toàn ASCII thì số ký tự bằng số byte, không cần cumsum
+    """
+    lengths = ends - starts
+    if not (data >= 0x80).any():
+        return lengths
+    continuation = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum((data & 0xC0) == 0x80, out=continuation[1:])
+    return lengths - (continuation[ends - base] - continuation[starts - base])
+
+
+def scan_block(buffer, base, stop, tracker, top_n):
+    """
+    Độ dài tính bằng NumPy là cận trên của độ dài thật (chưa bỏ khoảng trắng Unicode
+    như U+00A0), nên chỉ decode và chạy mapper cho các dòng có cận trên đủ lớn để
+    lọt vào top_n; dòng bị loại có độ dài thật <= cận trên < ngưỡng nên kết quả giống hệt
+    """
+    data = buffer[base:stop]
+    starts, ends = line_bounds(data, base)
+    starts, ends = trim(buffer, starts, ends)
+    upper = char_lengths(buffer, data, base, starts, ends)
+
+    # Dòng rỗng sau khi strip bị mapper bỏ qua
+    keep = upper > 0
+    starts, ends, upper = starts[keep], ends[keep], upper[keep]
+    checked = np.zeros(len(upper), dtype=bool)
+
+    while True:
+        values = tracker.values()
+        if len(values) >= top_n:
+            # Cùng độ dài vẫn có thể thắng nhờ so sánh path => dùng >=
+            threshold = min(length for length, _ in values)
+        else:
+            remaining = upper[~checked]
+            missing = top_n - len(values)
+            if len(remaining) == 0:
+                break
+            if len(remaining) <= missing:
+                threshold = 0
+            else:
+                threshold = np.partition(remaining, len(remaining) - missing)[len(remaining) - missing]
+        candidates = np.flatnonzero(~checked & (upper >= threshold))
+        if len(candidates) == 0:
+            break
+        for i in candidates:
+            # Chỉ decode các dòng ứng viên
+            output = mapper(bytes(buffer[starts[i]:ends[i]]).decode('utf-8'))
+            if output:
+                tracker.add(output[1])
+        checked[candidates] = True
+
+
+def scan_split(args):
+    """
+    Worker thay cho b1.map_split: quét split [start, end) theo các block kết thúc bằng newline
+    Returns: list (length, path) tối đa top_n phần tử
+    """
+    filename, start, end, top_n = args
+    tracker = LongestTracker(top_n)
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        buffer = np.frombuffer(mm, dtype=np.uint8)
+        pos = start
+        while pos < end:
+            newline = mm.find(b'\n', min(pos + BLOCK_SIZE, end) - 1, end)
+            stop = end if newline == -1 else newline + 1
+            scan_block(buffer, pos, stop, tracker, top_n)
+            pos = stop
+        # Giải phóng view trước khi đóng mmap
+        del buffer
+    return tracker.values()